@@ -0,0 +1,169 @@
+# Headless service: runs the strategy executor, trade copier and manual-trade monitor without Tk
+# Accounts come from the state store shared with the GUI unless the config lists them; state is
+# served as JSON on a local HTTP endpoint (GET /status, GET /health). Nothing here imports tkinter,
+# so the service starts in a fraction of the GUI's time and runs on machines without a display.
+# GET /metrics on the same port serves the hot-path timings for Prometheus.
+#
+#   python daemon.py [--config daemon.json] [--port 8765]
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+
+DEFAULT_CONFIG = {
+    "executor": True,          # run the strategy executor on the first master
+    "copier": True,            # mirror the first master onto every slave
+    "monitor": True,           # log manual (non-bot) trades on the master
+    "health": True,            # probe every account's connection, balance and equity on a schedule
+    "health_processes": False, # probe in one process per account; each needs its own terminal "path"
+    "use_process_pool": False, # one worker process per slave in the copier
+    "status_host": "127.0.0.1",
+    "status_port": 8765,
+    "masters": None,           # [{"login", "password", "server"}]; None reads the saved accounts
+    "slaves": None,
+}
+
+
+def load_config(path):
+    config = dict(DEFAULT_CONFIG)
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            config.update(json.load(f))
+    return config
+
+
+# Logs manual master trades and keeps the master's open trade count current
+def watch_manual_trades(master):
+    from data.position_feed import get_position_feed, OPENED, CLOSED
+    from data.trade_log import source_logger
+    from data.account_status import update_trade_count
+
+    log = source_logger("monitor")
+    feed = get_position_feed(master)
+
+    def on_events(events):
+        for event in events:
+            pos = event.position
+            if event.kind == OPENED and not pos.comment.startswith("Trade-"):
+                log(f"[🟢 Manual] Trade opened: {pos.symbol} {'BUY' if pos.type == 0 else 'SELL'} at {pos.price_open}",
+                    event="manual_open", ticket=pos.ticket, symbol=pos.symbol)
+            elif event.kind == CLOSED:
+                log(f"[🔻] Trade closed: {pos.ticket}", event="closed", ticket=pos.ticket, symbol=pos.symbol)
+        update_trade_count(feed.account.login, len(feed.positions))
+
+    feed.subscribe(on_events)
+
+
+# Probes every account in its own process; state shows up under "accounts" in /status
+def watch_account_health(accounts, use_processes=False):
+    from data.account_health import get_account_health
+
+    health = get_account_health(use_processes=use_processes)
+    for account in accounts:
+        health.add(account)
+
+
+# TradingDaemon: Starts the configured components and reports their state
+class TradingDaemon:
+    def __init__(self, config):
+        self.config = config
+        self.started_at = time.time()
+        self.ready_at = None
+        self.components = {}
+        self.stop_event = threading.Event()
+        self.server = None
+
+    def start(self):
+        from data.account_storage import load_accounts
+        from data.status_server import StatusServer
+
+        # The endpoint comes up first so supervisors see the process while accounts connect
+        self.server = StatusServer(self.status, self.config["status_host"], self.config["status_port"]).start()
+
+        saved = None
+        if self.config["masters"] is None or self.config["slaves"] is None:
+            saved = load_accounts()
+        masters = self.config["masters"] if self.config["masters"] is not None else saved["masters"]
+        slaves = self.config["slaves"] if self.config["slaves"] is not None else saved["slaves"]
+        if not masters:
+            print("[Daemon] No master account configured; serving status only")
+        else:
+            self._start_components(masters[0], slaves)
+        self.ready_at = time.time()
+        print(f"[Daemon] Ready in {self.ready_at - self.started_at:.2f}s, status on "
+              f"http://{self.server.address[0]}:{self.server.address[1]}/status")
+        return self
+
+    def _start_components(self, master, slaves):
+        if self.config["executor"]:
+            from data.strategy_executor import strategy_loop_for_all
+            self._run("executor", lambda: strategy_loop_for_all(master["login"], master["password"], master["server"]))
+        if self.config["copier"] and slaves:
+            from data.trade_copier import copy_master_trades
+            self._run("copier", lambda: copy_master_trades(master, slaves, use_process_pool=self.config["use_process_pool"]))
+        if self.config["monitor"]:
+            self._run("monitor", lambda: watch_manual_trades(master))
+        if self.config["health"]:
+            self._run("health", lambda: watch_account_health([master] + list(slaves), self.config["health_processes"]))
+
+    def _run(self, name, start):
+        try:
+            start()
+            self.components[name] = "running"
+        except Exception as e:
+            self.components[name] = f"failed: {e}"
+            print(f"[Daemon] {name} failed to start: {e}")
+
+    def status(self):
+        from data.account_status import snapshot
+        from data.scheduler import get_scheduler
+
+        now = time.time()
+        return {
+            "pid": os.getpid(),
+            "uptime": round(now - self.started_at, 1),
+            "startup_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            "components": self.components,
+            "accounts": snapshot(),
+            "tasks": get_scheduler().tasks(),
+        }
+
+    def run_forever(self):
+        # Short waits keep Ctrl+C responsive on Windows, where a plain wait() is not interrupted
+        while not self.stop_event.wait(1.0):
+            pass
+
+    def stop(self):
+        from data.scheduler import stop_scheduler
+
+        if self.server:
+            self.server.stop()
+        # Cancels every loop and waits for in-flight broker and database calls before exiting
+        stop_scheduler()
+        self.stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the executor and copier without the GUI.")
+    parser.add_argument("--config", default="daemon.json", help="JSON config; missing keys use the defaults")
+    parser.add_argument("--port", type=int, default=None, help="status endpoint port (overrides the config)")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.port is not None:
+        config["status_port"] = args.port
+
+    daemon = TradingDaemon(config)
+    signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    daemon.start()
+    daemon.run_forever()
+    print("[Daemon] Stopped")
+    return 0
+
+
+# Guarded so worker processes (spawned by the copier pool) can import this module safely
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+# Account health: connection state and balance/equity/margin/position counts for every account
+# By default every probe is a job on the shared session broker, the only thing allowed to log the
+# terminal into an account. With use_processes=True, accounts pinned to their own terminal install
+# (distinct MT5Account.path) are instead probed by a long-lived worker process each, so they connect
+# concurrently and a slow or hung broker only delays its own account; accounts without a terminal of
+# their own stay on the shared broker. Probes run on a schedule; failures back off exponentially
+# before reconnecting, and a worker that stops answering is restarted.
+# Results are published through data.account_status, which the GUI and the daemon both read.
+import importlib
+import multiprocessing
+import queue
+import random
+import threading
+import time
+
+from data.mt5_session import MT5SessionBroker, MT5SessionError, as_account, get_broker, separate_terminals
+from data.account_status import update_account
+from data.scheduler import get_scheduler, FixedInterval
+from data.trade_log import source_logger
+
+HEALTH_INTERVAL = 15.0   # seconds between probes of a healthy account
+PROBE_TIMEOUT = 20.0     # a probe unanswered this long counts as failed and restarts the worker
+BACKOFF_BASE = 2.0       # first retry delay after a failure; doubles per consecutive failure
+BACKOFF_MAX = 300.0
+TICK = 0.5               # how often the monitor collects answers and sends due probes
+PROBE_PROCESSES = False  # one probe process per account; needs a distinct terminal path per account
+
+log = source_logger("health")
+
+
+def _probe(mt5):
+    info = mt5.account_info()
+    if info is None:
+        return None
+    positions = mt5.positions_get()
+    return {
+        "balance": info.balance,
+        "equity": info.equity,
+        "margin": info.margin,
+        "free_margin": info.margin_free,
+        "margin_level": info.margin_level,
+        "trades": len(positions) if positions else 0,
+    }
+
+
+def _health_worker(account, commands, responses, mt5_module_name):
+    """Worker process loop: probes one account on request until it gets None."""
+    mt5 = importlib.import_module(mt5_module_name)
+    broker = MT5SessionBroker(mt5_module=mt5).start()
+    while True:
+        probe_id = commands.get()
+        if probe_id is None:
+            break
+        try:
+            result = broker.run(account, _probe)
+            error = None if result is not None else str(mt5.last_error())
+        except Exception as e:
+            result, error = None, str(e)
+        if error is not None:
+            # Drop the session so the next probe initializes and logs in from scratch
+            broker.stop()
+            try:
+                mt5.shutdown()
+            except Exception:
+                pass
+            broker = MT5SessionBroker(mt5_module=mt5).start()
+        responses.put((account.login, probe_id, result, error))
+    broker.stop()
+
+
+class _AccountState:
+    __slots__ = ("account", "process", "commands", "future", "probe_id", "sent_at", "next_due", "failures",
+                 "connected")
+
+    def __init__(self, account):
+        self.account = account
+        self.process = None      # probe worker, only for accounts with a terminal of their own
+        self.commands = None
+        self.future = None       # in-flight probe on the shared broker otherwise
+        self.probe_id = 0
+        self.sent_at = None      # set while a probe is in flight
+        self.next_due = 0.0
+        self.failures = 0
+        self.connected = False
+
+
+# AccountHealthMonitor: Probes every account on a schedule, driven by a scheduler job
+# on_connected(login) is called (from the scheduler thread) each time an account becomes reachable
+class AccountHealthMonitor:
+    def __init__(self, interval=HEALTH_INTERVAL, probe_timeout=PROBE_TIMEOUT, mt5_module_name="MetaTrader5",
+                 on_connected=None, scheduler=None, use_processes=PROBE_PROCESSES, broker=None):
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.mt5_module_name = mt5_module_name
+        self.on_connected = on_connected
+        self.scheduler = scheduler or get_scheduler()
+        self.use_processes = use_processes
+        self.broker = broker
+        self._ctx = multiprocessing.get_context("spawn")
+        self._responses = self._ctx.Queue()
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.scheduler.add("health", self.tick, FixedInterval(TICK))
+        return self
+
+    def stop(self):
+        self.scheduler.remove("health")
+        with self._lock:
+            states = list(self._accounts.values())
+            self._accounts.clear()
+        for state in states:
+            self._stop_worker(state)
+
+    def add(self, account):
+        """Start watching an account; its first probe is sent on the next tick."""
+        account = as_account(account)
+        with self._lock:
+            if account.login in self._accounts:
+                return
+            state = _AccountState(account)
+            if self.use_processes:
+                watched = [other.account for other in self._accounts.values()]
+                if separate_terminals(watched + [account]):
+                    self._start_worker(state)
+                else:
+                    log(f"[Health] {account.login} has no terminal path of its own; probing it through the "
+                        f"shared session instead of a separate process", level="warning")
+            self._accounts[account.login] = state
+        update_account(account.login, status="CONNECTING")
+
+    def remove(self, login):
+        with self._lock:
+            state = self._accounts.pop(str(login), None)
+        if state is not None:
+            self._stop_worker(state)
+
+    def refresh(self, login=None):
+        """Probe now instead of waiting for the schedule (all accounts when login is None)."""
+        with self._lock:
+            for state in self._accounts.values():
+                if login is None or state.account.login == str(login):
+                    state.next_due = 0.0
+        self.scheduler.trigger("health")
+
+    def _start_worker(self, state):
+        state.commands = self._ctx.Queue()
+        state.process = self._ctx.Process(
+            target=_health_worker,
+            args=(state.account, state.commands, self._responses, self.mt5_module_name),
+            name=f"health-{state.account.login}",
+            daemon=True,
+        )
+        state.process.start()
+        state.sent_at = None
+
+    def _stop_worker(self, state):
+        if state.process is None:
+            return
+        try:
+            state.commands.put(None)
+            state.process.join(timeout=2)
+        finally:
+            if state.process.is_alive():
+                state.process.terminate()
+
+    def tick(self):
+        self._collect()
+        now = time.monotonic()
+        with self._lock:
+            states = list(self._accounts.values())
+        for state in states:
+            if state.sent_at is not None:
+                if now - state.sent_at > self.probe_timeout:
+                    self._failed(state, f"no answer in {self.probe_timeout:.0f}s")
+                    if state.process is not None:
+                        # Hung terminal or broker: only this account's worker is replaced
+                        state.process.terminate()
+                        self._start_worker(state)
+                    else:
+                        # Still queued or running on the shared broker; its late answer is ignored
+                        state.future = None
+                        state.sent_at = None
+                continue
+            if now >= state.next_due:
+                state.probe_id += 1
+                state.sent_at = now
+                if state.process is not None:
+                    state.commands.put(state.probe_id)
+                else:
+                    self._submit_probe(state)
+        return True
+
+    def _submit_probe(self, state):
+        try:
+            state.future = (self.broker or get_broker()).submit(state.account, _probe)
+        except MT5SessionError as e:
+            state.sent_at = None
+            self._failed(state, str(e))
+
+    def _shared_answers(self):
+        """(login, probe_id, result, error) for finished probes on the shared broker."""
+        with self._lock:
+            states = [state for state in self._accounts.values() if state.future is not None and state.future.done()]
+        answers = []
+        for state in states:
+            future, state.future = state.future, None
+            error = future.exception()
+            result = None if error is not None else future.result()
+            if error is None and result is None:
+                error = str((self.broker or get_broker()).last_error(state.account))
+            answers.append((state.account.login, state.probe_id, result, None if error is None else str(error)))
+        return answers
+
+    def _collect(self):
+        for answer in self._shared_answers():
+            self._answer(*answer)
+        while True:
+            try:
+                answer = self._responses.get_nowait()
+            except queue.Empty:
+                return
+            self._answer(*answer)
+
+    def _answer(self, login, probe_id, result, error):
+        with self._lock:
+            state = self._accounts.get(login)
+        if state is None or probe_id != state.probe_id or state.sent_at is None:
+            return  # removed account, or an answer that already timed out
+        state.sent_at = None
+        if error is not None:
+            self._failed(state, error)
+        else:
+            self._succeeded(state, result)
+
+    def _succeeded(self, state, result):
+        state.failures = 0
+        state.next_due = time.monotonic() + self.interval
+        update_account(state.account.login, status="CONNECTED", error=None, failures=0, **result)
+        if not state.connected:
+            state.connected = True
+            if self.on_connected:
+                self.on_connected(state.account.login)
+
+    def _failed(self, state, error):
+        state.failures += 1
+        state.connected = False
+        # Exponential backoff with jitter so accounts on the same broker do not retry in lockstep
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** min(state.failures - 1, 16)) * random.uniform(0.8, 1.2)
+        state.next_due = time.monotonic() + delay
+        update_account(state.account.login, status=f"RECONNECTING in {delay:.0f}s", error=error,
+                       failures=state.failures)
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_account_health(on_connected=None, use_processes=PROBE_PROCESSES):
+    """Process-wide monitor, started on first use; the options are only taken on that first call."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = AccountHealthMonitor(on_connected=on_connected, use_processes=use_processes).start()
+        return _monitor
@@ -0,0 +1,36 @@
+# Live per-account state (open trade count, balance, equity, ...) reported by the trading code
+# Kept free of any GUI import so the executor and copier run the same way under Tk and headless;
+# views (the account page, the daemon's status endpoint) read the snapshot or register a listener
+import threading
+
+trade_counter = {}
+_accounts = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def add_listener(callback):
+    """callback(login, fields) is called from the reporting thread with the fields that changed."""
+    _listeners.append(callback)
+
+
+def update_account(login, **fields):
+    login = str(login)
+    with _lock:
+        _accounts.setdefault(login, {}).update(fields)
+    for callback in list(_listeners):
+        try:
+            callback(login, fields)
+        except Exception as e:
+            print(f"[Account Status] Listener failed: {e}")
+
+
+def update_trade_count(login, count):
+    trade_counter[str(login)] = count
+    update_account(login, trades=count)
+
+
+def snapshot():
+    """Copy of every account's last reported fields, keyed by login."""
+    with _lock:
+        return {login: dict(fields) for login, fields in _accounts.items()}
@@ -1,27 +1,15 @@
-import json
-import os
+# Saved master/slave accounts, kept in the state store (accounts.json is imported on first run)
+from data.state_store import get_state_store
 
-FILE_PATH = "accounts.json"
 
 def load_accounts():
-    if not os.path.exists(FILE_PATH):
-        return {"masters": [], "slaves": []}
-    with open(FILE_PATH, "r") as f:
-        return json.load(f)
+    return get_state_store().load_accounts()
 
 def save_account(account_type, account):
-    data = load_accounts()
-    if account not in data[account_type]:
-        data[account_type].append(account)
-        with open(FILE_PATH, "w") as f:
-            json.dump(data, f, indent=4)
+    get_state_store().save_account(account_type, account)
 
 def remove_account(account_type, login):
-    data = load_accounts()
-    data[account_type] = [acc for acc in data[account_type] if acc["login"] != login]
-    with open(FILE_PATH, "w") as f:
-        json.dump(data, f, indent=4)
-        
+    get_state_store().remove_account(account_type, login)
+
 def clear_all_accounts():
-    with open(FILE_PATH, "w") as f:
-        json.dump({"masters": [], "slaves": []}, f, indent=4)
+    get_state_store().clear_accounts()
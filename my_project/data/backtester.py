@@ -0,0 +1,207 @@
+# Historical backtester for the saved strategy
+# Replays M1 OHLC history from CSV/Parquet through the same indicator formulas and all-indicators-agree
+# consensus as the live executor, then simulates the live trade rules without a Python loop per bar:
+#   - a signal is acted on at the close of the bar that produced it
+#   - SL/TP come from trade_rules.pip_settings, exactly as in place_trade
+#   - one trade per symbol until the next 30 minute reset, which also closes anything still open
+# Usage: python -m data.backtester EURUSD+=eurusd.csv USDJPY+=usdjpy.parquet [--strategy file.json]
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from data.batch_evaluator import indicator_signals, consensus, BUY
+from data.trade_rules import pip_settings
+
+RESET_MINUTES = 30
+CONTRACT_SIZE = 100000
+REASONS = ("TP", "SL", "Reset")
+
+
+def load_bars(path):
+    """Read time/high/low/close columns from a CSV or Parquet file into NumPy arrays.
+    time may be epoch seconds or anything pandas can parse as a datetime."""
+    import pandas as pd
+
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    times = df["time"]
+    if pd.api.types.is_numeric_dtype(times):
+        seconds = times.to_numpy(dtype=np.int64)
+    else:
+        seconds = pd.to_datetime(times).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    order = np.argsort(seconds, kind="stable")
+    return {
+        "time": seconds[order],
+        "high": df["high"].to_numpy(dtype=float)[order],
+        "low": df["low"].to_numpy(dtype=float)[order],
+        "close": df["close"].to_numpy(dtype=float)[order],
+    }
+
+
+def strategy_direction(strategy, bars):
+    """Consensus direction per bar (+1 BUY, -1 SELL, 0 none) for one symbol's bars."""
+    signals = indicator_signals(strategy, bars["close"], bars["high"], bars["low"])
+    return consensus(signals)[0] if signals else np.zeros(len(bars["close"]), dtype=np.int8)
+
+
+def simulate_symbol(symbol, bars, strategy, **options):
+    """Vectorized trade simulation for one symbol. Returns a dict of trade arrays."""
+    return simulate_direction(symbol, bars, strategy_direction(strategy, bars), **options)
+
+
+def simulate_direction(symbol, bars, direction, reset_minutes=RESET_MINUTES, spread_pips=0.0,
+                       volume=1.0, contract_size=CONTRACT_SIZE):
+    """Trade simulation from an already computed per-bar direction array."""
+    close, high, low, times = bars["close"], bars["high"], bars["low"], bars["time"]
+    # The reset clears the one-trade-per-symbol block, so each reset window holds at most one trade:
+    # the first bar in the window with a consensus signal
+    window = times // (reset_minutes * 60)
+    signal_bars = np.flatnonzero(direction)
+    _, first = np.unique(window[signal_bars], return_index=True)
+    entry = signal_bars[first]
+    side = direction[entry].astype(float)  # +1 BUY, -1 SELL
+    window_end = np.searchsorted(window, window[entry], side="right") - 1
+
+    pip, sl_pips, tp_pips = pip_settings(symbol)
+    spread = spread_pips * pip
+    is_buy = side == BUY
+    # Bars are bid prices: buys enter at the ask and exit at the bid, sells the other way round
+    entry_price = close[entry] + np.where(is_buy, spread, 0.0)
+    sl = entry_price - side * sl_pips * pip
+    tp = entry_price + side * tp_pips * pip
+
+    # Walk the rest of each window as a padded (trades x bars) matrix
+    span = window_end - entry
+    width = max(1, int(span.max()) if len(span) else 0)  # at least one column so argmax works
+    offsets = np.arange(1, width + 1)
+    index = np.minimum(entry[:, None] + offsets[None, :], len(close) - 1)
+    valid = offsets[None, :] <= span[:, None]
+    ask_high = high[index] + spread
+    ask_low = low[index] + spread
+    exit_high = np.where(is_buy[:, None], high[index], ask_high)
+    exit_low = np.where(is_buy[:, None], low[index], ask_low)
+    sl_hit = np.where(is_buy[:, None], exit_low <= sl[:, None], exit_high >= sl[:, None]) & valid
+    tp_hit = np.where(is_buy[:, None], exit_high >= tp[:, None], exit_low <= tp[:, None]) & valid
+    hit = sl_hit | tp_hit
+    any_hit = hit.any(axis=1)
+    first_hit = hit.argmax(axis=1)
+    rows = np.arange(len(entry))
+    # If SL and TP fall inside the same bar the stop is assumed to fill first
+    stopped = any_hit & sl_hit[rows, first_hit]
+
+    reset_price = close[window_end] + np.where(is_buy, 0.0, spread)
+    exit_price = np.where(stopped, sl, np.where(any_hit, tp, reset_price))
+    exit_bar = np.where(any_hit, entry + 1 + first_hit, window_end)
+    reason = np.where(stopped, 1, np.where(any_hit, 0, 2))
+
+    pips = (exit_price - entry_price) * side / pip
+    return {
+        "symbol": symbol,
+        "entry_time": times[entry],
+        "exit_time": times[exit_bar],
+        "direction": side.astype(np.int8),
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "reason": reason,
+        "pips": pips,
+        "profit": (exit_price - entry_price) * side * volume * contract_size,
+    }
+
+
+def trade_stats(trades):
+    """Summary statistics for one symbol's trades (or several concatenated)."""
+    pips = trades["pips"]
+    count = len(pips)
+    wins = pips[pips > 0]
+    losses = pips[pips < 0]
+    order = np.argsort(trades["exit_time"], kind="stable")
+    equity = np.cumsum(pips[order])
+    drawdown = (np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity).max() if count else 0.0
+    return {
+        "trades": count,
+        "wins": len(wins),
+        "losses": len(losses),
+        "win_rate": len(wins) / count if count else 0.0,
+        "total_pips": float(pips.sum()),
+        "avg_pips": float(pips.mean()) if count else 0.0,
+        "profit": float(trades["profit"].sum()),
+        "profit_factor": float(wins.sum() / -losses.sum()) if len(losses) else float("inf") if len(wins) else 0.0,
+        "max_drawdown_pips": float(drawdown),
+        "exits": {name: int((trades["reason"] == i).sum()) for i, name in enumerate(REASONS)},
+    }
+
+
+def run_backtest(strategy, data, **options):
+    """data maps symbol -> bars dict (see load_bars) or a file path.
+    Returns {"symbols": {symbol: stats}, "total": stats, "trades": {symbol: trade arrays}}."""
+    per_symbol = {}
+    all_trades = {}
+    for symbol, bars in data.items():
+        if isinstance(bars, str):
+            bars = load_bars(bars)
+        trades = simulate_symbol(symbol, bars, strategy, **options)
+        all_trades[symbol] = trades
+        per_symbol[symbol] = trade_stats(trades)
+
+    return {"symbols": per_symbol, "total": trade_stats(merge_trades(all_trades.values())), "trades": all_trades}
+
+
+def merge_trades(trades):
+    """Concatenate the trade arrays of several symbols for portfolio-level stats."""
+    trades = list(trades)
+    return {key: np.concatenate([t[key] for t in trades]) if trades else np.zeros(0)
+            for key in ("exit_time", "pips", "profit", "reason")}
+
+
+def format_report(result):
+    lines = [f"{'Symbol':<10}{'Trades':>8}{'Win%':>8}{'Pips':>10}{'Profit':>12}{'PF':>7}{'MaxDD':>9}  TP/SL/Reset"]
+    rows = list(result["symbols"].items()) + [("TOTAL", result["total"])]
+    for symbol, s in rows:
+        exits = "/".join(str(s["exits"][name]) for name in REASONS)
+        lines.append(
+            f"{symbol:<10}{s['trades']:>8}{s['win_rate'] * 100:>7.1f}%{s['total_pips']:>10.1f}"
+            f"{s['profit']:>12.2f}{s['profit_factor']:>7.2f}{s['max_drawdown_pips']:>9.1f}  {exits}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the saved strategy on historical M1 bars.")
+    parser.add_argument("data", nargs="+", help="SYMBOL=path.csv|path.parquet")
+    parser.add_argument("--strategy", help="strategy JSON file (defaults to the one saved in trading_bot.db)")
+    parser.add_argument("--reset-minutes", type=int, default=RESET_MINUTES)
+    parser.add_argument("--spread", type=float, default=0.0, help="spread in pips")
+    parser.add_argument("--volume", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    if args.strategy:
+        with open(args.strategy, "r") as f:
+            strategy = json.load(f)
+    else:
+        from data.db_handler import load_saved_strategy
+        strategy = load_saved_strategy()
+    if not strategy:
+        print("No strategy found. Save one in the Strategy Builder or pass --strategy.")
+        return 1
+
+    data = dict(item.split("=", 1) for item in args.data)
+    started = time.perf_counter()
+    loaded = {symbol: load_bars(path) for symbol, path in data.items()}
+    loaded_at = time.perf_counter()
+    result = run_backtest(strategy, loaded, reset_minutes=args.reset_minutes,
+                          spread_pips=args.spread, volume=args.volume)
+    finished = time.perf_counter()
+    print(format_report(result))
+    bars = sum(len(b["close"]) for b in loaded.values())
+    print(f"\n{bars} bars loaded in {loaded_at - started:.2f}s, simulated in {finished - loaded_at:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+# Local rolling bar cache so the executor stops re-fetching 100 bars per symbol every cycle
+# Each symbol keeps its bars in preallocated NumPy arrays; a refresh only asks MT5 for the bars that
+# can have formed since the previous fetch (plus the still-forming one) and hands back array views,
+# never a DataFrame. The buffer grows when a strategy asks for a longer lookback
+import threading
+import time
+
+import numpy as np
+
+FIELDS = ("time", "open", "high", "low", "close", "tick_volume")
+
+
+# Bars: Read-only window over a symbol's cached bars, indexable like the MT5 rates array
+# (bars["close"]) so IndicatorEngine.feed and stack_rates accept it directly
+class Bars:
+    __slots__ = ("_arrays",)
+
+    def __init__(self, arrays):
+        self._arrays = arrays
+
+    def __getitem__(self, field):
+        return self._arrays[field]
+
+    def __len__(self):
+        return len(self._arrays["time"])
+
+
+# SymbolBars: Array-backed buffer of one symbol's bars
+# Storage is twice the capacity so appends are slice writes; when the end is reached the live
+# window is moved back to the start once instead of rolling the arrays on every bar
+class SymbolBars:
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._alloc(capacity)
+        self.last_fetch = None
+
+    def _alloc(self, capacity):
+        size = capacity * 2
+        self.data = {f: np.zeros(size, dtype=np.int64 if f == "time" else np.float64) for f in FIELDS}
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def last_time(self):
+        return int(self.data["time"][self.end - 1]) if self.end > self.start else None
+
+    def grow(self, capacity):
+        """Enlarge the buffer; the cached bars are dropped so the next refresh fetches the full lookback."""
+        self.capacity = capacity
+        self._alloc(capacity)
+        self.last_fetch = None
+
+    def merge(self, rates):
+        """Fold fetched rates (oldest first) into the buffer: the forming bar is overwritten, newer bars appended."""
+        if rates is None or len(rates) == 0:
+            return 0
+        times = rates["time"]
+        last = self.last_time
+        first_new = 0
+        if last is not None:
+            if times[0] > last:
+                # Gap: MT5 returned nothing that overlaps, start over from this window
+                self.start = self.end = 0
+            else:
+                first_new = int(np.searchsorted(times, last, side="left"))
+                if first_new < len(times) and times[first_new] == last:
+                    self._write(self.end - 1, rates, first_new, first_new + 1)
+                    first_new += 1
+
+        count = len(times) - first_new
+        if count <= 0:
+            return 0
+        if count >= self.capacity:
+            first_new = len(times) - self.capacity
+            count = self.capacity
+            self.start = self.end = 0
+        if self.end + count > len(self.data["time"]):
+            keep = min(len(self), self.capacity - count)
+            for arr in self.data.values():
+                arr[:keep] = arr[self.end - keep:self.end]
+            self.start, self.end = 0, keep
+        self._write(self.end, rates, first_new, first_new + count)
+        self.end += count
+        if len(self) > self.capacity:
+            self.start = self.end - self.capacity
+        return count
+
+    def _write(self, at, rates, lo, hi):
+        names = rates.dtype.names if hasattr(rates, "dtype") and rates.dtype.names else FIELDS
+        for f in FIELDS:
+            if f in names:
+                self.data[f][at:at + hi - lo] = rates[f][lo:hi]
+
+    def view(self, count=None):
+        count = len(self) if count is None else min(count, len(self))
+        lo = self.end - count
+        return Bars({f: arr[lo:self.end] for f, arr in self.data.items()})
+
+
+# BarCache: All cached symbols for one account and timeframe
+# refresh() fetches every requested symbol in a single session job; fetch sizes are derived from
+# how many bars can have closed since each symbol's previous fetch
+class BarCache:
+    def __init__(self, account, timeframe, bar_seconds=60, capacity=100, broker=None):
+        self.account = account
+        self.timeframe = timeframe
+        self.bar_seconds = bar_seconds
+        self.default_capacity = capacity
+        self.broker = broker
+        self.symbols = {}
+        self.lock = threading.Lock()
+        self.bars_fetched = 0
+        self.fetch_calls = 0
+
+    def _symbol(self, symbol, lookback):
+        bars = self.symbols.get(symbol)
+        if bars is None:
+            bars = self.symbols[symbol] = SymbolBars(max(self.default_capacity, lookback))
+        elif lookback > bars.capacity:
+            bars.grow(lookback)
+        return bars
+
+    def _fetch_count(self, bars, lookback, now):
+        if bars.last_fetch is None or len(bars) < lookback:
+            return lookback
+        # Bars that can have closed since the last fetch, plus the forming bar, plus one for clock skew
+        elapsed = int((now - bars.last_fetch) // self.bar_seconds)
+        return min(lookback, elapsed + 2)
+
+    def refresh(self, symbols, lookback=100):
+        """Bring the given symbols up to date. Returns {symbol: Bars of the last `lookback` bars or None}."""
+        if self.broker is None:
+            from data.mt5_session import get_broker
+            self.broker = get_broker()
+        now = time.time()
+        with self.lock:
+            plan = [(symbol, self._fetch_count(self._symbol(symbol, lookback), lookback, now)) for symbol in symbols]
+        calls = [("copy_rates_from_pos", (symbol, self.timeframe, 0, count), None) for symbol, count in plan]
+        results = self.broker.batch(self.account, calls)
+
+        views = {}
+        with self.lock:
+            self.fetch_calls += len(calls)
+            for (symbol, _), rates in zip(plan, results):
+                bars = self.symbols[symbol]
+                if rates is not None and len(rates):
+                    self.bars_fetched += len(rates)
+                    bars.merge(rates)
+                    bars.last_fetch = now
+                views[symbol] = bars.view(lookback) if len(bars) else None
+        return views
+
+    def get(self, symbol, lookback=100):
+        return self.refresh([symbol], lookback)[symbol]
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_bar_cache(account, timeframe, bar_seconds=60):
+    """Shared cache per (account login, timeframe)."""
+    key = (str(account.login), timeframe)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = BarCache(account, timeframe, bar_seconds)
+        return cache
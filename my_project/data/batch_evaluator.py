@@ -0,0 +1,85 @@
+# Batched strategy evaluation across many symbols at once
+# Close/high/low for every symbol are stacked into (symbols, bars) arrays, every configured indicator
+# is computed for all of them in one vectorized pass, and the same consensus rule as
+# StrategyEvaluator.evaluate (all enabled indicators must agree) yields one direction per symbol
+import numpy as np
+
+from data import vector_indicators as vi
+
+BUY = 1
+SELL = -1
+NONE = 0
+
+
+def _setting(config, name):
+    return int(config["sub_indicators"][name]["value"])
+
+
+def _direction(buy, sell):
+    return np.where(buy, BUY, np.where(sell, SELL, NONE)).astype(np.int8)
+
+
+def enabled_indicators(strategy):
+    return [name for name, config in strategy.items() if config.get("var", 0)]
+
+
+def indicator_signals(strategy, close, high, low, calc=vi):
+    """Per-indicator signal arrays shaped (symbols, bars): +1 BUY, -1 SELL, 0 no signal.
+    Thresholds are the ones StrategyEvaluator uses; NaN values never produce a signal.
+    `calc` provides the indicator functions: vector_indicators, or a stand-in with the same
+    signatures that memoizes them (optimizer.CachedIndicators)."""
+    close, high, low = vi.as_2d(close), vi.as_2d(high), vi.as_2d(low)
+    signals = {}
+    with np.errstate(invalid="ignore"):
+        for name in enabled_indicators(strategy):
+            config = strategy[name]
+            if name == "RSI":
+                value = calc.rsi(close, _setting(config, "Period"))
+                signals[name] = _direction(value < _setting(config, "Undersold"), value > _setting(config, "Oversold"))
+            elif name == "MACD":
+                line, signal = calc.macd(close, _setting(config, "Fast EMA"), _setting(config, "Slow EMA"), _setting(config, "MACD SMA"))
+                signals[name] = _direction(line > signal, line < signal)
+            elif name == "Bollinger Bands":
+                lower, _, upper = calc.bbands(close, _setting(config, "Period"), _setting(config, "Deviation"))
+                signals[name] = _direction(close < lower, close > upper)
+            elif name == "Stochastic Oscillator":
+                k, _ = calc.stoch(high, low, close, _setting(config, "%K Period"), _setting(config, "%D Period"), _setting(config, "Slowing"))
+                signals[name] = _direction(k < 20, k > 80)
+            elif name == "Moving Average":
+                ma = calc.shift(calc.sma(close, _setting(config, "Period")), _setting(config, "Shift"))
+                signals[name] = _direction(close > ma, close < ma)
+            else:
+                # Unknown indicators can never produce a signal, so consensus is never reached
+                signals[name] = np.zeros(close.shape, dtype=np.int8)
+    return signals
+
+
+def consensus(signals):
+    """Combine per-indicator signals: a direction only where every indicator gives that same one."""
+    if not signals:
+        return None
+    stacked = np.stack(list(signals.values()))
+    first = stacked[0]
+    agree = (first != NONE) & (stacked == first).all(axis=0)
+    return np.where(agree, first, NONE).astype(np.int8)
+
+
+def evaluate_batch(strategy, close, high, low):
+    """Directions for the latest bar of every row: a list of "BUY"/"SELL"/None, one per symbol."""
+    signals = indicator_signals(strategy, close, high, low)
+    if not signals:
+        return [None] * vi.as_2d(close).shape[0]
+    latest = consensus(signals)[:, -1]
+    return ["BUY" if d == BUY else "SELL" if d == SELL else None for d in latest]
+
+
+def stack_rates(rates_by_symbol, field_names=("close", "high", "low")):
+    """Align per-symbol MT5 rate arrays on their most recent bars and stack them.
+    Returns (symbols, close, high, low); symbols without data are left out."""
+    usable = {s: r for s, r in rates_by_symbol.items() if r is not None and len(r)}
+    if not usable:
+        return [], None, None, None
+    bars = min(len(r) for r in usable.values())
+    symbols = list(usable)
+    arrays = [np.stack([np.asarray(usable[s][f][-bars:], dtype=float) for s in symbols]) for f in field_names]
+    return (symbols, *arrays)
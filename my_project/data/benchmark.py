@@ -0,0 +1,425 @@
+# End-to-end latency benchmark for the executor and copier against the simulated broker (data.fake_mt5)
+# Measures, with the real strategy_executor and trade_copier code:
+#   - signal: M1 bar close -> bars fetched, strategy evaluated, place_trade returned, for every symbol
+#   - open/close: master position appears -> feed poll -> every slave filled by TradeCopier
+#   - reset: the periodic reset sweep, every master position closed and then every slave copy
+# and reports p50/p95/p99 latency, MT5 calls by function, CPU time and peak memory per scenario.
+# Each scenario runs in its own process and scratch directory so singletons, databases and RSS
+# start clean. Results are written as <out>/<commit>.json; --compare prints the change per metric.
+#
+#   python -m data.benchmark [--scenario copy] [--latency 0.2] [--compare benchmarks/abc1234.json]
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple, Counter
+
+import numpy as np
+
+from data import fake_mt5
+
+# kind: "signal" (executor), "copy" (copier) or "reset" (both); burst is how many master positions open at once
+Scenario = namedtuple("Scenario", ["name", "kind", "slaves", "symbols", "burst", "rounds"])
+
+SCENARIOS = [
+    Scenario("signal_8", "signal", 0, 8, 1, 5),
+    Scenario("signal_100", "signal", 0, 100, 1, 5),
+    Scenario("signal_500", "signal", 0, 500, 1, 3),
+    Scenario("copy_1", "copy", 1, 8, 1, 24),
+    Scenario("copy_10", "copy", 10, 8, 1, 24),
+    Scenario("copy_100", "copy", 100, 8, 1, 8),
+    Scenario("burst_10x50", "copy", 10, 8, 50, 3),
+    Scenario("burst_100x50", "copy", 100, 8, 50, 1),
+    Scenario("reset_10x50", "reset", 10, 8, 50, 3),
+    Scenario("reset_100x50", "reset", 100, 8, 50, 1),
+]
+
+# Moving average alone signals on nearly every bar, so every symbol goes all the way to order_send
+BENCH_STRATEGY = {"Moving Average": {"var": 1, "sub_indicators": {"Period": {"value": 20}, "Shift": {"value": 0}}}}
+MASTER_LOGIN = 500000
+SLAVE_LOGIN = 600000
+LOGINS_PER_SCENARIO = 1000
+REGRESSION_THRESHOLD = 0.10  # p95 more than 10% slower than the baseline counts as a regression
+SCENARIO_TIMEOUT = 600.0     # seconds a scenario process may run before it is killed and reported as failed
+RESULT_POLL = 1.0            # how often the parent checks that a silent scenario process is still alive
+
+
+def latency_stats(seconds):
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(ms), "p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+        "max": round(float(ms.max()), 3), "mean": round(float(ms.mean()), 3),
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows: no getrusage
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def bench_symbols(count):
+    """The executor's watchlist first, then synthetic names the fake broker creates on first use."""
+    from data.strategy_executor import symbols
+    names = list(symbols[:count])
+    names += [f"SYM{i:04d}+" for i in range(len(names), count)]
+    return names
+
+
+def _setup(options, index):
+    """Fresh simulated broker and session broker for one scenario; returns (fake broker, master, login offset)."""
+    from data.mt5_session import MT5SessionBroker, MT5Account, set_broker
+    from data.trade_log import get_trade_logger
+
+    # Records are still written to the log file; echoing thousands of lines would dominate the timings
+    get_trade_logger().echo = options.verbose
+    # Tickets differ per scenario so copied-ticket state from an earlier in-process scenario never matches
+    fake = fake_mt5.install(seed=options.seed + index, latency=options.latency, jitter=options.jitter,
+                            auto_symbols=True, balance=10_000_000.0, first_ticket=100000001 + index * 10_000_000)
+    if options.order_latency is not None:
+        fake.latency = {"*": options.latency, "order_send": options.order_latency}
+    for name, spec in fake_mt5.DEFAULT_SYMBOLS.items():
+        fake.symbols[f"{name}+"] = spec
+    set_broker(MT5SessionBroker(mt5_module=fake_mt5).start())
+    base = index * LOGINS_PER_SCENARIO
+    master = MT5Account(str(MASTER_LOGIN + base), "", "FakeBroker-Demo")
+    return fake, master, base
+
+
+def run_signal(scenario, options, fake, master, base):
+    from data import strategy_executor as executor
+
+    names = bench_symbols(scenario.symbols)
+    evaluators = {symbol: executor.StrategyEvaluator(BENCH_STRATEGY, symbol) for symbol in names}
+    latencies, failed = [], 0
+
+    def bar_close(record):
+        nonlocal failed
+        started = time.perf_counter()
+        for symbol in names:
+            bars = executor.get_symbol_data(master, symbol)
+            direction = evaluators[symbol].evaluate(bars) if bars is not None else None
+            if not executor.place_trade(master, symbol, direction_str=direction or "BUY"):
+                failed += record
+            if record:
+                latencies.append(time.perf_counter() - started)
+        # Flatten between bars so every symbol can trade again on the next one
+        executor.close_all_positions(master)
+        executor.active_trades.clear()
+
+    bar_close(False)  # warm-up: the first refresh fetches the full lookback for every symbol
+    return measure(fake, lambda: [bar_close(True) for _ in range(scenario.rounds)],
+                   lambda: {"signal": latencies}, failed=lambda: failed)
+
+
+def run_copy(scenario, options, fake, master, base):
+    from data.mt5_session import MT5Account, get_broker
+    from data.position_feed import PositionFeed
+    from data.trade_copier import TradeCopier, SerialSlaveBackend
+
+    slaves = [MT5Account(str(SLAVE_LOGIN + base + i), "", "FakeBroker-Demo") for i in range(scenario.slaves)]
+    feed = PositionFeed(master, journal_path=os.devnull)
+    copier = TradeCopier(SerialSlaveBackend(get_broker(), slaves), feed=feed)
+    copier.recover()  # logs every slave in once, as at copier start
+    feed.poll()
+    names = bench_symbols(scenario.symbols)
+    opens, closes = [], []
+    missing = 0
+
+    def slave_positions():
+        # Read on the server side so the check adds no MT5 calls
+        return sum(len(fake.accounts[int(slave.login)].positions) for slave in slaves)
+
+    def apply(events, started, into):
+        # One poll's events reach the copier together, as they do from the feed subscription
+        if events:
+            copier.handle_events(events)
+            into.extend([time.perf_counter() - started] * len(events))
+
+    def round_trip():
+        nonlocal missing
+        started = time.perf_counter()
+        tickets = [
+            fake.open_position(master.login, names[i % len(names)], i % 2, 0.1, comment="bench")
+            for i in range(scenario.burst)
+        ]
+        apply(feed.poll(), started, opens)
+        missing += scenario.burst * len(slaves) - slave_positions()
+        started = time.perf_counter()
+        for ticket in tickets:
+            fake.close_position(master.login, ticket)
+        apply(feed.poll(), started, closes)
+        missing += slave_positions()
+
+    round_trip()  # warm-up
+    del opens[:], closes[:]
+    missing = 0
+    return measure(fake, lambda: [round_trip() for _ in range(scenario.rounds)],
+                   lambda: {"open": opens, "close": closes}, failed=lambda: missing)
+
+
+def run_reset(scenario, options, fake, master, base):
+    from data import strategy_executor as executor
+    from data.mt5_session import MT5Account, get_broker
+    from data.position_feed import PositionFeed
+    from data.state_store import get_state_store
+    from data.trade_copier import TradeCopier, SerialSlaveBackend
+
+    slaves = [MT5Account(str(SLAVE_LOGIN + base + i), "", "FakeBroker-Demo") for i in range(scenario.slaves)]
+    feed = PositionFeed(master, journal_path=os.devnull)
+    copier = TradeCopier(SerialSlaveBackend(get_broker(), slaves), feed=feed)
+    copier.recover()
+    feed.poll()
+    names = bench_symbols(scenario.symbols)
+    sweeps = []
+    missing = 0
+
+    def sweep():
+        nonlocal missing
+        for i in range(scenario.burst):
+            fake.open_position(master.login, names[i % len(names)], i % 2, 0.1, comment="bench")
+        copier.handle_events(feed.poll())
+        # Timed like reset_all_positions followed by the copier's next run: master first, then the slaves
+        started = time.perf_counter()
+        closed = executor.close_all_positions(master)
+        get_state_store().record_closed_master_trades((pos.ticket, pos.symbol) for pos in closed)
+        copier.process_closed_master_trades()
+        sweeps.append(time.perf_counter() - started)
+        missing += len(fake.accounts[int(master.login)].positions)
+        missing += sum(len(fake.accounts[int(slave.login)].positions) for slave in slaves)
+        feed.poll()
+
+    sweep()  # warm-up
+    del sweeps[:]
+    missing = 0
+    return measure(fake, lambda: [sweep() for _ in range(scenario.rounds)],
+                   lambda: {"reset": sweeps}, failed=lambda: missing)
+
+
+def measure(fake, body, latencies, failed):
+    from data.mt5_session import get_broker
+
+    calls_before = Counter(fake.calls)
+    switches_before = get_broker().login_switches
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    body()
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    calls = Counter(fake.calls)
+    calls.subtract(calls_before)
+    return {
+        "latency_ms": {name: latency_stats(values) for name, values in latencies().items()},
+        "mt5_calls": {name: n for name, n in sorted(calls.items()) if n},
+        "mt5_calls_total": sum(calls.values()),
+        "login_switches": get_broker().login_switches - switches_before,
+        "failed": failed(),
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+RUNNERS = {"signal": run_signal, "copy": run_copy, "reset": run_reset}
+
+
+def run_scenario(scenario, options, index=0):
+    from data.mt5_session import get_broker
+
+    fake, master, base = _setup(options, index)
+    try:
+        return RUNNERS[scenario.kind](scenario, options, fake, master, base)
+    finally:
+        get_broker().stop()
+
+
+def _shutdown():
+    # Stop the loops, write the buffered ledger rows, then close DuckDB before exit
+    from data.scheduler import stop_scheduler
+    from data.trade_ledger import get_trade_ledger
+    from data.database import get_database
+
+    stop_scheduler()
+    get_trade_ledger().close()
+    get_database().close()
+
+
+def _scenario_process(scenario, options, workdir, results):
+    # Fresh interpreter: the fake module must be registered before anything imports MetaTrader5
+    fake_mt5.install()
+    os.chdir(workdir)
+    try:
+        results.put((scenario.name, run_scenario(scenario, options)))
+    except Exception as e:
+        results.put((scenario.name, {"error": f"{type(e).__name__}: {e}"}))
+    finally:
+        _shutdown()
+
+
+def run_benchmarks(scenarios, options, progress=print):
+    results = {}
+    if options.in_process:
+        # One interpreter for everything (profilers, debuggers); scenarios use separate logins
+        fake_mt5.install()
+        os.chdir(tempfile.mkdtemp(prefix="bench-"))
+        for index, scenario in enumerate(scenarios):
+            try:
+                results[scenario.name] = run_scenario(scenario, options, index)
+            except Exception as e:
+                results[scenario.name] = {"error": f"{type(e).__name__}: {e}"}
+            progress(format_scenario(scenario.name, results[scenario.name]))
+        _shutdown()
+        return results
+
+    ctx = multiprocessing.get_context("spawn")
+    for scenario in scenarios:
+        queue = ctx.Queue()
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            process = ctx.Process(target=_scenario_process, args=(scenario, options, workdir, queue),
+                                  name=f"bench-{scenario.name}")
+            process.start()
+            result = _scenario_result(process, queue, options.timeout)
+            # The child writes its ledger and closes DuckDB after reporting; a shutdown that hangs is cut short
+            process.join(RESULT_POLL)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        results[scenario.name] = result
+        progress(format_scenario(scenario.name, result))
+    return results
+
+
+def _scenario_result(process, queue, timeout):
+    """Wait for the scenario's result; a process that dies without one (crash, OOM kill, native abort
+    in DuckDB) or outlives the timeout is reported as an error instead of blocking the run."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=RESULT_POLL)[1]
+        except queue_module.Empty:
+            pass
+        if process.exitcode is not None:
+            # The result may still have been in the pipe when the exit was noticed
+            try:
+                return queue.get(timeout=RESULT_POLL)[1]
+            except queue_module.Empty:
+                return {"error": f"scenario process exited with code {process.exitcode} without a result"}
+        if time.monotonic() > deadline:
+            process.terminate()
+            return {"error": f"scenario timed out after {timeout:g}s"}
+
+
+def current_commit():
+    repo = os.path.dirname(os.path.abspath(__file__))
+    try:
+        out = subprocess.run(["git", "-C", repo, "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             timeout=10)
+        commit = out.stdout.strip() or "unknown"
+        dirty = subprocess.run(["git", "-C", repo, "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, timeout=10).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def build_report(results, options):
+    return {
+        "commit": current_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"latency": options.latency, "order_latency": options.order_latency, "jitter": options.jitter,
+                    "seed": options.seed, "in_process": options.in_process},
+        "scenarios": results,
+    }
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """[(scenario, metric, baseline p50/p95/p99, current p50/p95/p99, p95 change, regressed)] for shared metrics."""
+    rows = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {})
+        for metric, stats in result.get("latency_ms", {}).items():
+            old = before.get("latency_ms", {}).get(metric)
+            if not old or not old.get("count") or not stats.get("count"):
+                continue
+            change = stats["p95"] / old["p95"] - 1 if old["p95"] else 0.0
+            rows.append((name, metric, (old["p50"], old["p95"], old["p99"]),
+                         (stats["p50"], stats["p95"], stats["p99"]), change, change > threshold))
+    return rows
+
+
+def format_scenario(name, result):
+    if "error" in result:
+        return f"{name:<14} ERROR {result['error']}"
+    parts = [
+        f"{metric} p50 {s['p50']:.2f} p95 {s['p95']:.2f} p99 {s['p99']:.2f} ms (n={s['count']})"
+        for metric, s in result["latency_ms"].items() if s.get("count")
+    ]
+    return (f"{name:<14} " + " | ".join(parts) + f" | {result['mt5_calls_total']} MT5 calls, "
+            f"{result['login_switches']} logins, cpu {result['cpu_seconds']:.2f}s, rss {result['peak_rss_mb']} MB"
+            + (f", {result['failed']} failed" if result["failed"] else ""))
+
+
+def format_comparison(rows, baseline):
+    lines = [f"Compared with {baseline.get('commit', '?')} (p50/p95/p99 ms)"]
+    for name, metric, old, new, change, regressed in rows:
+        lines.append(f"{name:<14}{metric:<8}{'/'.join(f'{v:.2f}' for v in old):>24} -> "
+                     f"{'/'.join(f'{v:.2f}' for v in new):<24}{change * 100:+7.1f}%" + ("  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark signal-to-fill and master-to-slave copy latency.")
+    parser.add_argument("--scenario", action="append", help="run only scenarios whose name starts with this")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated broker latency per MT5 call, ms")
+    parser.add_argument("--order-latency", type=float, default=None, help="latency of order_send only, ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction applied to the latencies")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--in-process", action="store_true", help="run every scenario in this process")
+    parser.add_argument("--timeout", type=float, default=SCENARIO_TIMEOUT,
+                        help="seconds before a scenario process is killed and reported as failed")
+    parser.add_argument("--verbose", action="store_true", help="echo the executor and copier logs")
+    parser.add_argument("--out", default="benchmarks", help="directory for <commit>.json results")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+    # Latencies are given in milliseconds on the command line and in seconds to the fake broker
+    args.latency /= 1000.0
+    if args.order_latency is not None:
+        args.order_latency /= 1000.0
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or any(s.name.startswith(p) for p in args.scenario)]
+    out_dir = os.path.abspath(args.out)  # scenarios run from scratch directories
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    report = build_report(run_benchmarks(scenarios, args), args)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{report['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print(format_comparison(rows, baseline))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+# Process-per-account execution pool for the trade copier
+# The MetaTrader5 module talks to one terminal per process, so every slave gets a long-lived worker
+# process holding its own persistent session. The master poller fans each master event out to all
+# workers over queues, one command carrying all of that slave's orders, and each worker sends them
+# through its own order router, so fills happen in parallel and copy latency stays flat as slaves are added.
+# Only usable when every account has its own terminal install (see mt5_session.separate_terminals)
+import importlib
+import itertools
+import multiprocessing
+import queue
+import time
+
+from data.mt5_session import MT5SessionBroker, MT5SessionError, as_account
+
+RESPONSE_TIMEOUT = 30  # seconds to wait for every worker to answer one fan-out
+
+
+def _slave_worker(slave, commands, responses, mt5_module_name):
+    """Worker process loop: owns one slave session and executes commands until it gets None."""
+    from data.trade_copier import SerialSlaveBackend
+
+    broker = MT5SessionBroker(mt5_module=importlib.import_module(mt5_module_name)).start()
+    # The serial backend on this worker's own broker batches each command's orders through a router
+    backend = SerialSlaveBackend(broker, [slave])
+    login = slave.login
+    handlers = {
+        "open": lambda orders: [outcomes[login] for outcomes in backend.open_copies(orders)],
+        "close": lambda trades: [outcomes[login] for outcomes in
+                                 backend.close_copies([{login: trade} for trade in trades])],
+        "close_symbol": lambda symbol: backend.close_symbol(symbol)[login],
+        "positions": lambda _: backend.slave_positions()[login],
+        "closed": lambda tickets: backend.closed_copies({login: tickets})[login],
+    }
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        request_id, kind, payload = command
+        try:
+            outcome = handlers[kind](payload)
+        except MT5SessionError:
+            outcome = None
+        except Exception as e:
+            print(f"[Copier Pool] {login} {kind} failed: {e}")
+            outcome = None
+        responses.put((request_id, login, outcome))
+    broker.stop()
+
+
+# SlaveExecutionPool: Same interface as SerialSlaveBackend, backed by one process per slave
+# Every method returns {login: outcome}; a worker that does not answer in time reports None
+class SlaveExecutionPool:
+    def __init__(self, slaves, mt5_module_name="MetaTrader5", response_timeout=RESPONSE_TIMEOUT):
+        self.slaves = [as_account(slave) for slave in slaves]
+        self.mt5_module_name = mt5_module_name
+        self.response_timeout = response_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._responses = self._ctx.Queue()
+        self._commands = {}
+        self._processes = {}
+        self._request_ids = itertools.count(1)
+
+    def start(self):
+        for slave in self.slaves:
+            commands = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_slave_worker,
+                args=(slave, commands, self._responses, self.mt5_module_name),
+                name=f"copier-slave-{slave.login}",
+                daemon=True,
+            )
+            process.start()
+            self._commands[slave.login] = commands
+            self._processes[slave.login] = process
+        return self
+
+    def stop(self):
+        for commands in self._commands.values():
+            commands.put(None)
+        for process in self._processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._commands.clear()
+        self._processes.clear()
+
+    def _fan_out(self, payloads):
+        """Send {login: (kind, payload)} to the workers at once and gather their answers."""
+        request_id = next(self._request_ids)
+        for login, (kind, payload) in payloads.items():
+            self._commands[login].put((request_id, kind, payload))
+
+        outcomes = {login: None for login in payloads}
+        waiting = set(payloads)
+        deadline = time.monotonic() + self.response_timeout
+        while waiting:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                answer_id, login, outcome = self._responses.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if answer_id != request_id:
+                continue  # late answer to a fan-out that already timed out
+            outcomes[login] = outcome
+            waiting.discard(login)
+        return outcomes
+
+    def open_copy(self, order):
+        return self.open_copies([order])[0]
+
+    def open_copies(self, orders):
+        """Every slave gets all orders as one command; returns one {login: outcome} per order."""
+        answers = self._fan_out({slave.login: ("open", orders) for slave in self.slaves})
+        return [
+            {login: results[i] if results is not None else None for login, results in answers.items()}
+            for i in range(len(orders))
+        ]
+
+    def close_copy(self, slave_trades):
+        return self.close_copies([slave_trades])[0]
+
+    def close_copies(self, many):
+        """Every slave gets all of its closes as one command; returns one {login: outcome} per entry of many."""
+        indexes = {
+            slave.login: [i for i, slave_trades in enumerate(many) if slave.login in slave_trades]
+            for slave in self.slaves
+        }
+        answers = self._fan_out({
+            login: ("close", [many[i][login] for i in positions])
+            for login, positions in indexes.items() if positions
+        })
+        outcomes = [{} for _ in many]
+        for login, results in answers.items():
+            for n, i in enumerate(indexes[login]):
+                outcomes[i][login] = results[n] if results is not None else None
+        return outcomes
+
+    def close_symbol(self, symbol):
+        return self._fan_out({slave.login: ("close_symbol", symbol) for slave in self.slaves})
+
+    def slave_positions(self):
+        return self._fan_out({slave.login: ("positions", None) for slave in self.slaves})
+
+    def closed_copies(self, tickets_by_login):
+        return self._fan_out({login: ("closed", tickets) for login, tickets in tickets_by_login.items()})
@@ -0,0 +1,101 @@
+# Shared DuckDB access layer for trading_bot.db
+# One DuckDB connection per process; every thread reads through its own cursor (DuckDB cursors are
+# independent connections to the same database instance, so readers never open the file again or
+# contend on its lock), and all writes go through a single writer thread that runs each job in its
+# own transaction and resolves a Future for the caller. Statements are constant SQL text with
+# bound parameters (DuckDB prepares and executes them in one call); values are never interpolated.
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+
+import duckdb
+
+DB_PATH = "trading_bot.db"
+
+_STOP = object()
+
+
+# Database: Reads on per-thread cursors, writes serialized on one writer thread
+class Database:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.conn = duckdb.connect(path)
+        self._local = threading.local()
+        self._writes = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+        self.closed = False
+        # Registered before anything that writes through it (the trade ledger flushes at exit), so it runs after them
+        atexit.register(self.close)
+
+    def cursor(self):
+        """This thread's cursor, created on first use."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    def query(self, sql, params=None):
+        return self.cursor().execute(sql, params or []).fetchall()
+
+    def query_one(self, sql, params=None):
+        return self.cursor().execute(sql, params or []).fetchone()
+
+    def submit(self, fn):
+        """Run fn(cursor) on the writer thread inside a transaction. Returns a Future of its result."""
+        future = Future()
+        self._writes.put((fn, future))
+        return future
+
+    def write(self, sql, params=None):
+        return self.submit(lambda cursor: cursor.execute(sql, params or []))
+
+    def execute(self, sql, params=None):
+        """Blocking write."""
+        self.write(sql, params).result()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._writes.put(_STOP)
+        self._writer.join(timeout=5)
+        self.conn.close()
+
+    def _write_loop(self):
+        cursor = self.conn.cursor()
+        while True:
+            job = self._writes.get()
+            if job is _STOP:
+                cursor.close()
+                return
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                cursor.execute("BEGIN TRANSACTION")
+                result = fn(cursor)
+                cursor.execute("COMMIT")
+            except BaseException as e:
+                try:
+                    cursor.execute("ROLLBACK")
+                except duckdb.Error:
+                    pass
+                future.set_exception(e)
+            else:
+                # The writer's own cursor never leaves this thread; fn returns plain values if it needs to
+                future.set_result(None if isinstance(result, duckdb.DuckDBPyConnection) else result)
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=DB_PATH):
+    """Shared Database for a file, opened once per process."""
+    with _databases_lock:
+        db = _databases.get(path)
+        if db is None:
+            db = _databases[path] = Database(path)
+        return db
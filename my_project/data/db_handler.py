@@ -1,66 +1,141 @@
-import duckdb
-
-def create_connection(db_file="trading_bot.db"):
-    return duckdb.connect(db_file)
+import json
+from data.database import get_database
+from data.trade_ledger import create_ledger_schema
 
 def drop_trades_table():
-    conn = create_connection()
-    conn.execute("DROP TABLE IF EXISTS trades")
-    conn.close()
+    get_database().execute("DROP TABLE IF EXISTS trades")
 
 def drop_strategies_table():
-    conn = create_connection()
-    conn.execute("DROP TABLE IF EXISTS strategies")
-    conn.close()
+    get_database().execute("DROP TABLE IF EXISTS strategies")
 
 def create_table():
-    conn = create_connection()
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS trades (
-            symbol TEXT,
-            entry_price REAL,
-            exit_price REAL,
-            profit_loss REAL,
-            timestamp TIMESTAMP DEFAULT NOW()
-        )
-    """)
-    conn.close()
+    def create(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                symbol TEXT,
+                entry_price REAL,
+                exit_price REAL,
+                profit_loss REAL,
+                timestamp TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        # Ids come from a sequence; databases created before the id column existed get it added
+        cursor.execute("CREATE SEQUENCE IF NOT EXISTS trades_id_seq")
+        cursor.execute("ALTER TABLE trades ADD COLUMN IF NOT EXISTS id BIGINT")
+        cursor.execute("UPDATE trades SET id = nextval('trades_id_seq') WHERE id IS NULL")
+    get_database().submit(create).result()
 
 def create_strategies_table():
-    conn = create_connection()
-    conn.execute("""
+    get_database().execute("""
         CREATE TABLE IF NOT EXISTS strategies (
             additional_indicators JSON
         )
     """)
-    conn.close()
+
+def load_saved_strategy():
+    """Return the strategy saved by the strategy builder as a dict, or None."""
+    row = get_database().query_one("SELECT additional_indicators FROM strategies LIMIT 1")
+    if row and row[0]:
+        return json.loads(row[0])
+    return None
+
+def save_strategy(strategy):
+    """Replace the saved strategy in one transaction."""
+    def replace(cursor):
+        cursor.execute("DELETE FROM strategies")
+        cursor.execute("INSERT INTO strategies (additional_indicators) VALUES (?)", [json.dumps(strategy)])
+    get_database().submit(replace).result()
+
+def inspect_database():
+    # Check the contents of the strategies table
+    print("Strategies Table Content:")
+    for row in get_database().query("SELECT * FROM strategies"):
+        print(row)
 
 def insert_sample_trade():
-    conn = create_connection()
-    conn.execute("""
-        INSERT INTO trades (symbol, entry_price, exit_price, profit_loss)
-        VALUES ('EURUSD', 1.1234, 1.1250, 10.5)
+    get_database().execute("""
+        INSERT INTO trades (id, symbol, entry_price, exit_price, profit_loss)
+        VALUES (nextval('trades_id_seq'), 'EURUSD', 1.1234, 1.1250, 10.5)
     """)
-    conn.close()
     print("Sample trade inserted successfully.")
 
-def get_trade_history():
-    conn = create_connection()
-    rows = conn.execute("""
-        SELECT 
-            symbol, 
-            ROUND(entry_price, 4) AS entry_price,
-            ROUND(exit_price, 4) AS exit_price,
-            ROUND(profit_loss, 2) AS profit_loss,
-            STRFTIME(timestamp, '%Y-%m-%d %H:%M:%S') AS formatted_time
+# Closed trades from the ledger plus the simulated trades table, one row per trade
+# uid is unique across both sources and breaks ties so keyset pagination never skips or repeats rows
+HISTORY_SOURCE = """
+    WITH history AS (
+        SELECT 'L' || c.account || '-' || c.ticket AS uid, c.close_time AS time, c.account, c.symbol,
+               o.direction, o.volume, o.price AS entry_price, c.price AS exit_price, c.profit,
+               c.close_reason AS reason
+        FROM trade_closes c
+        LEFT JOIN trade_opens o ON o.ticket = c.ticket AND o.account = c.account
+        UNION ALL
+        SELECT 'T' || id, timestamp, 'simulated', symbol, NULL, NULL, entry_price, exit_price, profit_loss,
+               'simulated'
         FROM trades
-    """).fetchall()
-    conn.close()
-    return rows
+    )
+"""
+HISTORY_COLUMNS = "time, account, symbol, direction, volume, entry_price, exit_price, profit, reason"
+# Sortable columns; only these names are ever placed in the SQL text
+HISTORY_SORT_KEYS = {
+    "time": "time",
+    "account": "account",
+    "symbol": "symbol",
+    "profit": "COALESCE(profit, 0)",
+}
+
+def _history_filters(symbol=None, account=None, start=None, end=None):
+    clauses, params = [], []
+    if symbol:
+        clauses.append("symbol ILIKE ?")
+        params.append(f"{symbol}%")
+    if account:
+        clauses.append("account = ?")
+        params.append(str(account))
+    if start:
+        clauses.append("time >= CAST(? AS DATE)")
+        params.append(start)
+    if end:
+        clauses.append("time < CAST(? AS DATE) + INTERVAL 1 DAY")
+        params.append(end)
+    return clauses, params
+
+def get_trade_history_page(limit=100, sort="time", descending=True, after=None, before=None, **filters):
+    """
+    One page of trade history, filtered and sorted in DuckDB.
+    after/before are the (sort value, uid) keys of the last/first row already shown; a page
+    requested with before= comes back in display order. Each row ends with its key.
+    """
+    sort_expr = HISTORY_SORT_KEYS[sort]
+    clauses, params = _history_filters(**filters)
+    backwards = before is not None
+    key = before if backwards else after
+    # Scrolling back walks the same order in reverse and flips the page afterwards
+    ascending = descending == backwards
+    if key is not None:
+        op = ">" if ascending else "<"
+        clauses.append(f"({sort_expr} {op} ? OR ({sort_expr} = ? AND uid {op} ?))")
+        params += [key[0], key[0], key[1]]
+    direction = "ASC" if ascending else "DESC"
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = get_database().query(f"""
+        {HISTORY_SOURCE}
+        SELECT {HISTORY_COLUMNS}, {sort_expr} AS sort_value, uid
+        FROM history {where}
+        ORDER BY sort_value {direction}, uid {direction}
+        LIMIT ?
+    """, params + [limit])
+    return rows[::-1] if backwards else rows
+
+def count_trade_history(**filters):
+    clauses, params = _history_filters(**filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return get_database().query_one(f"{HISTORY_SOURCE} SELECT COUNT(*) FROM history {where}", params)[0]
 
 def clear_trade_history():
-    conn = create_connection()
-    conn.execute("DELETE FROM trades")
-    conn.commit()
-    conn.close()
+    # The history view also reads the trade ledger, so its tables are emptied in the same transaction
+    create_ledger_schema()
+    def clear(cursor):
+        for table in ("trades", "trade_opens", "trade_closes"):
+            cursor.execute(f"DELETE FROM {table}")
+    get_database().submit(clear).result()
     print("Trade history cleared.")
\ No newline at end of file
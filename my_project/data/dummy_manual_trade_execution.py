@@ -1,22 +1,16 @@
-import duckdb
 import random
 import time
-from data.db_handler import create_connection
-import json
+from data.database import get_database
+from data.db_handler import load_saved_strategy
 
 class TradeExecutionEngine:
     def __init__(self):
         """Initialize the trade execution engine."""
-        self.conn = create_connection()
-        self.cursor = self.conn.cursor()
+        self.db = get_database()
 
     def load_strategy(self):
         """Load the saved strategy from DuckDB."""
-        self.cursor.execute("SELECT additional_indicators FROM strategies LIMIT 1")
-        row = self.cursor.fetchone()
-        if row and row[0]:
-            return json.loads(row[0])  # Convert JSON string to dictionary
-        return None
+        return load_saved_strategy()
 
     def generate_price(self):
         """Simulate market price fluctuations."""
@@ -61,23 +55,17 @@ class TradeExecutionEngine:
         exit_price = entry_price + round(random.uniform(-0.0050, 0.0050), 4)
         profit_loss = round((exit_price - entry_price) * 10000, 2)  # Pips
 
-        self.cursor.execute("SELECT MAX(id) FROM trades")
-        max_id = self.cursor.fetchone()[0]
-        next_id = 1 if max_id is None else max_id + 1
-
-    
-        # Log trade in DuckDB
-        self.cursor.execute("""
+        # Log trade in DuckDB; ids come from the sequence created with the trades table
+        self.db.execute("""
             INSERT INTO trades (id, symbol, entry_price, exit_price, profit_loss, timestamp)
-            VALUES (?, 'EUR/USD', ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (next_id, entry_price, exit_price, profit_loss))
-        self.conn.commit()
+            VALUES (nextval('trades_id_seq'), 'EUR/USD', ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (entry_price, exit_price, profit_loss))
 
         print(f"Trade Executed: {trade_action} @ {entry_price} -> Exit @ {exit_price} | P/L: {profit_loss} pips")
 
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """The shared database stays open for the rest of the process."""
+        self.db = None
 
 # Example usage
 if __name__ == "__main__":
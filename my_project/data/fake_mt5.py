@@ -0,0 +1,676 @@
+# In-process simulated MetaTrader5 broker for load and latency testing on machines without the terminal
+# Implements the part of the MetaTrader5 API the executor, copier, monitors and session broker use
+# (initialize, login, account_info, positions_get, symbol_info(_tick), symbol_select,
+# copy_rates_from_pos, order_send, history_deals_get and the constants) against a FakeBroker that
+# keeps any number of accounts, a seeded random-walk market per symbol, configurable per-call latency
+# and fill rules. Everything is deterministic for a given seed and clock.
+#
+#   from data import fake_mt5
+#   broker = fake_mt5.install(seed=1, latency={"order_send": 0.02})  # before importing strategy_executor
+#   broker.add_account(1001, balance=50000)
+#
+# State lives in this process only: worker processes (copier pool, health probes) importing
+# "MetaTrader5" get their own broker, so load tests should keep use_process_pool off.
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+# --- Constants (values match the MetaTrader5 package) ---
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_SECONDS = {
+    TIMEFRAME_M1: 60, TIMEFRAME_M5: 300, TIMEFRAME_M15: 900, TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600, TIMEFRAME_H4: 14400, TIMEFRAME_D1: 86400,
+}
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_REASON_CLIENT = 0
+DEAL_REASON_EXPERT = 3
+DEAL_REASON_SL = 4
+DEAL_REASON_TP = 5
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_PRICE = 10015
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+RES_S_OK = 1
+RES_E_FAIL = -1
+RES_E_INVALID_PARAMS = -2
+RES_E_NOT_FOUND = -4
+RES_E_AUTH_FAILED = -6
+RES_E_INTERNAL_FAIL = -10000
+
+# --- Result records (same field names as the package's named tuples) ---
+AccountInfo = namedtuple("AccountInfo", [
+    "login", "server", "currency", "leverage", "balance", "equity", "profit", "margin", "margin_free", "margin_level",
+])
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "visible", "digits", "point", "spread", "trade_contract_size", "volume_min", "volume_max",
+    "volume_step", "bid", "ask",
+])
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc"])
+TradePosition = namedtuple("TradePosition", [
+    "ticket", "time", "type", "magic", "identifier", "volume", "price_open", "sl", "tp", "price_current",
+    "swap", "profit", "symbol", "comment",
+])
+TradeDeal = namedtuple("TradeDeal", [
+    "ticket", "order", "time", "type", "entry", "magic", "reason", "position_id", "volume", "price",
+    "commission", "swap", "profit", "symbol", "comment",
+])
+OrderSendResult = namedtuple("OrderSendResult", [
+    "retcode", "deal", "order", "volume", "price", "bid", "ask", "comment", "request_id", "request",
+])
+
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+# name: (starting bid, digits, spread in points, contract size)
+DEFAULT_SYMBOLS = {
+    "EURUSD": (1.0850, 5, 10, 100000), "GBPUSD": (1.2700, 5, 12, 100000), "AUDUSD": (0.6600, 5, 12, 100000),
+    "NZDUSD": (0.6100, 5, 15, 100000), "USDCAD": (1.3600, 5, 15, 100000), "USDCHF": (0.9000, 5, 15, 100000),
+    "USDJPY": (150.00, 3, 12, 100000), "EURJPY": (162.00, 3, 18, 100000), "GBPJPY": (190.00, 3, 25, 100000),
+    "XAUUSD": (2350.00, 2, 30, 100), "BTCUSD": (65000.00, 2, 2000, 1), "ETHUSD": (3500.00, 2, 300, 1),
+}
+
+
+# ManualClock: Deterministic clock for tests; time only moves when advance() is called
+# Code that reads the wall clock itself (BarCache fetch sizes) expects the default time.time clock
+class ManualClock:
+    def __init__(self, start=1_700_000_000.0):
+        self.now = float(start)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+        return self.now
+
+
+# FillRules: How the simulated dealer treats market orders
+# reject_rate/requote_rate are probabilities per order; slippage_points is the largest adverse
+# slippage applied to a fill; orders whose price is further than their deviation from the market
+# are requoted, and stops on the wrong side of the market are refused
+class FillRules:
+    def __init__(self, reject_rate=0.0, requote_rate=0.0, slippage_points=0, check_margin=True, check_stops=True):
+        self.reject_rate = reject_rate
+        self.requote_rate = requote_rate
+        self.slippage_points = slippage_points
+        self.check_margin = check_margin
+        self.check_stops = check_stops
+
+
+# SyntheticMarket: One seeded random walk per symbol, sampled every tick_seconds
+# The path is extended forwards as the clock moves and backwards when older bars are asked for,
+# so only the history that is actually read gets generated
+class _SymbolPath:
+    __slots__ = ("start", "prices", "rng")
+
+    def __init__(self, start, price, rng):
+        self.start = start
+        self.prices = np.array([price], dtype=np.float64)
+        self.rng = rng
+
+
+class SyntheticMarket:
+    def __init__(self, clock, seed=0, volatility=0.00005, tick_seconds=1):
+        self.clock = clock
+        self.seed = seed
+        self.volatility = volatility  # standard deviation of the log return per tick
+        self.tick_seconds = tick_seconds
+        self.paths = {}
+
+    def _path(self, symbol, price):
+        path = self.paths.get(symbol)
+        if path is None:
+            # Seeded per symbol so adding symbols does not change the others' prices
+            rng = np.random.default_rng([self.seed, sum(ord(c) * 131 ** i for i, c in enumerate(symbol)) % 2**32])
+            path = self.paths[symbol] = _SymbolPath(self._step(self.clock()), price, rng)
+        return path
+
+    def _step(self, t):
+        return int(t // self.tick_seconds)
+
+    def _cover(self, path, first_step, last_step):
+        if last_step >= path.start + len(path.prices):
+            count = last_step - (path.start + len(path.prices)) + 1
+            walk = np.exp(np.cumsum(path.rng.normal(0.0, self.volatility, count)))
+            path.prices = np.concatenate([path.prices, path.prices[-1] * walk])
+        if first_step < path.start:
+            count = path.start - first_step
+            walk = np.exp(np.cumsum(path.rng.normal(0.0, self.volatility, count)))
+            path.prices = np.concatenate([(path.prices[0] * walk)[::-1], path.prices])
+            path.start = first_step
+
+    def price(self, symbol, initial):
+        path = self._path(symbol, initial)
+        step = self._step(self.clock())
+        self._cover(path, step, step)
+        return float(path.prices[step - path.start])
+
+    def set_price(self, symbol, price, initial):
+        """Jump the current price (to trigger stops or signals); later ticks walk on from it."""
+        path = self._path(symbol, initial)
+        step = self._step(self.clock())
+        self._cover(path, step, step)
+        i = step - path.start
+        path.prices = np.concatenate([path.prices[:i], [price]])
+
+    def rates(self, symbol, initial, bar_seconds, start_pos, count, spread, digits):
+        """Bars oldest first, like copy_rates_from_pos; position 0 is the still-forming bar."""
+        path = self._path(symbol, initial)
+        now = self._step(self.clock())
+        ticks_per_bar = max(1, bar_seconds // self.tick_seconds)
+        current_bar = now // ticks_per_bar * ticks_per_bar
+        first = current_bar - (start_pos + count - 1) * ticks_per_bar
+        last = min(now, current_bar - start_pos * ticks_per_bar + ticks_per_bar - 1)
+        self._cover(path, first, now)
+
+        segment = path.prices[first - path.start:last - path.start + 1]
+        grid = np.full(count * ticks_per_bar, np.nan)
+        grid[:len(segment)] = segment
+        grid = grid.reshape(count, ticks_per_bar)
+        filled = (~np.isnan(grid)).sum(axis=1)
+
+        rates = np.zeros(count, dtype=RATES_DTYPE)
+        rates["time"] = (first + np.arange(count) * ticks_per_bar) * self.tick_seconds
+        rates["open"] = np.round(grid[:, 0], digits)
+        rates["high"] = np.round(np.nanmax(grid, axis=1), digits)
+        rates["low"] = np.round(np.nanmin(grid, axis=1), digits)
+        rates["close"] = np.round(grid[np.arange(count), filled - 1], digits)
+        rates["tick_volume"] = filled
+        rates["spread"] = spread
+        return rates
+
+
+class _Account:
+    def __init__(self, login, password, server, balance, leverage, currency):
+        self.login = login
+        self.password = password
+        self.server = server
+        self.balance = float(balance)
+        self.leverage = leverage
+        self.currency = currency
+        self.positions = {}  # ticket -> dict of position fields
+        self.deals = []
+
+
+# FakeBroker: Server side of the simulation shared by every session in the process
+# latency is seconds per call, either one number for all calls or {"order_send": 0.05, "*": 0.001};
+# jitter is the +/- fraction applied to it. Unknown logins are created on first login while
+# auto_accounts is on; unknown symbols are created on first use while auto_symbols is on
+class FakeBroker:
+    def __init__(self, seed=0, clock=None, latency=0.0, jitter=0.0, fill_rules=None, symbols=None,
+                 auto_accounts=True, auto_symbols=False, volatility=0.00005, balance=10000.0, first_ticket=100000001):
+        self.clock = clock or time.time
+        self.latency = latency
+        self.jitter = jitter
+        self.fill_rules = fill_rules or FillRules()
+        self.auto_accounts = auto_accounts
+        self.auto_symbols = auto_symbols
+        self.default_balance = balance
+        self.market = SyntheticMarket(self.clock, seed, volatility)
+        self.symbols = dict(DEFAULT_SYMBOLS if symbols is None else symbols)
+        self.accounts = {}
+        self.calls = Counter()  # function name -> number of API calls, for load reports
+        self._rng = random.Random(seed)
+        self._tickets = first_ticket - 1
+        self._lock = threading.RLock()
+
+    # --- Setup ---
+
+    def add_account(self, login, password="", server="FakeBroker-Demo", balance=None, leverage=100, currency="USD"):
+        with self._lock:
+            account = self.accounts[int(login)] = _Account(
+                int(login), password, server, self.default_balance if balance is None else balance, leverage, currency
+            )
+            return account
+
+    def add_symbol(self, name, price=1.0, digits=5, spread=10, contract_size=100000):
+        with self._lock:
+            self.symbols[name] = (price, digits, spread, contract_size)
+
+    def set_price(self, symbol, bid):
+        with self._lock:
+            self.market.set_price(symbol, bid, self._spec(symbol)[0])
+
+    def open_position(self, login, symbol, type, volume, sl=0.0, tp=0.0, magic=0, comment=""):
+        """Open a position directly on the server, as a manual trade in the terminal would. Returns the ticket."""
+        request = {"action": TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume, "type": type,
+                   "sl": sl, "tp": tp, "magic": magic, "comment": comment}
+        with self._lock:
+            result = self._fill(self.accounts[int(login)], request, checked=False)
+        return result.order
+
+    def close_position(self, login, ticket, reason=DEAL_REASON_CLIENT, comment=""):
+        with self._lock:
+            account = self.accounts[int(login)]
+            position = account.positions.get(int(ticket))
+            if position is None:
+                return False
+            self._close(account, position, position["volume"], self._market_exit(position), reason, comment)
+            return True
+
+    # --- Internals (called with the lock held) ---
+
+    def _spec(self, symbol):
+        spec = self.symbols.get(symbol)
+        if spec is None and self.auto_symbols:
+            spec = self.symbols[symbol] = (1.0 + (sum(map(ord, symbol)) % 100) / 100.0, 5, 10, 100000)
+        return spec
+
+    def _quote(self, symbol):
+        price, digits, spread, _ = self._spec(symbol)
+        bid = round(self.market.price(symbol, price), digits)
+        return bid, round(bid + spread * 10 ** -digits, digits)
+
+    def _next_ticket(self):
+        self._tickets += 1
+        return self._tickets
+
+    def _market_exit(self, position):
+        bid, ask = self._quote(position["symbol"])
+        return bid if position["type"] == POSITION_TYPE_BUY else ask
+
+    def _profit(self, position, price):
+        direction = 1 if position["type"] == POSITION_TYPE_BUY else -1
+        return round((price - position["price_open"]) * direction * position["volume"] * position["contract_size"], 2)
+
+    def _mark(self, account):
+        """Revalue open positions at the current tick and close any whose SL or TP has been touched."""
+        for position in list(account.positions.values()):
+            price = self._market_exit(position)
+            position["price_current"] = price
+            position["profit"] = self._profit(position, price)
+            is_buy = position["type"] == POSITION_TYPE_BUY
+            sl, tp = position["sl"], position["tp"]
+            if sl and (price <= sl if is_buy else price >= sl):
+                self._close(account, position, position["volume"], sl, DEAL_REASON_SL, f"[sl {sl}]")
+            elif tp and (price >= tp if is_buy else price <= tp):
+                self._close(account, position, position["volume"], tp, DEAL_REASON_TP, f"[tp {tp}]")
+
+    def _deal(self, account, order, type, entry, reason, position, volume, price, profit, comment):
+        deal = TradeDeal(self._next_ticket(), order, int(self.clock()), type, entry, position["magic"], reason,
+                         position["ticket"], volume, price, 0.0, 0.0, profit, position["symbol"], comment)
+        account.deals.append(deal)
+        return deal
+
+    def _close(self, account, position, volume, price, reason, comment, order=0):
+        profit = self._profit(dict(position, volume=volume), price)
+        close_type = DEAL_TYPE_SELL if position["type"] == POSITION_TYPE_BUY else DEAL_TYPE_BUY
+        deal = self._deal(account, order, close_type, DEAL_ENTRY_OUT, reason, position, volume, price, profit, comment)
+        account.balance += profit
+        position["volume"] = round(position["volume"] - volume, 8)
+        if position["volume"] <= 0:
+            del account.positions[position["ticket"]]
+        return deal
+
+    def _margin_used(self, account):
+        return sum(
+            (p["volume"] * p["contract_size"] * p["price_open"] / account.leverage for p in account.positions.values()),
+            0.0,
+        )
+
+    def _result(self, retcode, request, comment, deal=0, order=0, volume=0.0, price=0.0, quote=(0.0, 0.0)):
+        return OrderSendResult(retcode, deal, order, volume, price, quote[0], quote[1], comment, 0, request)
+
+    def _fill(self, account, request, checked=True):
+        symbol = request.get("symbol")
+        spec = self._spec(symbol) if symbol else None
+        if request.get("action") != TRADE_ACTION_DEAL or spec is None:
+            return self._result(TRADE_RETCODE_INVALID, request, "Invalid request")
+        _, digits, _, contract_size = spec
+        point = 10 ** -digits
+        rules = self.fill_rules
+        quote = self._quote(symbol)
+        bid, ask = quote
+        is_buy = request.get("type") == ORDER_TYPE_BUY
+        market = ask if is_buy else bid
+        volume = float(request.get("volume") or 0.0)
+
+        if volume <= 0 or volume > 100.0 or abs(round(volume / 0.01) * 0.01 - volume) > 1e-9:
+            return self._result(TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume", quote=quote)
+        if checked:
+            if rules.reject_rate and self._rng.random() < rules.reject_rate:
+                return self._result(TRADE_RETCODE_REJECT, request, "Request rejected", quote=quote)
+            price = request.get("price")
+            if price is None or price <= 0:
+                return self._result(TRADE_RETCODE_INVALID_PRICE, request, "Invalid price", quote=quote)
+            if abs(price - market) > request.get("deviation", 0) * point + 1e-12 or (
+                    rules.requote_rate and self._rng.random() < rules.requote_rate):
+                return self._result(TRADE_RETCODE_REQUOTE, request, "Requote", quote=quote)
+        slip = self._rng.randint(0, rules.slippage_points) * point if checked and rules.slippage_points else 0.0
+        fill = round(market + slip if is_buy else market - slip, digits)
+
+        ticket = request.get("position")
+        if ticket:
+            position = account.positions.get(int(ticket))
+            if position is None:
+                return self._result(TRADE_RETCODE_POSITION_CLOSED, request, "Position closed", quote=quote)
+            if (position["type"] == POSITION_TYPE_BUY) == is_buy or volume > position["volume"] + 1e-9:
+                return self._result(TRADE_RETCODE_INVALID, request, "Invalid close", quote=quote)
+            order = self._next_ticket()
+            deal = self._close(account, position, volume, fill, DEAL_REASON_EXPERT, request.get("comment", ""), order)
+            return self._result(TRADE_RETCODE_DONE, request, "Request executed", deal.ticket, order, volume, fill, quote)
+
+        sl, tp = request.get("sl") or 0.0, request.get("tp") or 0.0
+        if checked and rules.check_stops and (
+                (sl and (sl >= bid if is_buy else sl <= ask)) or (tp and (tp <= bid if is_buy else tp >= ask))):
+            return self._result(TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", quote=quote)
+        if checked and rules.check_margin:
+            free = account.balance - self._margin_used(account)
+            if volume * contract_size * fill / account.leverage > free:
+                return self._result(TRADE_RETCODE_NO_MONEY, request, "No money", quote=quote)
+
+        order = self._next_ticket()
+        position = {
+            "ticket": order, "time": int(self.clock()), "type": POSITION_TYPE_BUY if is_buy else POSITION_TYPE_SELL,
+            "magic": request.get("magic", 0), "volume": volume, "price_open": fill, "sl": sl, "tp": tp,
+            "price_current": fill, "profit": 0.0, "symbol": symbol, "comment": request.get("comment", ""),
+            "contract_size": contract_size,
+        }
+        account.positions[order] = position
+        deal = self._deal(account, order, DEAL_TYPE_BUY if is_buy else DEAL_TYPE_SELL, DEAL_ENTRY_IN,
+                          DEAL_REASON_EXPERT if checked else DEAL_REASON_CLIENT, position, volume, fill, 0.0,
+                          position["comment"])
+        return self._result(TRADE_RETCODE_DONE, request, "Request executed", deal.ticket, order, volume, fill, quote)
+
+    def _delay(self, name):
+        latency = self.latency.get(name, self.latency.get("*", 0.0)) if isinstance(self.latency, dict) else self.latency
+        if latency > 0:
+            with self._lock:
+                factor = 1.0 + self.jitter * (2 * self._rng.random() - 1) if self.jitter else 1.0
+            time.sleep(latency * factor)
+
+
+# FakeTerminal: Client side, one per process like the real terminal connection
+# Holds the logged-in account and the last error; the module-level API functions call into it
+class FakeTerminal:
+    def __init__(self, broker):
+        self.broker = broker
+        self.account = None
+        self.error = (RES_S_OK, "Success")
+
+    def _call(self, name):
+        self.broker.calls[name] += 1
+        self.broker._delay(name)
+
+    def _fail(self, code, message):
+        self.error = (code, message)
+        return None
+
+    def _session(self):
+        if self.account is None:
+            return self._fail(RES_E_INTERNAL_FAIL, "Terminal: Not initialized")
+        self.error = (RES_S_OK, "Success")
+        return self.account
+
+    def _authorize(self, login, password, server):
+        broker = self.broker
+        with broker._lock:
+            account = broker.accounts.get(int(login))
+            if account is None and broker.auto_accounts:
+                account = broker.add_account(login, password or "", server or "FakeBroker-Demo")
+            if account is None or (account.password and password != account.password):
+                self.error = (RES_E_AUTH_FAILED, "Authorization failed")
+                return False
+            self.account = account
+            self.error = (RES_S_OK, "Success")
+            return True
+
+    def initialize(self, path=None, login=None, password=None, server=None, timeout=None, portable=False):
+        self._call("initialize")
+        if login is None:
+            self.error = (RES_S_OK, "Success")
+            return True
+        return self._authorize(login, password, server)
+
+    def login(self, login, password=None, server=None, timeout=None):
+        self._call("login")
+        return self._authorize(login, password, server)
+
+    def shutdown(self):
+        self._call("shutdown")
+        self.account = None
+        return True
+
+    def last_error(self):
+        return self.error
+
+    def version(self):
+        return (500, 4000, "01 Jan 2024")
+
+    def account_info(self):
+        self._call("account_info")
+        account = self._session()
+        if account is None:
+            return None
+        broker = self.broker
+        with broker._lock:
+            broker._mark(account)
+            profit = round(sum((p["profit"] for p in account.positions.values()), 0.0), 2)
+            equity = round(account.balance + profit, 2)
+            margin = round(broker._margin_used(account), 2)
+        return AccountInfo(account.login, account.server, account.currency, account.leverage, round(account.balance, 2),
+                           equity, profit, margin, round(equity - margin, 2),
+                           round(equity / margin * 100, 2) if margin else 0.0)
+
+    def positions_total(self):
+        self._call("positions_total")
+        account = self._session()
+        if account is None:
+            return None
+        with self.broker._lock:
+            self.broker._mark(account)
+            return len(account.positions)
+
+    def positions_get(self, symbol=None, group=None, ticket=None):
+        self._call("positions_get")
+        account = self._session()
+        if account is None:
+            return None
+        broker = self.broker
+        with broker._lock:
+            broker._mark(account)
+            return tuple(
+                TradePosition(p["ticket"], p["time"], p["type"], p["magic"], p["ticket"], p["volume"], p["price_open"],
+                              p["sl"], p["tp"], p["price_current"], 0.0, p["profit"], p["symbol"], p["comment"])
+                for p in account.positions.values()
+                if (symbol is None or p["symbol"] == symbol) and (ticket is None or p["ticket"] == ticket)
+            )
+
+    def symbol_info(self, symbol):
+        self._call("symbol_info")
+        if self._session() is None:
+            return None
+        broker = self.broker
+        with broker._lock:
+            spec = broker._spec(symbol)
+            if spec is None:
+                return self._fail(RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+            _, digits, spread, contract_size = spec
+            bid, ask = broker._quote(symbol)
+        return SymbolInfo(symbol, True, digits, 10 ** -digits, spread, contract_size, 0.01, 100.0, 0.01, bid, ask)
+
+    def symbol_info_tick(self, symbol):
+        self._call("symbol_info_tick")
+        if self._session() is None:
+            return None
+        broker = self.broker
+        with broker._lock:
+            if broker._spec(symbol) is None:
+                return self._fail(RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+            bid, ask = broker._quote(symbol)
+            now = broker.clock()
+        return Tick(int(now), bid, ask, 0.0, 0, int(now * 1000))
+
+    def symbol_select(self, symbol, enable=True):
+        self._call("symbol_select")
+        with self.broker._lock:
+            return self._session() is not None and self.broker._spec(symbol) is not None
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self._call("copy_rates_from_pos")
+        if self._session() is None:
+            return None
+        bar_seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if bar_seconds is None or count <= 0:
+            return self._fail(RES_E_INVALID_PARAMS, "Invalid arguments")
+        broker = self.broker
+        with broker._lock:
+            spec = broker._spec(symbol)
+            if spec is None:
+                return self._fail(RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+            return broker.market.rates(symbol, spec[0], bar_seconds, start_pos, count, spec[2], spec[1])
+
+    def order_send(self, request):
+        self._call("order_send")
+        account = self._session()
+        if account is None:
+            return None
+        broker = self.broker
+        with broker._lock:
+            broker._mark(account)
+            return broker._fill(account, request)
+
+    def history_deals_get(self, date_from=None, date_to=None, group=None, ticket=None, position=None):
+        self._call("history_deals_get")
+        account = self._session()
+        if account is None:
+            return None
+        with self.broker._lock:
+            deals = account.deals
+            if position is not None:
+                return tuple(d for d in deals if d.position_id == position)
+            if ticket is not None:
+                return tuple(d for d in deals if d.order == ticket)
+            start = _timestamp(date_from, 0)
+            end = _timestamp(date_to, math.inf)
+            return tuple(d for d in deals if start <= d.time <= end)
+
+
+def _timestamp(value, default):
+    if value is None:
+        return default
+    return value.timestamp() if hasattr(value, "timestamp") else value
+
+
+# --- Module-level API: the functions the MetaTrader5 package exports ---
+
+_terminal = None
+
+
+def _current():
+    global _terminal
+    if _terminal is None:
+        _terminal = FakeTerminal(FakeBroker())
+    return _terminal
+
+
+def initialize(*args, **kwargs):
+    return _current().initialize(*args, **kwargs)
+
+
+def login(*args, **kwargs):
+    return _current().login(*args, **kwargs)
+
+
+def shutdown():
+    return _current().shutdown()
+
+
+def last_error():
+    return _current().last_error()
+
+
+def version():
+    return _current().version()
+
+
+def account_info():
+    return _current().account_info()
+
+
+def positions_total():
+    return _current().positions_total()
+
+
+def positions_get(**kwargs):
+    return _current().positions_get(**kwargs)
+
+
+def symbol_info(symbol):
+    return _current().symbol_info(symbol)
+
+
+def symbol_info_tick(symbol):
+    return _current().symbol_info_tick(symbol)
+
+
+def symbol_select(symbol, enable=True):
+    return _current().symbol_select(symbol, enable)
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    return _current().copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+
+def order_send(request):
+    return _current().order_send(request)
+
+
+def history_deals_get(*args, **kwargs):
+    return _current().history_deals_get(*args, **kwargs)
+
+
+def get_fake_broker():
+    return _current().broker
+
+
+def install(broker=None, **options):
+    """Register this module as MetaTrader5 for the process, backed by `broker` (or FakeBroker(**options)).
+
+    Call before anything imports MetaTrader5; returns the broker so tests can add accounts and move prices.
+    """
+    global _terminal
+    _terminal = FakeTerminal(broker or FakeBroker(**options))
+    sys.modules["MetaTrader5"] = sys.modules[__name__]
+    return _terminal.broker
+
+
+def uninstall():
+    global _terminal
+    if sys.modules.get("MetaTrader5") is sys.modules[__name__]:
+        del sys.modules["MetaTrader5"]
+    _terminal = None
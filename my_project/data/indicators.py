@@ -0,0 +1,349 @@
+# Incremental indicator engine used by StrategyEvaluator
+# Every indicator keeps O(1) rolling state that is advanced once per closed bar (update) and can
+# report its value for the still-forming bar without mutating that state (peek). The formulas follow
+# pandas_ta's defaults (SMA-seeded EMA, Wilder RMA for RSI, population std for Bollinger Bands) and
+# match data/vector_indicators.py (tests/test_indicators.py checks both against reference formulas).
+#
+# Warm-up: an engine is seeded from the first window it is fed, so its first values equal a recompute
+# over that window. After that it only advances, which gives two kinds of indicators:
+# - windowed ones (SMA, Bollinger Bands, Stochastic, MA shift) depend only on the last few bars and
+#   stay identical to a recompute over the latest window (the batch path in batch_evaluator.py);
+# - recursive ones (EMA/MACD, RMA/RSI) keep memory of every bar since the seed, while a per-window
+#   recompute restarts them at the window's first bar. They drift apart by a term that decays as
+#   (1 - alpha) ** window, e.g. a few hundredths of an RSI point for RSI(14) on 100 bars. The
+#   incremental value is the closer one to an indicator computed over the full history.
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+class SMA:
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.total = 0.0
+
+    def _dropped(self):
+        return self.window[0] if len(self.window) == self.length else 0.0
+
+    def peek(self, x):
+        if math.isnan(x) or len(self.window) + 1 < self.length:
+            return NAN
+        return (self.total + x - self._dropped()) / self.length
+
+    def update(self, x):
+        if math.isnan(x):
+            return NAN
+        value = self.peek(x)
+        self.total += x - self._dropped()
+        if len(self.window) == self.length:
+            self.window.popleft()
+        self.window.append(x)
+        return value
+
+
+# Population standard deviation (ddof=0); sums are kept relative to the first value seen
+# so tiny FX variances do not cancel out against large squared prices
+class RollingStd:
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.anchor = None
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _value(self, total, total_sq):
+        mean = total / self.length
+        return math.sqrt(max(0.0, total_sq / self.length - mean * mean))
+
+    def peek(self, x):
+        if len(self.window) + 1 < self.length:
+            return NAN
+        anchor = x if self.anchor is None else self.anchor
+        d = x - anchor
+        total, total_sq = self.total + d, self.total_sq + d * d
+        if len(self.window) == self.length:
+            old = self.window[0] - anchor
+            total, total_sq = total - old, total_sq - old * old
+        return self._value(total, total_sq)
+
+    def update(self, x):
+        value = self.peek(x)
+        if self.anchor is None:
+            self.anchor = x
+        d = x - self.anchor
+        self.total += d
+        self.total_sq += d * d
+        if len(self.window) == self.length:
+            old = self.window.popleft() - self.anchor
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(x)
+        return value
+
+
+# Rolling min/max over the last `length` values using a monotonic deque of (index, value)
+class RollingExtreme:
+    def __init__(self, length, use_max):
+        self.length = length
+        self.better = (lambda a, b: a >= b) if use_max else (lambda a, b: a <= b)
+        self.entries = deque()
+        self.count = 0
+
+    def peek(self, x):
+        if self.count + 1 < self.length:
+            return NAN
+        oldest = self.count + 1 - self.length
+        best = x
+        for index, value in self.entries:
+            if index >= oldest:
+                if not self.better(best, value):
+                    best = value
+                break
+        return best
+
+    def update(self, x):
+        value = self.peek(x)
+        while self.entries and self.better(x, self.entries[-1][1]):
+            self.entries.pop()
+        self.entries.append((self.count, x))
+        self.count += 1
+        while self.entries[0][0] <= self.count - 1 - self.length:
+            self.entries.popleft()
+        return value
+
+
+# pandas_ta ema(): the first value is the SMA of the first `length` inputs, then alpha = 2 / (length + 1)
+class EMA:
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.count = 0
+        self.seed_total = 0.0
+        self.value = NAN
+
+    def peek(self, x):
+        if math.isnan(x):
+            return NAN
+        if self.count + 1 < self.length:
+            return NAN
+        if self.count + 1 == self.length:
+            return (self.seed_total + x) / self.length
+        return self.value + self.alpha * (x - self.value)
+
+    def update(self, x):
+        if math.isnan(x):
+            return NAN
+        self.value = self.peek(x)
+        if self.count < self.length:
+            self.seed_total += x
+        self.count += 1
+        return self.value
+
+
+# pandas_ta rma(): ewm(alpha=1/length, adjust=True, min_periods=length), kept as a running
+# weighted sum and weight so each step is O(1)
+class RMA:
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.count = 0
+        self.weighted = 0.0
+        self.weight = 0.0
+
+    def peek(self, x):
+        if self.count + 1 < self.length:
+            return NAN
+        return (x + self.decay * self.weighted) / (1.0 + self.decay * self.weight)
+
+    def update(self, x):
+        value = self.peek(x)
+        self.weighted = x + self.decay * self.weighted
+        self.weight = 1.0 + self.decay * self.weight
+        self.count += 1
+        return value
+
+
+class RSI:
+    def __init__(self, length):
+        self.gain = RMA(length)
+        self.loss = RMA(length)
+        self.prev = None
+
+    def _split(self, x):
+        diff = x - self.prev
+        return max(diff, 0.0), abs(min(diff, 0.0))
+
+    def peek(self, x):
+        if self.prev is None:
+            return NAN
+        up, down = self._split(x)
+        avg_up, avg_down = self.gain.peek(up), self.loss.peek(down)
+        return 100.0 * avg_up / (avg_up + avg_down) if avg_up + avg_down else NAN
+
+    def update(self, x):
+        if self.prev is None:
+            self.prev = x
+            return NAN
+        up, down = self._split(x)
+        avg_up, avg_down = self.gain.update(up), self.loss.update(down)
+        self.prev = x
+        return 100.0 * avg_up / (avg_up + avg_down) if avg_up + avg_down else NAN
+
+
+# MACD line = EMA(fast) - EMA(slow); the signal EMA starts at the first valid MACD value
+class MACD:
+    def __init__(self, fast, slow, signal):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def peek(self, x):
+        macd = self.fast.peek(x) - self.slow.peek(x)
+        return macd, self.signal.peek(macd)
+
+    def update(self, x):
+        macd = self.fast.update(x) - self.slow.update(x)
+        return macd, self.signal.update(macd)
+
+
+class Bollinger:
+    def __init__(self, length, std):
+        self.mid = SMA(length)
+        self.dev = RollingStd(length)
+        self.std = std
+
+    def _bands(self, mid, dev):
+        return mid - self.std * dev, mid, mid + self.std * dev
+
+    def peek(self, x):
+        return self._bands(self.mid.peek(x), self.dev.peek(x))
+
+    def update(self, x):
+        return self._bands(self.mid.update(x), self.dev.update(x))
+
+
+# pandas_ta stoch(): raw %K over k bars, smoothed by SMA(smooth_k), %D = SMA(d) of the smoothed %K
+class Stochastic:
+    def __init__(self, k, d, smooth_k):
+        self.lowest = RollingExtreme(k, use_max=False)
+        self.highest = RollingExtreme(k, use_max=True)
+        self.k = SMA(smooth_k)
+        self.d = SMA(d)
+
+    @staticmethod
+    def _raw(close, low, high):
+        if math.isnan(low) or math.isnan(high):
+            return NAN
+        span = high - low
+        return 100.0 * (close - low) / (span if span else 2.220446049250313e-16)
+
+    def peek(self, high, low, close):
+        raw = self._raw(close, self.lowest.peek(low), self.highest.peek(high))
+        k = self.k.peek(raw)
+        return k, self.d.peek(k)
+
+    def update(self, high, low, close):
+        raw = self._raw(close, self.lowest.update(low), self.highest.update(high))
+        k = self.k.update(raw)
+        return k, self.d.update(k)
+
+
+def _setting(config, name):
+    return int(config["sub_indicators"][name]["value"])
+
+
+# IndicatorEngine: Builds the indicators a saved strategy enables and advances them bar by bar
+# update() commits a closed bar; preview() returns the values as they would be with the
+# forming bar appended. Values are keyed the same way for both:
+#   RSI, MACD, MACD_signal, BBL, BBM, BBU, STOCHk, STOCHd, SMA, SMA_shifted
+class IndicatorEngine:
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.last_time = None
+        self.values = {}
+        self.rsi = self.macd = self.bbands = self.stoch = self.sma = None
+        self.sma_history = deque()
+        self.sma_shift = 0
+
+        def enabled(name):
+            return name in strategy and strategy[name].get("var")
+
+        if enabled("RSI"):
+            self.rsi = RSI(_setting(strategy["RSI"], "Period"))
+        if enabled("MACD"):
+            cfg = strategy["MACD"]
+            self.macd = MACD(_setting(cfg, "Fast EMA"), _setting(cfg, "Slow EMA"), _setting(cfg, "MACD SMA"))
+        if enabled("Bollinger Bands"):
+            cfg = strategy["Bollinger Bands"]
+            self.bbands = Bollinger(_setting(cfg, "Period"), _setting(cfg, "Deviation"))
+        if enabled("Stochastic Oscillator"):
+            cfg = strategy["Stochastic Oscillator"]
+            self.stoch = Stochastic(_setting(cfg, "%K Period"), _setting(cfg, "%D Period"), _setting(cfg, "Slowing"))
+        if enabled("Moving Average"):
+            cfg = strategy["Moving Average"]
+            self.sma = SMA(_setting(cfg, "Period"))
+            self.sma_shift = _setting(cfg, "Shift")
+
+    def reset(self):
+        self.__init__(self.strategy)
+
+    def _step(self, high, low, close, commit):
+        values = {"close": close}
+        if self.rsi:
+            values["RSI"] = self.rsi.update(close) if commit else self.rsi.peek(close)
+        if self.macd:
+            values["MACD"], values["MACD_signal"] = self.macd.update(close) if commit else self.macd.peek(close)
+        if self.bbands:
+            values["BBL"], values["BBM"], values["BBU"] = self.bbands.update(close) if commit else self.bbands.peek(close)
+        if self.stoch:
+            values["STOCHk"], values["STOCHd"] = (
+                self.stoch.update(high, low, close) if commit else self.stoch.peek(high, low, close)
+            )
+        if self.sma:
+            sma = self.sma.update(close) if commit else self.sma.peek(close)
+            values["SMA"] = sma
+            # Value `shift` bars back from this one, i.e. df[SMA].iloc[-(1 + shift)]
+            history = self.sma_history
+            values["SMA_shifted"] = sma if self.sma_shift == 0 else (
+                history[-self.sma_shift] if len(history) >= self.sma_shift else NAN
+            )
+            if commit and self.sma_shift:
+                history.append(sma)
+                if len(history) > self.sma_shift:
+                    history.popleft()
+        return values
+
+    def update(self, time, high, low, close):
+        self.last_time = time
+        self.values = self._step(float(high), float(low), float(close), commit=True)
+        return self.values
+
+    def preview(self, high, low, close):
+        return self._step(float(high), float(low), float(close), commit=False)
+
+    def feed(self, rates):
+        """Advance over the closed bars in `rates` that are newer than the last committed one and
+        return the values including the forming (last) bar. `rates` is anything indexable by
+        column name with time/high/low/close (MT5 rates array or DataFrame).
+        If the window no longer overlaps what was committed, the state is rebuilt from it (see the
+        module header for how recursive indicators then differ from a per-window recompute)."""
+        times, highs, lows, closes = rates["time"], rates["high"], rates["low"], rates["close"]
+        times = getattr(times, "values", times)
+        highs, lows, closes = getattr(highs, "values", highs), getattr(lows, "values", lows), getattr(closes, "values", closes)
+        n = len(closes)
+        if n == 0:
+            return {}
+
+        start = 0
+        if self.last_time is not None:
+            if times[0] > self.last_time:
+                self.reset()  # gap: the window starts after our last committed bar
+            else:
+                start = n - 1
+                while start > 0 and times[start - 1] > self.last_time:
+                    start -= 1
+        for i in range(start, n - 1):
+            self.update(times[i], highs[i], lows[i], closes[i])
+        return self.preview(highs[-1], lows[-1], closes[-1])
@@ -0,0 +1,175 @@
+# In-process metrics for the trading hot paths: labelled counters and latency histograms
+# Recording is a tuple-keyed dict lookup, a bisect and a few additions under the metric's lock, cheap
+# enough to wrap every MT5 call. The registry renders the Prometheus text format (GET /metrics on the
+# daemon and on the GUI's local endpoint) and summarizes histograms for the account page panel.
+# Metrics are per process: copier pool and health probe workers keep their own, unpublished copies.
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds, from sub-millisecond local work up to slow broker round trips
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Counter: Monotonic count per label combination; labels are passed positionally in labelnames order
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+# Histogram: Bucketed observations per label combination, plus their sum and count
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _copy(self):
+        with self._lock:
+            return sorted((labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items())
+
+    def quantile(self, counts, count, q):
+        """Estimate a quantile from bucket counts by interpolating inside the bucket that holds it."""
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return 0.0
+
+    def render(self):
+        lines = []
+        for labels, counts, total, count in self._copy():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+    def summary(self):
+        return [
+            {"name": self.name, "labels": dict(zip(self.labelnames, labels)), "count": count, "total": total,
+             "mean": total / count, "p50": self.quantile(counts, count, 0.5), "p95": self.quantile(counts, count, 0.95)}
+            for labels, counts, total, count in self._copy() if count
+        ]
+
+
+# MetricsRegistry: Named metrics of one process; asking for an existing name returns that metric
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labelnames, **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with different type or labels")
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Every histogram series with count, mean, p50 and p95 (seconds), most total time first."""
+        with self._lock:
+            histograms = [m for m in self._metrics.values() if isinstance(m, Histogram)]
+        rows = [row for metric in histograms for row in metric.summary()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    """Process-wide registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def metrics_route():
+    """StatusServer route for GET /metrics."""
+    return CONTENT_TYPE, get_metrics().render()
@@ -1,21 +1,22 @@
-import MetaTrader5 as mt5
+from data.mt5_session import get_broker, MT5Account, MT5SessionError, DEFAULT_TERMINAL_PATH
 
-def connect_mt5(login, password, server, path="C:/Program Files/MetaTrader 5/terminal64.exe"):
-    """Connect to MetaTrader 5 with explicit terminal path."""
+def connect_mt5(login, password, server, path=DEFAULT_TERMINAL_PATH):
+    """Connect to MetaTrader 5 through the shared session broker (path is used on first initialization)."""
     try:
-        if not mt5.initialize(path):
-            return False, f"Initialization failed: {mt5.last_error()}"
+        broker = get_broker(path)
 
-        authorized = mt5.login(int(login), password=password, server=server)
-        if not authorized:
-            return False, f"Login failed: {mt5.last_error()}"
+        def fetch(mt5):
+            return mt5.account_info(), mt5.positions_get()
+
+        try:
+            account_info, positions = broker.run(MT5Account(str(login), password, server), fetch)
+        except MT5SessionError as e:
+            return False, f"Login failed: {e}"
 
-        account_info = mt5.account_info()
         if account_info is None:
             return False, "Failed to retrieve account info after login."
-        
-        
-        positions = mt5.positions_get()
+
+
         trade_count = len(positions) if positions else 0
         account_data = account_info._asdict()
         account_data["positions"] = trade_count
@@ -0,0 +1,294 @@
+# Owns the single MetaTrader5 terminal connection shared by the executor, copier and monitors
+# All MT5 calls are queued per account and run on one worker thread, so the process-global
+# MetaTrader5 handle is never used concurrently and logins only switch when the account changes
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+from data.metrics import get_metrics
+
+DEFAULT_TERMINAL_PATH = "C:/Program Files/MetaTrader 5/terminal64.exe"
+
+# Credentials for one trading account; login is kept as the string stored in accounts.json
+# path optionally pins the account to its own terminal install (needed for one process per account)
+MT5Account = namedtuple("MT5Account", ["login", "password", "server", "path"], defaults=[None])
+
+
+def separate_terminals(accounts):
+    """True when every account pins its own terminal install (MT5Account.path) and no two share one.
+    Only then may accounts be driven from separate processes: a terminal logged into another account
+    by a second process would silently redirect this process's calls, order_send included."""
+    paths = [os.path.normcase(os.path.normpath(account.path)) if account.path else None for account in accounts]
+    return all(paths) and len(set(paths)) == len(paths)
+
+
+class MT5SessionError(Exception):
+    """Raised when the terminal cannot be initialized or logged into the requested account."""
+
+
+def as_account(account):
+    """Normalize an accounts.json dict (or an MT5Account) into an MT5Account."""
+    if isinstance(account, MT5Account):
+        return account
+    return MT5Account(str(account["login"]), account["password"], account["server"], account.get("path"))
+
+
+MT5_CALL_SECONDS = get_metrics().histogram(
+    "mt5_call_seconds", "Time spent inside MetaTrader5 API calls", ("function", "account"))
+MT5_ORDERS = get_metrics().counter(
+    "mt5_orders_total", "order_send results by return code", ("account", "symbol", "retcode"))
+MT5_LOGIN_SWITCHES = get_metrics().counter(
+    "mt5_session_switches_total", "initialize/login calls made to change the active account", ("account",))
+
+
+# _TimedMT5: What session jobs receive instead of the bare module; every API call is timed and
+# labelled with the active account, so broker latency shows up apart from our own processing
+class _TimedMT5:
+    def __init__(self, mt5, session):
+        self._mt5 = mt5
+        self._session = session
+
+    def __getattr__(self, name):
+        value = getattr(self._mt5, name)
+        if callable(value):
+            value = self._timed(name, value)
+        setattr(self, name, value)  # later lookups skip __getattr__
+        return value
+
+    def _timed(self, name, fn):
+        session = self._session
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                account = session._current_login or ""
+                if name in ("initialize", "login"):
+                    account = str(kwargs.get("login") or (args[0] if name == "login" and args else account))
+                MT5_CALL_SECONDS.observe(time.perf_counter() - started, name, account)
+                if name == "order_send" and args:
+                    MT5_ORDERS.inc(account, args[0].get("symbol", ""),
+                                   str(result.retcode) if result is not None else "none")
+        return call
+
+
+class _Job:
+    __slots__ = ("account", "fn", "future")
+
+    def __init__(self, account, fn):
+        self.account = account
+        self.fn = fn
+        self.future = Future()
+
+
+# MT5SessionBroker: Serializes every MT5 request through one worker thread
+# Pending jobs are grouped by account; the worker keeps draining the active account's queue
+# (up to max_batch jobs) before switching, and only calls mt5.login when the account differs
+class MT5SessionBroker:
+    def __init__(self, mt5_module=None, path=None, max_batch=32):
+        if mt5_module is None:
+            import MetaTrader5 as mt5_module
+        self.mt5 = mt5_module
+        self._timed_mt5 = _TimedMT5(mt5_module, self)
+        self.path = path
+        self.max_batch = max_batch
+        self._pending = OrderedDict()  # login -> list of _Job, oldest account first
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._initialized = False
+        self._current_login = None
+        self._must_yield = False
+        self._last_errors = {}
+        self.login_switches = 0
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, name="mt5-session", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the worker and release the terminal; pending jobs fail with MT5SessionError."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        for jobs in self._pending.values():
+            for job in jobs:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(MT5SessionError("Session broker stopped"))
+        self._pending.clear()
+        if self._initialized:
+            self.mt5.shutdown()
+        self._initialized = False
+        self._current_login = None
+
+    @property
+    def current_login(self):
+        return self._current_login
+
+    # ---- generic entry points -------------------------------------------------
+
+    def submit(self, account, fn):
+        """Queue fn(mt5) to run while `account` is the active session. Returns a Future."""
+        account = as_account(account)
+        job = _Job(account, fn)
+        with self._cond:
+            if not self._running:
+                raise MT5SessionError("Session broker is not running")
+            self._pending.setdefault(account.login, []).append(job)
+            self._cond.notify()
+        return job.future
+
+    def run(self, account, fn, timeout=None):
+        """Run fn(mt5) on the account's session and wait for its result.
+        Use this for dependent call sequences (tick -> order_send) that must not be interleaved."""
+        return self.submit(account, fn).result(timeout)
+
+    def batch(self, account, calls, timeout=None):
+        """Run several (name, args, kwargs) MT5 calls back to back on one session switch."""
+        def run_calls(mt5):
+            return [getattr(mt5, name)(*args, **(kwargs or {})) for name, args, kwargs in calls]
+        return self.run(account, run_calls, timeout)
+
+    def call(self, account, name, *args, **kwargs):
+        return self.run(account, lambda mt5: getattr(mt5, name)(*args, **kwargs))
+
+    def connect(self, account):
+        """Make sure the account can be logged into. Returns True/False like mt5.initialize."""
+        try:
+            self.run(account, lambda mt5: True)
+            return True
+        except MT5SessionError:
+            return False
+
+    def last_error(self, account):
+        """Last MT5 error recorded while the given account was active."""
+        return self._last_errors.get(as_account(account).login)
+
+    # ---- typed API shared by executor, copier and monitors ---------------------
+
+    def account_info(self, account):
+        return self.call(account, "account_info")
+
+    def positions_get(self, account, symbol=None):
+        if symbol is None:
+            return self.call(account, "positions_get")
+        return self.call(account, "positions_get", symbol=symbol)
+
+    def symbol_info(self, account, symbol):
+        return self.call(account, "symbol_info", symbol)
+
+    def symbol_info_tick(self, account, symbol):
+        return self.call(account, "symbol_info_tick", symbol)
+
+    def symbol_select(self, account, symbol, enable=True):
+        return self.call(account, "symbol_select", symbol, enable)
+
+    def copy_rates_from_pos(self, account, symbol, timeframe, start, count):
+        return self.call(account, "copy_rates_from_pos", symbol, timeframe, start, count)
+
+    def order_send(self, account, request):
+        return self.call(account, "order_send", request)
+
+    # ---- worker -----------------------------------------------------------------
+
+    def _next_jobs(self):
+        """Pick the jobs to run next, preferring the account that is already logged in."""
+        login = self._current_login
+        if login not in self._pending or self._must_yield:
+            login = next(iter(self._pending))
+        jobs = self._pending.pop(login)
+        taken, rest = jobs[:self.max_batch], jobs[self.max_batch:]
+        if rest:
+            # Re-queue behind other accounts so a busy account cannot starve the rest
+            self._pending[login] = rest
+        self._must_yield = bool(rest) and len(self._pending) > 1
+        return taken
+
+    def _activate(self, account):
+        mt5 = self._timed_mt5
+        if self._current_login != account.login:
+            MT5_LOGIN_SWITCHES.inc(account.login)
+        if not self._initialized:
+            kwargs = {"login": int(account.login), "password": account.password, "server": account.server}
+            path = account.path or self.path
+            ok = mt5.initialize(path, **kwargs) if path else mt5.initialize(**kwargs)
+            if not ok:
+                raise MT5SessionError(f"Initialization failed for {account.login}: {mt5.last_error()}")
+            self._initialized = True
+            self._current_login = account.login
+            self.login_switches += 1
+            return
+        if self._current_login != account.login:
+            self._current_login = None
+            if not mt5.login(int(account.login), password=account.password, server=account.server):
+                raise MT5SessionError(f"Login failed for {account.login}: {mt5.last_error()}")
+            self._current_login = account.login
+            self.login_switches += 1
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                jobs = self._next_jobs()
+
+            account = jobs[0].account
+            try:
+                self._activate(account)
+            except Exception as e:
+                error = e if isinstance(e, MT5SessionError) else MT5SessionError(str(e))
+                self._last_errors[account.login] = self.mt5.last_error()
+                for job in jobs:
+                    # Futures the caller already cancelled are skipped; set_exception would raise on them
+                    if job.future.set_running_or_notify_cancel():
+                        job.future.set_exception(error)
+                continue
+
+            for job in jobs:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = job.fn(self._timed_mt5)
+                except Exception as e:
+                    job.future.set_exception(e)
+                    continue
+                if result is None:
+                    self._last_errors[account.login] = self.mt5.last_error()
+                job.future.set_result(result)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker(path=None):
+    """Return the process-wide broker, creating and starting it on first use."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = MT5SessionBroker(path=path).start()
+        return _broker
+
+
+def set_broker(broker):
+    """Install a broker (e.g. one built on a fake MT5 module) as the process-wide instance."""
+    global _broker
+    with _broker_lock:
+        if _broker is not None and _broker is not broker:
+            _broker.stop()
+        _broker = broker.start() if broker is not None else None
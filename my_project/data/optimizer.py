@@ -0,0 +1,401 @@
+# Parameter-sweep optimizer for strategy settings
+# Takes value ranges for the sub-indicator settings of the strategy JSON schema, backtests every
+# combination (grid) or a random sample of them on historical bars, and stores the ranked results in
+# DuckDB. Each combination is laid over a base strategy (the saved one unless --standalone) whose
+# unswept settings fall back to the strategy page defaults, so every indicator is fully configured.
+# Combinations are split into contiguous chunks and evaluated by a spawn-context process pool;
+# inside each worker the indicator series (RSI per period, EMA per length, SMA/stdev per period, raw
+# %K per period) and the resulting signal arrays are memoized, so combos that only differ in a
+# threshold or one indicator reuse everything else.
+# Usage: python -m data.optimizer ranges.json EURUSD+=eurusd.csv [--mode random --samples 500]
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from data import vector_indicators as vi
+from data.backtester import load_bars, simulate_direction, trade_stats, merge_trades, RESET_MINUTES
+from data.batch_evaluator import indicator_signals, consensus, enabled_indicators
+
+METRICS = ("profit", "total_pips", "profit_factor", "win_rate")
+SERIES_CACHE_SIZE = 32   # indicator series kept per symbol in each worker
+SIGNAL_CACHE_SIZE = 256  # per-indicator signal arrays kept per symbol in each worker
+CHUNKS_IN_FLIGHT = 4     # chunks queued per worker; the rest of the grid is generated as they finish
+
+# The values the strategy page pre-fills; settings neither swept nor saved are backtested with these
+DEFAULT_SETTINGS = {
+    "RSI": {"Period": 14, "Undersold": 30, "Oversold": 70},
+    "MACD": {"Fast EMA": 12, "Slow EMA": 26, "MACD SMA": 9},
+    "Bollinger Bands": {"Period": 20, "Deviation": 2, "Shift": 0},
+    "Stochastic Oscillator": {"%K Period": 5, "%D Period": 3, "Slowing": 3},
+    "Moving Average": {"Period": 10, "Shift": 0},
+}
+
+
+def expand_range(spec):
+    """Values for one setting: a list as given, {"start", "stop", "step"} inclusive, or a single value."""
+    if isinstance(spec, dict):
+        start, stop, step = spec["start"], spec["stop"], spec.get("step", 1)
+        count = int(round((stop - start) / step)) + 1
+        return [start + i * step for i in range(count)]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def base_strategy(ranges, saved=None):
+    """The strategy every combination is laid over: the saved strategy (if any) with each swept
+    indicator enabled, and every setting missing from it filled in from DEFAULT_SETTINGS."""
+    base = copy.deepcopy(saved or {})
+    for name in ranges:
+        config = base.get(name)
+        if not config or "sub_indicators" not in config:
+            config = base[name] = {"var": 1, "sub_indicators": {}}
+        config["var"] = 1
+    for name, config in base.items():
+        if "sub_indicators" in config:
+            for setting, value in DEFAULT_SETTINGS.get(name, {}).items():
+                config["sub_indicators"].setdefault(setting, {"value": value})
+    return base
+
+
+# ParameterSpace: The swept settings as (indicator, setting, values), in the order given
+# A combination is one value index per setting; indexes decode like a mixed-radix number so random
+# samples can be drawn without materializing the whole grid
+class ParameterSpace:
+    def __init__(self, ranges, base=None):
+        self.params = [
+            (indicator, setting, expand_range(spec))
+            for indicator, settings in ranges.items()
+            for setting, spec in settings.items()
+        ]
+        self.base = base_strategy(ranges, base)
+
+    def __len__(self):
+        size = 1
+        for _, _, values in self.params:
+            size *= len(values)
+        return size
+
+    def decode(self, index):
+        values = []
+        for _, _, options in reversed(self.params):
+            index, digit = divmod(index, len(options))
+            values.append(options[digit])
+        return tuple(reversed(values))
+
+    def grid(self):
+        return itertools.product(*(values for _, _, values in self.params))
+
+    def sample(self, count, seed=None):
+        rng = random.Random(seed)
+        size = len(self)
+        indexes = rng.sample(range(size), min(count, size))
+        # Sorted so neighbouring combos share series and land in the same chunk
+        return [self.decode(i) for i in sorted(indexes)]
+
+    def strategy(self, combo):
+        """Strategy dict in the saved JSON schema for one combination."""
+        strategy = {
+            name: dict(config, sub_indicators=dict(config["sub_indicators"])) if "sub_indicators" in config else config
+            for name, config in self.base.items()
+        }
+        for (indicator, setting, _), value in zip(self.params, combo):
+            strategy[indicator]["sub_indicators"][setting] = {"value": value}
+        return strategy
+
+
+# Same rules the strategy page enforces on save, plus MACD fast < slow, for the enabled indicators
+# Saved values are the strategy page's entry strings, so they are compared as numbers like the signal code does
+def is_valid(strategy):
+    enabled = enabled_indicators(strategy)
+
+    def value(indicator, setting):
+        return float(strategy[indicator]["sub_indicators"][setting]["value"])
+
+    try:
+        if "RSI" in enabled and not (value("RSI", "Undersold") < 50 < value("RSI", "Oversold")):
+            return False
+        if "MACD" in enabled and not value("MACD", "Fast EMA") < value("MACD", "Slow EMA"):
+            return False
+        for indicator in enabled:
+            for setting in strategy[indicator].get("sub_indicators", {}):
+                if setting != "Shift" and value(indicator, setting) <= 0:
+                    return False
+    except (KeyError, TypeError, ValueError):
+        return False  # a saved setting that is missing or not a number
+    return True
+
+
+class _LRU(OrderedDict):
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def get_or_compute(self, key, compute):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        value = self[key] = compute()
+        if len(self) > self.size:
+            self.popitem(last=False)
+        return value
+
+
+# CachedIndicators: Stand-in for vector_indicators bound to one symbol's bars
+# Has the signatures indicator_signals calls, but the price arguments are assumed to be this
+# instance's own arrays, so results are memoized by their parameters alone
+class CachedIndicators:
+    def __init__(self, close, high, low, size=SERIES_CACHE_SIZE):
+        self.close, self.high, self.low = vi.as_2d(close), vi.as_2d(high), vi.as_2d(low)
+        self.cache = _LRU(size)
+        self.shift = vi.shift
+
+    def _get(self, key, compute):
+        return self.cache.get_or_compute(key, compute)
+
+    def rsi(self, close, length):
+        return self._get(("rsi", length), lambda: vi.rsi(self.close, length))
+
+    def ema(self, length):
+        return self._get(("ema", length), lambda: vi.ema(self.close, length))
+
+    def sma(self, close, length):
+        return self._get(("sma", length), lambda: vi.sma(self.close, length))
+
+    def stdev(self, length):
+        return self._get(("stdev", length), lambda: vi.stdev(self.close, length))
+
+    def macd(self, close, fast, slow, signal):
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            return line, vi.ema(line, signal)
+        return self._get(("macd", fast, slow, signal), compute)
+
+    def bbands(self, close, length, std):
+        mid = self.sma(close, length)
+        dev = self.stdev(length)
+        return mid - std * dev, mid, mid + std * dev
+
+    def stoch(self, high, low, close, k, d, smooth_k):
+        raw = self._get(("stoch_raw", k), lambda: vi.stoch_raw(self.high, self.low, self.close, k))
+        return vi.stoch_smooth(raw, d, smooth_k)
+
+
+# Per-worker state, set once by _init_worker so the bars are pickled once per process
+_context = {}
+
+
+def _init_worker(space, data, options):
+    symbols = {}
+    for symbol, bars in data.items():
+        symbols[symbol] = {
+            "bars": bars,
+            "calc": CachedIndicators(bars["close"], bars["high"], bars["low"]),
+            "signals": _LRU(SIGNAL_CACHE_SIZE),
+        }
+    _context.update(space=space, symbols=symbols, options=options)
+
+
+def _signal(state, name, config):
+    key = (name, tuple(sorted((k, v["value"]) for k, v in config["sub_indicators"].items())))
+
+    def compute():
+        calc = state["calc"]
+        return indicator_signals({name: config}, calc.close, calc.high, calc.low, calc=calc)[name][0]
+    return state["signals"].get_or_compute(key, compute)
+
+
+def _evaluate(combo):
+    space, options = _context["space"], _context["options"]
+    strategy = space.strategy(combo)
+    if not is_valid(strategy):
+        return None
+    trades = []
+    for symbol, state in _context["symbols"].items():
+        signals = {name: _signal(state, name, strategy[name]) for name in enabled_indicators(strategy)}
+        trades.append(simulate_direction(symbol, state["bars"], consensus(signals), **options))
+    return trade_stats(merge_trades(trades))
+
+
+def _evaluate_chunk(combos):
+    return [(combo, _evaluate(combo)) for combo in combos]
+
+
+def _chunks(combos, size):
+    chunk = []
+    for combo in combos:
+        chunk.append(combo)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _imap_unordered(pool, fn, items, in_flight):
+    """pool.map that yields results as they finish and only pulls `in_flight` items ahead from `items`."""
+    items = iter(items)
+    pending = {pool.submit(fn, item) for item in itertools.islice(items, in_flight)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+        pending |= {pool.submit(fn, item) for item in itertools.islice(items, len(done))}
+
+
+def optimize(ranges, data, mode="grid", samples=200, workers=None, metric="profit", seed=None,
+             chunk_size=None, reset_minutes=RESET_MINUTES, spread_pips=0.0, volume=1.0, progress=None,
+             base=None):
+    """Sweep `ranges` ({indicator: {setting: values}}) over `data` ({symbol: bars dict or path}).
+    Every combination is laid over `base` (a saved strategy dict) and DEFAULT_SETTINGS.
+    Returns the results ranked best first: [{"rank", "strategy", **stats}, ...].
+    workers=1 runs in this process; progress(done, total) is called after every chunk."""
+    space = ParameterSpace(ranges, base)
+    data = {symbol: load_bars(bars) if isinstance(bars, str) else bars for symbol, bars in data.items()}
+    options = {"reset_minutes": reset_minutes, "spread_pips": spread_pips, "volume": volume}
+    combos = space.grid() if mode == "grid" else space.sample(samples, seed)
+    total = len(space) if mode == "grid" else min(samples, len(space))
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, min(64, total // (workers * 4) or 1))
+
+    results = []
+    done = 0
+    if workers == 1:
+        _init_worker(space, data, options)
+        chunk_results = map(_evaluate_chunk, _chunks(combos, chunk_size))
+        for chunk in chunk_results:
+            results.extend(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(space, data, options)) as pool:
+            chunks = _chunks(combos, chunk_size)
+            for chunk in _imap_unordered(pool, _evaluate_chunk, chunks, workers * CHUNKS_IN_FLIGHT):
+                results.extend(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+
+    ranked = [
+        {"strategy": space.strategy(combo), **stats}
+        for combo, stats in results if stats is not None and stats["trades"]
+    ]
+    ranked.sort(key=lambda r: r[metric], reverse=True)
+    for rank, row in enumerate(ranked, 1):
+        row["rank"] = rank
+    return ranked
+
+
+def save_results(ranked, symbols, mode, metric, db=None):
+    """Store one optimization run and its ranked results in DuckDB. Returns the run id."""
+    from data.database import get_database
+
+    return (db or get_database()).submit(lambda cursor: _insert_results(cursor, ranked, symbols, mode, metric)).result()
+
+
+def _insert_results(conn, ranked, symbols, mode, metric):
+    conn.execute("CREATE SEQUENCE IF NOT EXISTS optimization_run_seq START 1")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS optimization_runs (
+            run_id INTEGER PRIMARY KEY,
+            created TIMESTAMP DEFAULT NOW(),
+            symbols TEXT,
+            mode TEXT,
+            metric TEXT,
+            combinations INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS optimization_results (
+            run_id INTEGER,
+            rank INTEGER,
+            strategy JSON,
+            trades INTEGER,
+            wins INTEGER,
+            win_rate REAL,
+            total_pips REAL,
+            profit REAL,
+            profit_factor REAL,
+            max_drawdown_pips REAL
+        )
+    """)
+    run_id = conn.execute("SELECT nextval('optimization_run_seq')").fetchone()[0]
+    conn.execute(
+        "INSERT INTO optimization_runs (run_id, symbols, mode, metric, combinations) VALUES (?, ?, ?, ?, ?)",
+        [run_id, ",".join(symbols), mode, metric, len(ranked)],
+    )
+    if ranked:
+        conn.executemany(
+            "INSERT INTO optimization_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                [run_id, r["rank"], json.dumps(r["strategy"]), r["trades"], r["wins"], r["win_rate"],
+                 r["total_pips"], r["profit"], r["profit_factor"], r["max_drawdown_pips"]]
+                for r in ranked
+            ],
+        )
+    return run_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep strategy settings over historical M1 bars.")
+    parser.add_argument("ranges", help='JSON file: {"RSI": {"Period": [7, 14, 21], "Undersold": {"start": 20, "stop": 40, "step": 5}}}')
+    parser.add_argument("data", nargs="+", help="SYMBOL=path.csv|path.parquet")
+    parser.add_argument("--mode", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=200, help="combinations to try in random mode")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metric", choices=METRICS, default="profit")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--reset-minutes", type=int, default=RESET_MINUTES)
+    parser.add_argument("--spread", type=float, default=0.0, help="spread in pips")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--no-save", action="store_true", help="do not write the results to trading_bot.db")
+    parser.add_argument("--standalone", action="store_true",
+                        help="ignore the saved strategy: only the indicators in the ranges file, other settings at their defaults")
+    args = parser.parse_args(argv)
+
+    with open(args.ranges, "r") as f:
+        ranges = json.load(f)
+    data = {symbol: load_bars(path) for symbol, path in (item.split("=", 1) for item in args.data)}
+    base = None
+    if not args.standalone:
+        from data.db_handler import create_strategies_table, load_saved_strategy
+        create_strategies_table()
+        base = load_saved_strategy()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} combinations", end="", flush=True)
+
+    started = time.perf_counter()
+    ranked = optimize(ranges, data, mode=args.mode, samples=args.samples, workers=args.workers,
+                      metric=args.metric, seed=args.seed, reset_minutes=args.reset_minutes,
+                      spread_pips=args.spread, progress=progress, base=base)
+    print(f"\nFinished in {time.perf_counter() - started:.1f}s, {len(ranked)} combinations produced trades")
+
+    for row in ranked[:args.top]:
+        settings = ", ".join(
+            f"{name} " + "/".join(str(v["value"]) for v in config["sub_indicators"].values())
+            for name, config in row["strategy"].items()
+        )
+        print(f"#{row['rank']:<4} {args.metric}={row[args.metric]:.2f} trades={row['trades']} "
+              f"win={row['win_rate'] * 100:.1f}% pips={row['total_pips']:.1f}  {settings}")
+
+    if not args.no_save:
+        run_id = save_results(ranked, list(data), args.mode, args.metric)
+        print(f"Saved as optimization run {run_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+# Order routing for the executor, the copier and the reset sweep
+# Orders are queued per account instead of each caller running its own tick -> order_send session job.
+# When an account's queue goes from empty to pending, one job is queued on the session broker; it takes
+# every pending order for that account (up to max_batch), fetches each symbol's tick once, sends the
+# orders back to back on the already logged-in session and
+# resolves each caller's Future with an OrderOutcome. Identical pending orders (same open key, or
+# closes of the same position) are coalesced into one send whose outcome every caller receives.
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+from data.mt5_session import get_broker, as_account, MT5SessionError
+from data.trade_ledger import closed_position_result
+from data.metrics import get_metrics
+
+MAX_BATCH = 64
+DEVIATION = 10
+
+BATCH_ORDERS = get_metrics().histogram("order_router_batch_orders", "Orders sent per routed batch", ("account",),
+                                       buckets=(1, 2, 4, 8, 16, 32, 64))
+COALESCED = get_metrics().counter("order_router_coalesced_total", "Orders merged into an identical pending order",
+                                  ("account",))
+
+# position is the ticket to close (None opens a new position). stops(price) -> (sl, tp) replaces
+# sl/tp when given. An open with a spec (symbol_registry.SymbolSpec) is normalized to its volume step,
+# limits and digits; without one the order is sent exactly as given.
+# count asks for the account's open position count after the batch; deals for the closed
+# position's (price, profit, reason, time) from its deals
+OrderIntent = namedtuple("OrderIntent", [
+    "symbol", "type", "volume", "sl", "tp", "magic", "comment", "position", "stops", "spec", "count", "deals",
+], defaults=[0.0, 0.0, 0, "", None, None, None, False, False])
+
+# ok: the order was filled (TRADE_RETCODE_DONE). error describes why not when ok is False
+OrderOutcome = namedtuple("OrderOutcome", ["ok", "result", "request", "error", "open_count", "closed"])
+
+
+def intent_key(intent):
+    if intent.position is not None:
+        return ("close", intent.position)
+    return ("open", intent.symbol, intent.type, intent.magic, intent.comment)
+
+
+class _Pending:
+    __slots__ = ("intent", "futures")
+
+    def __init__(self, intent):
+        self.intent = intent
+        self.futures = []
+
+
+# OrderRouter: One pending queue per account, drained in batches on the session broker
+class OrderRouter:
+    def __init__(self, broker=None, max_batch=MAX_BATCH):
+        self.broker = broker
+        self.max_batch = max_batch
+        self._queues = {}         # login -> OrderedDict(key -> _Pending)
+        self._accounts = {}       # login -> MT5Account
+        self._scheduled = set()   # logins with a drain job queued on the broker
+        self._lock = threading.Lock()
+
+    def _broker(self):
+        # Resolved per use so set_broker() also redirects the shared router
+        return self.broker or get_broker()
+
+    def submit(self, account, intent):
+        """Queue an order for the account. Returns a Future of its OrderOutcome."""
+        account = as_account(account)
+        future = Future()
+        key = intent_key(intent)
+        with self._lock:
+            queue = self._queues.setdefault(account.login, OrderedDict())
+            pending = queue.get(key)
+            if pending is None:
+                pending = queue[key] = _Pending(intent)
+            else:
+                COALESCED.inc(account.login)
+            pending.futures.append(future)
+            self._accounts[account.login] = account
+            schedule = account.login not in self._scheduled
+            if schedule:
+                self._scheduled.add(account.login)
+        if schedule:
+            self._schedule(account)
+        return future
+
+    def open(self, account, symbol, type, volume, sl=0.0, tp=0.0, magic=0, comment="", stops=None,
+             spec=None, count=False):
+        return self.submit(account, OrderIntent(symbol, type, volume, sl, tp, magic, comment, None, stops, spec,
+                                                count))
+
+    def close(self, account, ticket, symbol, type, volume, magic=0, comment="", count=False, deals=False):
+        """Close (all of `volume` of) an open position; type is the position's own type."""
+        return self.submit(account, OrderIntent(symbol, type, volume, 0.0, 0.0, magic, comment, ticket, None, None,
+                                                count, deals))
+
+    def _schedule(self, account):
+        try:
+            job = self._broker().submit(account, lambda mt5: self._drain(account.login, mt5))
+        except MT5SessionError as e:
+            self._fail_all(account.login, e)
+            return
+        # The job itself fails if the session cannot be activated: fail whatever is still queued
+        job.add_done_callback(lambda f: f.exception() and self._fail_all(account.login, f.exception()))
+
+    def _fail_all(self, login, error):
+        with self._lock:
+            queue = self._queues.pop(login, {})
+            self._scheduled.discard(login)
+        for pending in queue.values():
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    def _take(self, login):
+        with self._lock:
+            queue = self._queues.get(login)
+            batch = []
+            while queue and len(batch) < self.max_batch:
+                batch.append(queue.popitem(last=False)[1])
+            more = bool(queue)
+            if not more:
+                self._scheduled.discard(login)
+        if more:
+            # Queued behind other accounts' jobs so a busy account cannot starve them
+            self._schedule(self._accounts[login])
+        return batch
+
+    def _drain(self, login, mt5):
+        """Session job: send one batch of the account's pending orders."""
+        batch = self._take(login)
+        if not batch:
+            return True
+        BATCH_ORDERS.observe(len(batch), login)
+        outcomes = []
+        try:
+            intents = [pending.intent for pending in batch]
+            symbols = list(dict.fromkeys(intent.symbol for intent in intents))
+            ticks = {symbol: mt5.symbol_info_tick(symbol) for symbol in symbols}
+            sent = [self._send(mt5, intent, ticks) for intent in intents]
+
+            open_count = None
+            if any(intent.count for intent in intents):
+                open_count = mt5.positions_total() or 0
+            for intent, (result, request, error) in zip(intents, sent):
+                ok = bool(result) and result.retcode == mt5.TRADE_RETCODE_DONE
+                closed = closed_position_result(mt5, intent.position) if ok and intent.deals else None
+                outcomes.append(OrderOutcome(ok, result, request, error if not ok else None, open_count, closed))
+        except Exception as e:
+            for pending in batch:
+                for future in pending.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return True
+        for pending, outcome in zip(batch, outcomes):
+            for future in pending.futures:
+                future.set_result(outcome)
+        return True
+
+    def _send(self, mt5, intent, ticks):
+        """Send one order priced from the prefetched tick. Returns (result, request, error)."""
+        request, error = self._request(mt5, intent, ticks.get(intent.symbol))
+        if request is None:
+            return None, None, error
+        result = mt5.order_send(request)
+        if result is not None and result.retcode == mt5.TRADE_RETCODE_REQUOTE:
+            # The prefetched tick went stale while the batch was sending: one retry at the current price
+            ticks[intent.symbol] = mt5.symbol_info_tick(intent.symbol)
+            request, error = self._request(mt5, intent, ticks[intent.symbol])
+            if request is None:
+                return None, None, error
+            result = mt5.order_send(request)
+        if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+            return result, request, str(result.retcode if result is not None else mt5.last_error())
+        return result, request, None
+
+    def _request(self, mt5, intent, tick):
+        """Build the order_send request for an intent. Returns (request, None) or (None, error)."""
+        symbol = intent.symbol
+        if not tick:
+            return None, f"Missing tick for {symbol}"
+        spec = intent.spec if intent.position is None else None
+        volume = spec.volume(intent.volume) if spec else intent.volume
+        if volume <= 0:
+            return None, f"Invalid volume for {symbol}"
+
+        is_buy = intent.type == mt5.ORDER_TYPE_BUY
+        if intent.position is not None:
+            # Closing sells a buy at the bid and buys back a sell at the ask
+            order_type = mt5.ORDER_TYPE_SELL if is_buy else mt5.ORDER_TYPE_BUY
+            price = tick.bid if is_buy else tick.ask
+        else:
+            order_type = intent.type
+            price = tick.ask if is_buy else tick.bid
+        if price is None or price <= 0:
+            return None, f"Invalid price for {symbol}"
+
+        request = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": volume,
+            "type": order_type,
+            "price": price,
+            "deviation": DEVIATION,
+            "magic": intent.magic,
+            "comment": intent.comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": mt5.ORDER_FILLING_IOC,
+        }
+        if intent.position is not None:
+            request["position"] = intent.position
+        else:
+            sl, tp = intent.stops(price) if intent.stops else (intent.sl, intent.tp)
+            request["sl"], request["tp"] = sl, tp
+        if spec:
+            for field in ("price", "sl", "tp"):
+                request[field] = spec.price(request[field])
+        return request, None
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_order_router():
+    """Process-wide router on the shared session broker."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = OrderRouter()
+        return _router
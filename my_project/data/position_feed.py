@@ -0,0 +1,180 @@
+# Event-driven view of an account's open positions
+# One PositionFeed per account polls positions_get through the session broker, diffs the result
+# against an indexed snapshot and publishes typed opened/closed/modified events to every subscriber,
+# so the executor, copier and manual-trade monitor no longer poll MT5 on their own
+import json
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from data.mt5_session import get_broker, as_account, MT5SessionError
+from data.scheduler import get_scheduler, AdaptiveInterval
+from data.trade_log import source_logger, rotate_file
+
+OPENED = "opened"
+CLOSED = "closed"
+MODIFIED = "modified"
+
+JOURNAL_PATH = "position_events.jsonl"
+JOURNAL_MAX_BYTES = 5 * 1024 * 1024   # rotated like trade_log.jsonl: position_events.jsonl.1 .. .5
+JOURNAL_BACKUPS = 5
+FAST_POLL = 0.5
+IDLE_POLL = 4.0
+
+log = source_logger("feed")
+
+# Every account's feed appends to the same journal, so size check and rotation happen under one lock
+_journal_lock = threading.Lock()
+
+# The position fields the rest of the app cares about, detached from the MT5 result type
+PositionSnapshot = namedtuple(
+    "PositionSnapshot",
+    ["ticket", "symbol", "type", "volume", "price_open", "sl", "tp", "magic", "comment"],
+)
+
+# previous is the last snapshot for MODIFIED/CLOSED events, None for OPENED
+PositionEvent = namedtuple("PositionEvent", ["kind", "position", "previous"])
+
+
+def snapshot_of(pos):
+    return PositionSnapshot(
+        pos.ticket, pos.symbol, pos.type, pos.volume, pos.price_open, pos.sl, pos.tp, pos.magic, pos.comment
+    )
+
+
+# PositionDiffEngine: Keeps the last seen positions indexed by ticket and turns each new
+# positions_get() result into the list of changes since the previous one
+class PositionDiffEngine:
+    def __init__(self):
+        self.positions = {}
+
+    def apply(self, positions):
+        events = []
+        current = {}
+        for pos in positions or ():
+            snap = pos if isinstance(pos, PositionSnapshot) else snapshot_of(pos)
+            current[snap.ticket] = snap
+            previous = self.positions.get(snap.ticket)
+            if previous is None:
+                events.append(PositionEvent(OPENED, snap, None))
+            elif (previous.sl, previous.tp, previous.volume) != (snap.sl, snap.tp, snap.volume):
+                events.append(PositionEvent(MODIFIED, snap, previous))
+
+        for ticket, previous in self.positions.items():
+            if ticket not in current:
+                events.append(PositionEvent(CLOSED, previous, previous))
+
+        self.positions = current
+        return events
+
+
+# PositionFeed: Polls one account and fans diff events out to subscribers
+# Subscribers are plain callables taking a list of PositionEvent; they run on the feed thread,
+# so anything slow (order sending) should hand the events off to its own thread or queue
+class PositionFeed:
+    def __init__(self, account, broker=None, journal_path=JOURNAL_PATH, journal_max_bytes=JOURNAL_MAX_BYTES,
+                 journal_backups=JOURNAL_BACKUPS):
+        self.account = as_account(account)
+        self.broker = broker or get_broker()
+        self.journal_path = journal_path
+        self.journal_max_bytes = journal_max_bytes
+        self.journal_backups = journal_backups
+        self.engine = PositionDiffEngine()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self.polled = False  # True once positions reflect at least one successful poll
+
+    @property
+    def positions(self):
+        """Current snapshot: {ticket: PositionSnapshot}."""
+        return self.engine.positions
+
+    def subscribe(self, callback):
+        with self._deliver_lock:
+            with self._lock:
+                self._subscribers.append(callback)
+                known = list(self.engine.positions.values())
+            # Late subscribers get the positions that were already open as OPENED events
+            if known:
+                callback([PositionEvent(OPENED, snap, None) for snap in known])
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def poll(self):
+        """Fetch positions once and publish the changes. Returns the events (None if MT5 failed)."""
+        try:
+            positions = self.broker.positions_get(self.account)
+        except MT5SessionError:
+            return None
+        if positions is None:
+            return None
+
+        with self._deliver_lock:
+            with self._lock:
+                events = self.engine.apply(positions)
+                subscribers = list(self._subscribers)
+                self.polled = True
+            if not events:
+                return events
+
+            self._journal(events)
+            for callback in subscribers:
+                try:
+                    callback(events)
+                except Exception as e:
+                    log(f"[PositionFeed] Subscriber error: {e}", level="error", login=self.account.login)
+        return events
+
+    def _journal(self, events):
+        # Only the deltas are written, one JSON line per event
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lines = []
+        for event in events:
+            record = {"time": timestamp, "account": self.account.login, "event": event.kind}
+            record.update(event.position._asdict())
+            lines.append(json.dumps(record) + "\n")
+        try:
+            with _journal_lock:
+                f = open(self.journal_path, "a", encoding="utf-8")
+                try:
+                    if f.tell() >= self.journal_max_bytes:
+                        f.close()
+                        rotate_file(self.journal_path, self.journal_backups)
+                        f = open(self.journal_path, "a", encoding="utf-8")
+                    f.write("".join(lines))
+                finally:
+                    f.close()
+        except Exception as e:
+            log(f"[PositionFeed] Journal write failed: {e}", level="error", login=self.account.login)
+
+    def poll_job(self):
+        """Scheduler entry point: busy while anything changed or positions are open."""
+        events = self.poll()
+        return bool(events) or bool(self.engine.positions)
+
+    def start(self, scheduler=None):
+        # Polls every FAST_POLL seconds while positions are open, backing off to IDLE_POLL otherwise
+        scheduler = scheduler or get_scheduler()
+        name = f"feed:{self.account.login}"
+        if not scheduler.has_job(name):
+            scheduler.add(name, self.poll_job, AdaptiveInterval(FAST_POLL, IDLE_POLL))
+        return self
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_position_feed(account):
+    """Shared, already polling feed for the account (one per login per process)."""
+    account = as_account(account)
+    with _feeds_lock:
+        feed = _feeds.get(account.login)
+        if feed is None:
+            feed = _feeds[account.login] = PositionFeed(account)
+            feed.start()
+        return feed
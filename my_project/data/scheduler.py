@@ -0,0 +1,249 @@
+# One scheduler for every polling loop in the app (position feeds, copier, strategy evaluation, resets)
+# Each job returns whether it saw activity; its interval policy uses that to poll fast while things
+# are moving and back off while idle. Strategy jobs are aligned to bar boundaries instead of sleeps
+# Every job is an asyncio task on a single event-loop thread; the blocking work itself (MT5 calls,
+# database reads) runs on a bounded thread pool, so idle jobs cost no threads and no wakeups, any
+# job can be cancelled or restarted at once, and tasks() lists everything that is running
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+# FixedInterval: Always waits the same number of seconds (e.g. the 30 minute reset)
+class FixedInterval:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_delay(self, active, now):
+        return self.seconds
+
+
+# AdaptiveInterval: Drops to `fast` whenever the job reports activity and
+# multiplies the delay by `backoff` on every idle run, up to `slow`
+class AdaptiveInterval:
+    def __init__(self, fast, slow, backoff=2.0):
+        self.fast = fast
+        self.slow = slow
+        self.backoff = backoff
+        self.current = fast
+
+    def next_delay(self, active, now):
+        if active:
+            self.current = self.fast
+        else:
+            self.current = min(self.slow, self.current * self.backoff)
+        return self.current
+
+
+# BarAligned: Runs `offset` seconds after every bar close (M1 by default)
+# While the job reports activity it also re-runs every `intrabar` seconds inside the bar;
+# when idle it sleeps straight through to the next bar boundary
+class BarAligned:
+    def __init__(self, bar_seconds=60, offset=0.5, intrabar=None):
+        self.bar_seconds = bar_seconds
+        self.offset = offset
+        self.intrabar = intrabar
+
+    def until_next_bar(self, now):
+        return self.bar_seconds - (now % self.bar_seconds) + self.offset
+
+    def next_delay(self, active, now):
+        delay = self.until_next_bar(now)
+        if active and self.intrabar:
+            return min(delay, self.intrabar)
+        return delay
+
+
+class _ScheduledJob:
+    def __init__(self, name, fn, policy):
+        self.name = name
+        self.fn = fn
+        self.policy = policy    # None for one-shot tasks started with spawn()
+        self.wake = asyncio.Event()
+        self.task = None
+        self.call = None        # concurrent Future of the blocking call in flight
+        self.running = False
+        self.due = 0.0
+        self.runs = 0
+        self.last_active = None
+
+
+# PollScheduler: An asyncio loop on one thread runs each job as a task that sleeps until it is due
+# (or triggered), hands fn to the worker pool and re-arms itself from its policy. A job never overlaps
+# with itself; trigger() during a run makes it run again straight away
+class PollScheduler:
+    def __init__(self, workers=8):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def add(self, name, fn, policy, start_delay=0.0):
+        """Register fn (returning truthy when it saw activity) under a unique name."""
+        return self._register(_ScheduledJob(name, fn, policy), start_delay)
+
+    def spawn(self, name, fn, *args):
+        """Run a one-off blocking call as a named task. Returns a concurrent Future of its result."""
+        job = _ScheduledJob(name, lambda: fn(*args), None)
+        self._register(job, 0.0)
+        return asyncio.run_coroutine_threadsafe(self._await_task(job), self._loop)
+
+    def remove(self, name):
+        with self._lock:
+            job = self._jobs.pop(name, None)
+        if job is not None:
+            self._loop.call_soon_threadsafe(self._cancel, job)
+
+    def has_job(self, name):
+        with self._lock:
+            return name in self._jobs
+
+    def trigger(self, name):
+        """Run the job as soon as possible (e.g. when a subscriber has new events for it)."""
+        with self._lock:
+            job = self._jobs.get(name)
+        if job is not None:
+            self._loop.call_soon_threadsafe(job.wake.set)
+
+    def jobs(self):
+        """Snapshot of (name, seconds until due, runs, last_active) for every periodic job."""
+        now = time.time()
+        with self._lock:
+            return [(j.name, max(0.0, j.due - now), j.runs, j.last_active)
+                    for j in self._jobs.values() if j.policy is not None]
+
+    def tasks(self):
+        """Every scheduled and one-off task with its state: "running", "waiting" or "done"."""
+        now = time.time()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            {
+                "name": j.name,
+                "kind": "once" if j.policy is None else type(j.policy).__name__,
+                "state": "running" if j.running else "done" if j.task is not None and j.task.done() else "waiting",
+                "due_in": round(max(0.0, j.due - now), 3),
+                "runs": j.runs,
+                "last_active": j.last_active,
+            }
+            for j in jobs
+        ]
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="poll-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Cancel every task, let blocking calls already in flight finish (up to timeout), stop the loop."""
+        with self._lock:
+            if self._thread is None:
+                return
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        cancelled = asyncio.run_coroutine_threadsafe(self._cancel_all(jobs), self._loop)
+        try:
+            cancelled.result(timeout)
+        except Exception:
+            pass
+        calls = [job.call for job in jobs if job.call is not None and not job.call.done()]
+        if calls:
+            wait_futures(calls, timeout=timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    # Event-loop side
+
+    def _register(self, job, start_delay):
+        with self._lock:
+            previous = self._jobs.get(job.name)
+            self._jobs[job.name] = job
+        self._loop.call_soon_threadsafe(self._launch, job, previous, start_delay)
+        return job
+
+    def _launch(self, job, previous, start_delay):
+        if previous is not None:
+            self._cancel(previous)
+        run = self._run_once(job) if job.policy is None else self._run_job(job, start_delay)
+        job.task = self._loop.create_task(run, name=job.name)
+
+    def _cancel(self, job):
+        if job.task is not None:
+            job.task.cancel()
+
+    async def _cancel_all(self, jobs):
+        tasks = [job.task for job in jobs if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _await_task(self, job):
+        while job.task is None:
+            await asyncio.sleep(0)
+        return await job.task
+
+    async def _run_once(self, job):
+        job.running = True
+        try:
+            job.call = self._executor.submit(job.fn)
+            return await asyncio.wrap_future(job.call)
+        finally:
+            job.running = False
+            job.runs += 1
+            with self._lock:
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+
+    async def _run_job(self, job, delay):
+        while True:
+            job.due = time.time() + delay
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(job.wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            job.wake.clear()
+            job.running = True
+            active = False
+            try:
+                job.call = self._executor.submit(job.fn)
+                active = bool(await asyncio.wrap_future(job.call))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Scheduler] Job {job.name} failed: {e}")
+            finally:
+                job.running = False
+                job.runs += 1
+                job.last_active = active
+            delay = 0.0 if job.wake.is_set() else job.policy.next_delay(active, time.time())
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler, started on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PollScheduler().start()
+        return _scheduler
+
+
+def stop_scheduler(timeout=5.0):
+    """Gracefully stop the process-wide scheduler if it was ever started (on window close or SIGTERM)."""
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop(timeout)
@@ -0,0 +1,34 @@
+# Startup-time breakdown: entry points mark each phase as it finishes and print the table
+# Import this first so the clock starts before any other application module is loaded
+import threading
+import time
+
+_started = time.perf_counter()
+_marks = []
+_lock = threading.Lock()
+
+
+def mark(phase):
+    """Record that `phase` finished now. Phases may finish on background threads."""
+    with _lock:
+        _marks.append((phase, time.perf_counter()))
+
+
+def elapsed():
+    return time.perf_counter() - _started
+
+
+def breakdown():
+    """[(phase, seconds since the previous mark, seconds since start)] in completion order."""
+    with _lock:
+        marks = sorted(_marks, key=lambda m: m[1])
+    rows, previous = [], _started
+    for phase, at in marks:
+        rows.append((phase, at - previous, at - _started))
+        previous = at
+    return rows
+
+
+def report(title="Startup"):
+    print(f"[{title}] " + " | ".join(f"{phase} {step:.3f}s" for phase, step, _ in breakdown())
+          + f" | total {elapsed():.3f}s")
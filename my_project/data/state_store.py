@@ -0,0 +1,247 @@
+# Embedded state store for the copier, executor and account list
+# Replaces last_trades.json, closed_master_trades.json and accounts.json with one SQLite database in
+# WAL mode: every change is a small indexed insert/update committed atomically, so a crash mid-write
+# leaves the previous committed state intact and no loop has to re-read or rewrite its whole history.
+# Closed master trades are an append-only queue (rows are marked processed, never rewritten), which
+# removes the race between the reset appending and the copier truncating the old JSON file.
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from data.metrics import get_metrics
+
+STATE_PATH = "bot_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS copied_tickets (
+    master_ticket INTEGER PRIMARY KEY,
+    copied_at REAL
+);
+CREATE TABLE IF NOT EXISTS closed_master_trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket INTEGER,
+    symbol TEXT,
+    closed_at REAL,
+    processed_at REAL
+);
+CREATE INDEX IF NOT EXISTS closed_master_trades_ticket ON closed_master_trades(ticket);
+CREATE INDEX IF NOT EXISTS closed_master_trades_pending ON closed_master_trades(id) WHERE processed_at IS NULL;
+CREATE TABLE IF NOT EXISTS slave_trades (
+    master_ticket INTEGER,
+    login TEXT,
+    slave_ticket INTEGER,
+    symbol TEXT,
+    volume REAL,
+    type INTEGER,
+    comment TEXT,
+    PRIMARY KEY (master_ticket, login)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS slave_trades_slave ON slave_trades(login, slave_ticket);
+CREATE TABLE IF NOT EXISTS accounts (
+    kind TEXT,
+    login TEXT,
+    password TEXT,
+    server TEXT,
+    extra TEXT,
+    PRIMARY KEY (kind, login)
+);
+"""
+
+ACCOUNT_KINDS = ("masters", "slaves")
+
+WRITE_SECONDS = get_metrics().histogram("state_store_write_seconds", "State store write transactions", ("operation",))
+
+# Side files imported once into an empty store: (file, importer method name)
+LEGACY_FILES = (
+    ("accounts.json", "_import_accounts"),
+    ("last_trades.json", "_import_copied"),
+    ("closed_master_trades.json", "_import_closed"),
+)
+
+
+# StateStore: One SQLite connection shared by all threads; writes are serialized by a lock and each
+# public method is a single transaction
+class StateStore:
+    def __init__(self, path=STATE_PATH, migrate=True):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if migrate:
+            self._migrate_legacy_files()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self, name="write"):
+        # Timed from lock wait to commit, labelled with the operation (the copier's old JSON rewrites)
+        with WRITE_SECONDS.time(name), self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Copied master tickets (was last_trades.json) ---
+
+    def copied_tickets(self):
+        return {row[0] for row in self._query("SELECT master_ticket FROM copied_tickets")}
+
+    def add_copied(self, tickets):
+        now = time.time()
+        with self.transaction("add_copied") as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO copied_tickets (master_ticket, copied_at) VALUES (?, ?)",
+                [(ticket, now) for ticket in tickets],
+            )
+
+    def clear_copied(self):
+        with self.transaction("clear_copied") as conn:
+            conn.execute("DELETE FROM copied_tickets")
+
+    # --- Closed master trades queue (was closed_master_trades.json) ---
+
+    def record_closed_master_trades(self, trades):
+        """Append (ticket, symbol) pairs closed on the master by the reset."""
+        now = time.time()
+        with self.transaction("record_closed_master_trades") as conn:
+            conn.executemany(
+                "INSERT INTO closed_master_trades (ticket, symbol, closed_at) VALUES (?, ?, ?)",
+                [(ticket, symbol, now) for ticket, symbol in trades],
+            )
+
+    def has_pending_closed(self):
+        return bool(self._query("SELECT 1 FROM closed_master_trades WHERE processed_at IS NULL LIMIT 1"))
+
+    def pending_closed_master_trades(self):
+        """Unprocessed closures, oldest first, as (id, ticket, symbol)."""
+        return self._query(
+            "SELECT id, ticket, symbol FROM closed_master_trades WHERE processed_at IS NULL ORDER BY id"
+        )
+
+    def mark_closed_processed(self, ids):
+        now = time.time()
+        with self.transaction("mark_closed_processed") as conn:
+            conn.executemany(
+                "UPDATE closed_master_trades SET processed_at = ? WHERE id = ?",
+                [(now, row_id) for row_id in ids],
+            )
+
+    # --- Master -> slave ticket map (see data/ticket_map.py) ---
+
+    def slave_trades(self):
+        """All mapped copies as (master_ticket, login, slave_ticket, symbol, volume, type, comment)."""
+        return self._query(
+            "SELECT master_ticket, login, slave_ticket, symbol, volume, type, comment FROM slave_trades"
+        )
+
+    def add_slave_trades(self, entries):
+        """Store (master_ticket, login, trade dict) entries, replacing older copies of the same ticket."""
+        with self.transaction("add_slave_trades") as conn:
+            for master_ticket, login, trade in entries:
+                conn.execute("DELETE FROM slave_trades WHERE login = ? AND slave_ticket = ?", (login, trade["ticket"]))
+                conn.execute(
+                    "INSERT OR REPLACE INTO slave_trades VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (master_ticket, login, trade["ticket"], trade["symbol"], trade["volume"], trade["type"],
+                     trade.get("comment", "")),
+                )
+
+    def remove_master_trades(self, master_ticket):
+        with self.transaction("remove_master_trades") as conn:
+            conn.execute("DELETE FROM slave_trades WHERE master_ticket = ?", (master_ticket,))
+
+    def remove_slave_trades(self, keys):
+        """Drop copies by (login, slave_ticket)."""
+        with self.transaction("remove_slave_trades") as conn:
+            conn.executemany("DELETE FROM slave_trades WHERE login = ? AND slave_ticket = ?", list(keys))
+
+    # --- Accounts (was accounts.json) ---
+
+    def load_accounts(self):
+        accounts = {kind: [] for kind in ACCOUNT_KINDS}
+        rows = self._query("SELECT kind, login, password, server, extra FROM accounts ORDER BY rowid")
+        for kind, login, password, server, extra in rows:
+            account = {"login": login, "password": password, "server": server}
+            if extra:
+                account.update(json.loads(extra))
+            accounts.setdefault(kind, []).append(account)
+        return accounts
+
+    def save_account(self, kind, account):
+        extra = {k: v for k, v in account.items() if k not in ("login", "password", "server")}
+        with self.transaction("save_account") as conn:
+            conn.execute(
+                "INSERT INTO accounts (kind, login, password, server, extra) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, login) DO UPDATE SET password = excluded.password, "
+                "server = excluded.server, extra = excluded.extra",
+                (kind, str(account["login"]), account.get("password"), account.get("server"),
+                 json.dumps(extra) if extra else None),
+            )
+
+    def remove_account(self, kind, login):
+        with self.transaction("remove_account") as conn:
+            conn.execute("DELETE FROM accounts WHERE kind = ? AND login = ?", (kind, str(login)))
+
+    def clear_accounts(self):
+        with self.transaction("clear_accounts") as conn:
+            conn.execute("DELETE FROM accounts")
+
+    # --- One-time import of the old JSON side files ---
+
+    def _migrate_legacy_files(self):
+        for filename, importer in LEGACY_FILES:
+            key = f"imported:{filename}"
+            if self._query("SELECT 1 FROM meta WHERE key = ?", (key,)):
+                continue
+            if os.path.exists(filename):
+                try:
+                    with open(filename, "r") as f:
+                        data = json.load(f)
+                    getattr(self, importer)(data)
+                except (OSError, ValueError) as e:
+                    print(f"[State Store] Could not import {filename}: {e}")
+            with self.transaction("migrate_legacy_files") as conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(time.time())))
+
+    def _import_accounts(self, data):
+        for kind in ACCOUNT_KINDS:
+            for account in data.get(kind, []):
+                self.save_account(kind, account)
+
+    def _import_copied(self, data):
+        self.add_copied(int(ticket) for ticket in data)
+
+    def _import_closed(self, data):
+        self.record_closed_master_trades(
+            (entry.get("ticket"), entry["symbol"]) for entry in data if entry.get("symbol")
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = StateStore()
+    return _store
@@ -0,0 +1,66 @@
+# Local HTTP status endpoint for the headless daemon
+# GET /status returns the provider's snapshot as JSON, GET /health answers "ok" while the process is
+# serving and GET /metrics returns the hot-path metrics in the Prometheus text format. Bound to
+# 127.0.0.1 by default; it is read-only and meant for local supervisors, probes and scrapers
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from data.metrics import metrics_route
+
+STATUS_HOST = "127.0.0.1"
+STATUS_PORT = 8765
+GUI_STATUS_PORT = 8766  # the desktop app's endpoint, so it can run next to the daemon
+
+
+# StatusServer: Serves status snapshots on a background thread
+class StatusServer:
+    def __init__(self, provider, host=STATUS_HOST, port=STATUS_PORT):
+        self.provider = provider
+        self.routes = {"/status": self._status, "/health": lambda: ("text/plain", "ok"), "/metrics": metrics_route}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                route = server.routes.get(self.path.split("?", 1)[0])
+                if route is None:
+                    self.send_error(404)
+                    return
+                try:
+                    content_type, body = route()
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # probes would otherwise flood the console
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def add_route(self, path, fn):
+        """fn() returns (content type, body text)."""
+        self.routes[path] = fn
+
+    def _status(self):
+        return "application/json", json.dumps(self.provider(), default=str)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="status-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
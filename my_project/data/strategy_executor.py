@@ -1,112 +1,103 @@
 # This module evaluates the user's strategy (e.g., RSI, MACD) on each symbol and places trades on the master account
 # Includes safeguards such as one-trade-per-symbol-per-direction and periodic position resets
 import MetaTrader5 as mt5
-import time
-import json
-import duckdb
-import pandas as pd
-import pandas_ta as ta
-from datetime import datetime
 import threading
-from data.db_handler import create_connection
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from data.db_handler import load_saved_strategy
+from data.indicators import IndicatorEngine
+from data.batch_evaluator import evaluate_batch, stack_rates
+from data.bar_cache import get_bar_cache
+from data.mt5_session import get_broker, MT5Account
+from data.order_router import get_order_router
+from data.symbol_registry import get_symbol_registry, SYMBOL_REFRESH_INTERVAL
+from data.position_feed import get_position_feed, OPENED, CLOSED
+from data.scheduler import get_scheduler, BarAligned, FixedInterval
+from data.trade_log import get_trade_logger, source_logger
+from data.state_store import get_state_store
+from data.trade_ledger import get_trade_ledger, closed_position_result
+from data.account_status import update_trade_count
+from data.metrics import get_metrics
 import ctypes
-# Prevent screen timeout
-ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)
-DB_PATH = "trading_bot.db"
-STRATEGY_CHECK_INTERVAL = 10
+import sys
+# Prevent screen timeout (the Windows API is missing elsewhere, e.g. when the daemon runs on a server)
+if sys.platform == "win32":
+    ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)
+STRATEGY_CHECK_INTERVAL = 10  # intra-bar re-check while a symbol can still trade
+BAR_CLOSE_OFFSET = 0.5  # seconds after the M1 close before evaluating, so the new bar is available
+RESET_INTERVAL = 1800  # 30 mins
+BATCH_EVALUATION = False  # evaluate the whole watchlist in one vectorized pass instead of per symbol
+# Rejections that mean the cached symbol spec (volume limits, digits, stops distance) is out of date
+SPEC_RETCODES = (mt5.TRADE_RETCODE_INVALID_VOLUME, mt5.TRADE_RETCODE_INVALID_PRICE, mt5.TRADE_RETCODE_INVALID_STOPS)
 open_trade_registry = {}
 active_trades = set()
-gui_logger = None
-log_lock = threading.Lock()
-
-def ensure_mt5_initialized(login, password, server):
-    mt5.shutdown()
-    return mt5.initialize(login=int(login), password=password, server=server)
 
 symbols = [
     "GBPCHF+", "USDCAD+", "EURUSD+", "GBPUSD+", "NZDUSD+", "USDJPY+", "EURGBP+", "AUDUSD+"
 ]
 
-symbol_locks = {s: threading.Lock() for s in symbols}
-
-def log(message):
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    full_msg = f"[{timestamp}] {message}"
-    with log_lock:
-        print(full_msg)
-        if gui_logger and ("[✅]" in message or "[🔁]" in message or "[🔄]" in message or "closed:" in message):
-            gui_logger(full_msg)
-        try:
-            with open("trade_log.txt", "a", encoding="utf-8") as f:
-                f.write(full_msg + "\n")
-        except Exception as e:
-            print(f"[Logger Error] {e}")
+# Any watchlist symbol gets its own lock on first use
+symbol_locks = defaultdict(threading.Lock)
+
+# Queued, non-blocking log; records with gui=True are also shown on the account page
+log = source_logger("executor")
+
+# Hot-path timings; the MT5 calls inside them are timed separately by the session broker
+BAR_FETCH_SECONDS = get_metrics().histogram(
+    "executor_bar_fetch_seconds", "Bar cache refresh for one symbol", ("account", "symbol"))
+BATCH_REFRESH_SECONDS = get_metrics().histogram(
+    "executor_batch_refresh_seconds", "Bar cache refresh for the whole watchlist", ("account",))
+EVALUATE_SECONDS = get_metrics().histogram(
+    "executor_evaluate_seconds", "StrategyEvaluator.evaluate for one symbol", ("symbol",))
+PLACE_TRADE_SECONDS = get_metrics().histogram(
+    "executor_place_trade_seconds", "place_trade(s) including the wait for the symbol locks", ("account", "symbol"))
 
 def load_strategy_from_db():
-    conn = duckdb.connect(DB_PATH)
-    row = conn.execute("SELECT * FROM strategies LIMIT 1").fetchone()
-    conn.close()
-    if row and row[0]:
-        return json.loads(row[0])
-    return None
-
-def get_symbol_data(symbol, timeframe=mt5.TIMEFRAME_M1, count=100):
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
-    if rates is None or len(rates) == 0:
-        return None
-    df = pd.DataFrame(rates)
-    df["time"] = pd.to_datetime(df["time"], unit="s")
-    return df
+    return load_saved_strategy()
+
+# Bars come from the local rolling cache: only bars newer than the cached ones are fetched,
+# and the result is a view over NumPy arrays rather than a new DataFrame
+def get_symbol_data(account, symbol, timeframe=mt5.TIMEFRAME_M1, count=100):
+    with BAR_FETCH_SECONDS.time(account.login, symbol):
+        return get_bar_cache(account, timeframe).get(symbol, count)
 
 # StrategyEvaluator: Handles multi-indicator evaluation based on user-configured strategies
 # Supports RSI, MACD, Bollinger Bands, Stochastic, and Moving Averages
+# Indicator values come from an IndicatorEngine that only does O(1) work per newly closed bar
 class StrategyEvaluator:
     def __init__(self, strategy, symbol_name=""):
         self.strategy = strategy
         self.symbol = symbol_name
-    
-    def evaluate(self, df):
+        self.engine = IndicatorEngine(strategy)
+
+    def evaluate(self, bars):
+        with EVALUATE_SECONDS.time(self.symbol):
+            return self._evaluate(bars)
+
+    def _evaluate(self, bars):
         results = {}
-        all_signals = {}
-
-        # Precompute all possible indicators only once
-        try:
-            if "RSI" in self.strategy and self.strategy["RSI"].get("var"):
-                period = int(self.strategy["RSI"]["sub_indicators"]["Period"]["value"])
-                df.ta.rsi(length=period, append=True)
-        except Exception:
-            pass
-        try:
-            df.ta.macd(append=True)
-        except Exception:
-            pass
-        try:
-            df.ta.bbands(append=True)
-        except Exception:
-            pass
-        try:
-            df.ta.stoch(append=True)
-        except Exception:
-            pass
-        try:
-            df.ta.sma(append=True)
-        except Exception:
-            pass
+
+        # Advance the incremental indicators over bars closed since the last call;
+        # values include the forming bar, like the last row of a freshly computed frame
+        values = self.engine.feed(bars)
+        if not values:
+            return None
 
         for ind, config in self.strategy.items():
             if not config.get("var", 0):
                 continue
             dir = None
             if ind == "RSI":
-                dir = self.evaluate_rsi(df, config)
+                dir = self.evaluate_rsi(values, config)
             elif ind == "MACD":
-                dir = self.evaluate_macd(df, config)
+                dir = self.evaluate_macd(values, config)
             elif ind == "Bollinger Bands":
-                dir = self.evaluate_bollinger(df, config)
+                dir = self.evaluate_bollinger(values, config)
             elif ind == "Stochastic Oscillator":
-                dir = self.evaluate_stochastic(df, config)
+                dir = self.evaluate_stochastic(values, config)
             elif ind == "Moving Average":
-                dir = self.evaluate_moving_average(df, config)
+                dir = self.evaluate_moving_average(values, config)
 
             results[ind] = dir if dir in ("BUY", "SELL") else None
             
@@ -115,77 +106,62 @@ class StrategyEvaluator:
         directions = [v for v in results.values() if v]
 
         if len(directions) < len(results):
-            log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → incomplete → skipping")
+            log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → incomplete → skipping", level="debug")
             return None
 
         if all(d == directions[0] for d in directions): # Requires all selected indicators to agree on the same direction
-            log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → consensus: {directions[0]}")
+            log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → consensus: {directions[0]}", level="debug")
             return directions[0]
 
-        log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → conflict → skipping")
+        log(f"[Multi-Indicator] {self.symbol} signals → {signals_str} → conflict → skipping", level="debug")
         return None
 
-    def evaluate_rsi(self, df, config):
-        period = int(config["sub_indicators"]["Period"]["value"])
+    def evaluate_rsi(self, values, config):
         undersold = int(config["sub_indicators"]["Undersold"]["value"])
         oversold = int(config["sub_indicators"]["Oversold"]["value"])        
-        rsi_val = df[f"RSI_{period}"].iloc[-1]
-        log(f"[RSI Debug] {self.symbol} RSI={rsi_val:.2f} (Thresholds: <{undersold}=BUY, >{oversold}=SELL) → Suggestion: [{"BUY" if rsi_val < undersold else "SELL" if rsi_val > oversold else "NONE"}]")
+        rsi_val = values["RSI"]
+        log(f"[RSI Debug] {self.symbol} RSI={rsi_val:.2f} (Thresholds: <{undersold}=BUY, >{oversold}=SELL) → Suggestion: [{"BUY" if rsi_val < undersold else "SELL" if rsi_val > oversold else "NONE"}]", level="debug")
         if rsi_val < undersold:
             return "BUY"
         elif rsi_val > oversold:
             return "SELL"
         return None
 
-    def evaluate_macd(self, df, config):
-        fast = int(config["sub_indicators"]["Fast EMA"]["value"])
-        slow = int(config["sub_indicators"]["Slow EMA"]["value"])
-        signal = int(config["sub_indicators"]["MACD SMA"]["value"])
-        df.ta.macd(fast=fast, slow=slow, signal=signal, append=True)
-        macd = df[f"MACD_{fast}_{slow}_{signal}"].iloc[-1]
-        signal_line = df[f"MACDs_{fast}_{slow}_{signal}"].iloc[-1]
-        log(f"[MACD Debug] {self.symbol} MACD={macd:.5f}, Signal={signal_line:.5f} → [{'BUY' if macd > signal_line else 'SELL' if macd < signal_line else 'NO TRADE'}]")
+    def evaluate_macd(self, values, config):
+        macd = values["MACD"]
+        signal_line = values["MACD_signal"]
+        log(f"[MACD Debug] {self.symbol} MACD={macd:.5f}, Signal={signal_line:.5f} → [{'BUY' if macd > signal_line else 'SELL' if macd < signal_line else 'NO TRADE'}]", level="debug")
         if macd > signal_line:
             return "BUY"
         elif macd < signal_line:
             return "SELL"
         return None
 
-    def evaluate_bollinger(self, df, config):
-        period = int(config["sub_indicators"]["Period"]["value"])
-        deviation = int(config["sub_indicators"]["Deviation"]["value"])
-        shift = int(config["sub_indicators"]["Shift"]["value"])
-        df.ta.bbands(length=period, std=deviation, append=True)
-        close = df["close"].iloc[-1]
-        upper = df[f"BBU_{period}_{deviation}.0"].iloc[-1]
-        lower = df[f"BBL_{period}_{deviation}.0"].iloc[-1]
-        log(f"[Bollinger Debug] {self.symbol} Close={close:.5f}, Upper={upper:.5f}, Lower={lower:.5f}")
+    def evaluate_bollinger(self, values, config):
+        close = values["close"]
+        upper = values["BBU"]
+        lower = values["BBL"]
+        log(f"[Bollinger Debug] {self.symbol} Close={close:.5f}, Upper={upper:.5f}, Lower={lower:.5f}", level="debug")
         if close < lower:
             return "BUY"
         elif close > upper:
             return "SELL"
         return None
 
-    def evaluate_stochastic(self, df, config):
-        k = int(config["sub_indicators"]["%K Period"]["value"])
-        d = int(config["sub_indicators"]["%D Period"]["value"])
-        s = int(config["sub_indicators"]["Slowing"]["value"])
-        df.ta.stoch(k=k, d=d, smooth_k=s, append=True)
-        k_val = df[f"STOCHk_{k}_{d}_{s}"].iloc[-1]
-        log(f"[Stochastic Debug] {self.symbol} %K={k_val:.2f}")
+    def evaluate_stochastic(self, values, config):
+        k_val = values["STOCHk"]
+        log(f"[Stochastic Debug] {self.symbol} %K={k_val:.2f}", level="debug")
         if k_val < 20:
             return "BUY"
         elif k_val > 80:
             return "SELL"
         return None
 
-    def evaluate_moving_average(self, df, config):
-        period = int(config["sub_indicators"]["Period"]["value"])
+    def evaluate_moving_average(self, values, config):
         shift = int(config["sub_indicators"]["Shift"]["value"])
-        df.ta.sma(length=period, append=True)
-        close = df["close"].iloc[-1]
-        ma_val = df[f"SMA_{period}"].iloc[-(1 + shift)]
-        log(f"[SMA Debug] {self.symbol} Close={close:.5f}, SMA={ma_val:.5f} (Shift: {shift}) → Suggestion: [{"BUY" if close > ma_val else "SELL" if close < ma_val else "NONE"}]")
+        close = values["close"]
+        ma_val = values["SMA_shifted"]
+        log(f"[SMA Debug] {self.symbol} Close={close:.5f}, SMA={ma_val:.5f} (Shift: {shift}) → Suggestion: [{"BUY" if close > ma_val else "SELL" if close < ma_val else "NONE"}]", level="debug")
         if close > ma_val:
             return "BUY"
         elif close < ma_val:
@@ -194,170 +170,193 @@ class StrategyEvaluator:
 
 # place_trade: Executes a trade on the master account with automatic SL/TP settings
 # Enforces one active trade per symbol to manage risk
-def place_trade(symbol, volume=1, direction_str="BUY", master_login=None):
-    with symbol_locks[symbol]:
-        direction = mt5.ORDER_TYPE_BUY if direction_str == "BUY" else mt5.ORDER_TYPE_SELL
-
-        if symbol in active_trades:
-            log(f"[❌] Trade failed: {symbol} already active")
-            return False
-
-        tick = mt5.symbol_info_tick(symbol)
-        info = mt5.symbol_info(symbol)
-
-        if not info or not tick:
-            log(f"[❌] Trade failed: Missing symbol info or tick for {symbol}")
-            return False
-
-        if not info.visible:
-            if not mt5.symbol_select(symbol, True):
-                log(f"[❌] Trade failed: Could not make {symbol} visible")
-                return False
-
-        digits = info.digits
-        volume = max(info.volume_min, round(volume / info.volume_step) * info.volume_step)
-
-        if volume <= 0:
-            log(f"[❌] Trade failed: Invalid volume for {symbol}")
-            return False
-
-        price = tick.ask if direction == mt5.ORDER_TYPE_BUY else tick.bid
-        if price is None or price <= 0:
-            log(f"[❌] Trade failed: Invalid price for {symbol}")
-            return False
-
-        # Define pip sizes per symbol type
-        if "JPY" in symbol:
-            pip = 0.01
-            sl_pips = 10   # 10 pips → 0.10
-            tp_pips = 20
-        elif symbol in ["BTCUSD", "ETHUSD"]:
-            pip = 1.0      # 1 pip = $1
-            sl_pips = 300  # 300 pips → $300
-            tp_pips = 600
-        else:
-            pip = 0.0001
-            sl_pips = 10   # 10 pips → 0.0010
-            tp_pips = 20
-
-        # Calculate SL/TP based on direction
-        sl = price - sl_pips * pip if direction == mt5.ORDER_TYPE_BUY else price + sl_pips * pip
-        tp = price + tp_pips * pip if direction == mt5.ORDER_TYPE_BUY else price - tp_pips * pip
-
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": volume,
-            "type": direction,
-            "price": round(price, digits),
-            "sl": round(sl, digits),
-            "tp": round(tp, digits),
-            "deviation": 10,
-            "magic": 234001,
-            "comment": f"Trade-{symbol}",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(request)
-        if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+def place_trade(account, symbol, volume=1, direction_str="BUY"):
+    return symbol in place_trades(account, [(symbol, direction_str)], volume)
+
+# place_trades: Routes every (symbol, direction) signal at once, so they reach the master session as one
+# order router batch (one tick per symbol, orders sent back to back); returns the filled symbols
+# Volume, SL/TP and rounding come from the symbol registry, loaded once rather than per trade
+def place_trades(account, signals, volume=1):
+    signals = dict(signals)
+    router = get_order_router()
+    registry = get_symbol_registry(account)
+    started = time.perf_counter()
+    filled = []
+    with ExitStack() as stack:
+        # Sorted so concurrent callers always take the symbol locks in the same order
+        for symbol in sorted(signals):
+            stack.enter_context(symbol_locks[symbol])
+        pending = []
+        specs = registry.specs(symbol for symbol in signals if symbol not in active_trades)
+        for symbol, direction_str in signals.items():
+            if symbol in active_trades:
+                log(f"[❌] Trade failed: {symbol} already active", level="error")
+                continue
+            spec = specs[symbol]
+            if spec is None:
+                log(f"[❌] Trade failed: Missing symbol info for {symbol}", level="error")
+                continue
+            is_buy = direction_str == "BUY"
+            future = router.open(
+                account, symbol, mt5.ORDER_TYPE_BUY if is_buy else mt5.ORDER_TYPE_SELL, volume,
+                magic=234001, comment=f"Trade-{symbol}", spec=spec,
+                stops=lambda price, spec=spec, is_buy=is_buy: spec.stops(price, is_buy),
+            )
+            pending.append((symbol, direction_str, future))
+
+        for symbol, direction_str, future in pending:
+            outcome = future.result()
+            PLACE_TRADE_SECONDS.observe(time.perf_counter() - started, account.login, symbol)
+            if not outcome.ok:
+                log(f"[❌] Trade failed: {outcome.error}", level="error")
+                if outcome.result is not None and outcome.result.retcode in SPEC_RETCODES:
+                    # The broker disagrees with the cached spec: reload it before the next trade
+                    registry.invalidate(symbol)
+                continue
+
+            # The open trade count is refreshed by on_master_positions when the position feed sees the fill
             active_trades.add(symbol)
-            try:
-                from gui import account_page
-                account_page.update_trade_count(master_login, len(mt5.positions_get() or []))
-            except Exception as e:
-                log(f"[TradeCounter] Update failed: {e}")
-            return True
-
-        log(f"[❌] Trade failed: {result.retcode if result else mt5.last_error()}")
-        return False
-
-# Runs the evaluation loop for one symbol using the loaded strategy
-# Fetches data every 10 seconds, evaluates indicators, and places trades if all agree
-def strategy_loop(master_login, master_password, master_server, symbol):
-    if not ensure_mt5_initialized(master_login, master_password, master_server):
-        log(f"[❌] MT5 Init failed for {symbol}: {mt5.last_error()}")
-        return
-    strategy = load_strategy_from_db()
-    if not strategy:
-        return
-    evaluator = StrategyEvaluator(strategy, symbol)
-    while True:
-        df = get_symbol_data(symbol)
-        if df is not None:
-            direction = evaluator.evaluate(df)
-            if direction and place_trade(symbol, direction_str=direction, master_login=master_login):
-                log(f"[✅] {direction} trade placed on {symbol}")
-        time.sleep(STRATEGY_CHECK_INTERVAL)
+            request = outcome.request
+            get_trade_ledger().record_open(
+                outcome.result.order, account.login, "master", symbol, direction_str, request["volume"],
+                request["price"], request["sl"], request["tp"], request["magic"], request["comment"],
+            )
+            filled.append(symbol)
+    return filled
+
+# Runs one evaluation for a symbol using the loaded strategy and places a trade if all indicators agree
+# Scheduled on M1 bar boundaries; returns True while the symbol can still trade so the scheduler
+# keeps re-checking it every STRATEGY_CHECK_INTERVAL seconds inside the bar
+def strategy_step(account, symbol, evaluator):
+    bars = get_symbol_data(account, symbol)
+    if bars is not None:
+        direction = evaluator.evaluate(bars)
+        if direction and place_trade(account, symbol, direction_str=direction):
+            log(f"[✅] {direction} trade placed on {symbol}", gui=True, event="trade_placed", symbol=symbol, direction=direction)
+    return symbol not in active_trades
+
+# Batched alternative to one strategy_step per symbol: refreshes every symbol's bars in one session job,
+# evaluates all of them in a single vectorized pass and places trades for the symbols that agree
+def strategy_batch_step(account, strategy, watchlist):
+    with BATCH_REFRESH_SECONDS.time(account.login):
+        rates = get_bar_cache(account, mt5.TIMEFRAME_M1).refresh(watchlist, 100)
+    names, close, high, low = stack_rates(rates)
+    if not names:
+        return True
+    signals = {symbol: direction for symbol, direction in zip(names, evaluate_batch(strategy, close, high, low))
+               if direction}
+    for symbol in place_trades(account, signals.items()):
+        direction = signals[symbol]
+        log(f"[✅] {direction} trade placed on {symbol}", gui=True, event="trade_placed", symbol=symbol, direction=direction)
+    return any(symbol not in active_trades for symbol in watchlist)
 
 # reset_all_positions: Closes all master trades and clears internal state trackers
 # Called every hour to prevent stale or stuck trades
 def reset_all_positions(master_login, master_password, master_server):
-    if not ensure_mt5_initialized(master_login, master_password, master_server):
-        log(f"[❌ Reset] MT5 Init failed for reset: {mt5.last_error()}")
+    account = MT5Account(str(master_login), master_password, master_server)
+    broker = get_broker()
+    if not broker.connect(account):
+        log(f"[❌ Reset] MT5 Init failed for reset: {broker.last_error(account)}", level="error")
         return
 
-    positions = mt5.positions_get()
-    if positions:
-        for pos in positions:
-            close_type = mt5.ORDER_TYPE_SELL if pos.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-            price = mt5.symbol_info_tick(pos.symbol).bid if close_type == mt5.ORDER_TYPE_SELL else mt5.symbol_info_tick(pos.symbol).ask
-            if not price or price <= 0:
-                log(f"[Reset] Skipped invalid price for {pos.symbol}")
-                continue
-
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": pos.symbol,
-                "volume": pos.volume,
-                "type": close_type,
-                "position": pos.ticket,
-                "price": price,
-                "deviation": 10,
-                "magic": 234001,
-                "comment": "AutoResetClose",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC
-            }
-
-            result = mt5.order_send(request)
-            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                log(f"[🔁 Reset] Closed position {pos.ticket} on {pos.symbol}")
-                # Notify slave accounts via log update
-                try:
-                    with open("closed_master_trades.json", "r") as f:
-                        closed_trades = json.load(f)
-                except (FileNotFoundError, json.JSONDecodeError):
-                    closed_trades = []
-
-                closed_trades.append({"ticket": pos.ticket, "symbol": pos.symbol})
-                with open("closed_master_trades.json", "w") as f:
-                    json.dump(closed_trades, f)
-
-            else:
-                log(f"[❌ Reset] Failed to close {pos.ticket} on {pos.symbol}: {mt5.last_error()}")
+    closed = close_all_positions(account)
+    # Notify slave accounts through the closed master trades queue
+    store = get_state_store()
+    store.record_closed_master_trades((pos.ticket, pos.symbol) for pos in closed)
 
     active_trades.clear()
     open_trade_registry.clear()
-    mt5.shutdown()
-    log("[🔄 Reset] Cleared all internal trade records.")
-    with open("last_trades.json", "w") as f:
-        json.dump([], f)
-
+    log("[🔄 Reset] Cleared all internal trade records.", gui=True, event="reset")
+    store.clear_copied()
+
+# Closes every open position on the account through the order router; returns the positions that were closed
+# All closes are queued before waiting, so they go out as one batch with one tick lookup per symbol
+def close_all_positions(account):
+    router = get_order_router()
+    pending = [
+        (pos, router.close(account, pos.ticket, pos.symbol, pos.type, pos.volume, magic=234001, comment="AutoResetClose"))
+        for pos in get_broker().positions_get(account) or []
+    ]
+    closed = []
+    for pos, future in pending:
+        outcome = future.result()
+        if outcome.ok:
+            log(f"[🔁 Reset] Closed position {pos.ticket} on {pos.symbol}", gui=True, event="reset_close", ticket=pos.ticket, symbol=pos.symbol)
+            closed.append(pos)
+        elif outcome.request is None:
+            log(f"[Reset] Skipped {pos.symbol}: {outcome.error}", level="error")
+        else:
+            log(f"[❌ Reset] Failed to close {pos.ticket} on {pos.symbol}: {outcome.error}", level="error")
+    return closed
+
+# Subscriber on the master position feed: tracks the executor's own open tickets and
+# keeps the master's open trade count on the GUI current without extra positions_get calls
+def on_master_positions(master_login, feed, events):
+    closed = []
+    for event in events:
+        if not event.position.comment.startswith("Trade-"):
+            continue
+        if event.kind == OPENED:
+            open_trade_registry[event.position.ticket] = event.position.symbol
+        elif event.kind == CLOSED:
+            open_trade_registry.pop(event.position.ticket, None)
+            closed.append(event.position)
+    if closed:
+        record_master_closes(feed.account, closed)
+    update_trade_count(master_login, len(feed.positions))
+
+# Looks up exit price, P/L and reason of closed master positions in the deal history and records
+# them in the ledger; runs as a session job so the feed thread does not wait for it
+def record_master_closes(account, positions):
+    def lookup(mt5):
+        return [(pos, closed_position_result(mt5, pos.ticket)) for pos in positions]
+
+    def record(future):
+        if future.exception() is not None:
+            return
+        ledger = get_trade_ledger()
+        for pos, result in future.result():
+            price, profit, reason, close_time = result or (None, None, "unknown", None)
+            ledger.record_close(pos.ticket, account.login, pos.symbol, price, profit, reason, close_time)
+
+    get_broker().submit(account, lookup).add_done_callback(record)
 
 def strategy_loop_for_all(master_login, master_password, master_server, logger=None):
-    global gui_logger
-    gui_logger = logger
+    get_trade_logger().set_gui_sink("executor", logger)
+    account = MT5Account(str(master_login), master_password, master_server)
+    broker = get_broker()
+    if not broker.connect(account):
+        log(f"[❌] MT5 Init failed for strategy executor: {broker.last_error(account)}", level="error")
+        return
+    strategy = load_strategy_from_db()
+    if not strategy:
+        return
+
+    feed = get_position_feed(account)
+    feed.subscribe(lambda events: on_master_positions(str(master_login), feed, events))
+    # Every watchlist spec in one session job, so no trade waits on symbol_info
+    registry = get_symbol_registry(account)
+    registry.load(symbols)
+
     def periodic_reset():
-        while True:
-            log("[✅] 30 minute cycle begins now")
-            time.sleep(1800)  # 30 mins
-            reset_all_positions(master_login, master_password, master_server)
-            time.sleep(2)
-            log("[✅] 30 minute cycle ended. New cycle now")
-            
-    threading.Thread(target=periodic_reset, daemon=True).start()
+        reset_all_positions(master_login, master_password, master_server)
+        log("[✅] 30 minute cycle ended. New cycle now", gui=True)
+
+    scheduler = get_scheduler()
+    log("[✅] 30 minute cycle begins now", gui=True)
+    scheduler.add("reset", periodic_reset, FixedInterval(RESET_INTERVAL), start_delay=RESET_INTERVAL)
+    scheduler.add("symbols", registry.refresh, FixedInterval(SYMBOL_REFRESH_INTERVAL), start_delay=SYMBOL_REFRESH_INTERVAL)
+    if BATCH_EVALUATION:
+        scheduler.add(
+            "strategy:batch",
+            lambda: strategy_batch_step(account, strategy, symbols),
+            BarAligned(offset=BAR_CLOSE_OFFSET, intrabar=STRATEGY_CHECK_INTERVAL),
+        )
+        return
     for symbol in symbols:
-        threading.Thread(target=strategy_loop, args=(master_login, master_password, master_server, symbol), daemon=True).start()
-        time.sleep(1)
\ No newline at end of file
+        evaluator = StrategyEvaluator(strategy, symbol)
+        scheduler.add(
+            f"strategy:{symbol}",
+            lambda symbol=symbol, evaluator=evaluator: strategy_step(account, symbol, evaluator),
+            BarAligned(offset=BAR_CLOSE_OFFSET, intrabar=STRATEGY_CHECK_INTERVAL),
+        )
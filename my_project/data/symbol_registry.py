@@ -0,0 +1,129 @@
+# Symbol metadata per account, loaded from symbol_info once and kept in memory
+# Each SymbolSpec carries everything order construction needs (digits, pip size, volume limits and the
+# SL/TP price offsets from trade_rules), so building an order is a lookup plus arithmetic with no broker
+# calls. The watchlist is loaded in one session job at executor start, symbols seen later are loaded on
+# first use, refresh() re-reads every known symbol on a schedule, and invalidate() drops a symbol whose
+# spec the broker just rejected so the next order reloads it.
+import threading
+from collections import namedtuple
+
+from data.trade_rules import pip_settings
+
+SYMBOL_REFRESH_INTERVAL = 3600  # symbol specs rarely change intraday; rejected orders also trigger a reload
+
+_SymbolSpec = namedtuple("SymbolSpec", [
+    "symbol", "digits", "point", "pip", "volume_min", "volume_max", "volume_step", "volume_digits",
+    "sl_offset", "tp_offset",
+])
+
+
+# SymbolSpec: Precomputed order parameters of one symbol
+class SymbolSpec(_SymbolSpec):
+    __slots__ = ()
+
+    def volume(self, volume):
+        """Round to the volume step and clamp to the symbol's limits."""
+        volume = max(self.volume_min, round(volume / self.volume_step) * self.volume_step)
+        return round(min(volume, self.volume_max), self.volume_digits)
+
+    def price(self, price):
+        return round(price, self.digits)
+
+    def stops(self, price, is_buy):
+        """(sl, tp) for an entry at price, rounded to the symbol's digits."""
+        if is_buy:
+            return round(price - self.sl_offset, self.digits), round(price + self.tp_offset, self.digits)
+        return round(price + self.sl_offset, self.digits), round(price - self.tp_offset, self.digits)
+
+
+def _decimals(step):
+    text = f"{step:.8f}".rstrip("0")
+    return len(text.split(".")[1]) if "." in text else 0
+
+
+def spec_from_info(symbol, info):
+    pip, sl_pips, tp_pips = pip_settings(symbol)
+    return SymbolSpec(
+        symbol, info.digits, info.point, pip, info.volume_min, info.volume_max or float("inf"), info.volume_step,
+        _decimals(info.volume_step), sl_pips * pip, tp_pips * pip,
+    )
+
+
+# Runs in the account's session: one symbol_info per symbol, symbol_select only for hidden ones
+def _load_specs(mt5, symbols):
+    specs = {}
+    for symbol in symbols:
+        info = mt5.symbol_info(symbol)
+        if info is None or info.volume_step <= 0:
+            specs[symbol] = None
+            continue
+        if not info.visible and not mt5.symbol_select(symbol, True):
+            specs[symbol] = None
+            continue
+        specs[symbol] = spec_from_info(symbol, info)
+    return specs
+
+
+# SymbolRegistry: Loaded SymbolSpecs of one account
+class SymbolRegistry:
+    def __init__(self, account, broker=None):
+        self.account = account
+        self.broker = broker
+        self.symbols = {}  # symbol -> SymbolSpec or None when the broker has no usable info
+        self.lock = threading.Lock()
+        self.loads = 0
+
+    def _fetch(self, symbols):
+        if self.broker is None:
+            from data.mt5_session import get_broker
+            self.broker = get_broker()
+        specs = self.broker.run(self.account, lambda mt5: _load_specs(mt5, symbols))
+        with self.lock:
+            self.loads += 1
+            changed = [symbol for symbol, spec in specs.items()
+                       if symbol in self.symbols and self.symbols[symbol] != spec]
+            self.symbols.update(specs)
+        return specs, changed
+
+    def specs(self, symbols):
+        """{symbol: SymbolSpec or None}; symbols not loaded yet are fetched together in one session job."""
+        symbols = list(dict.fromkeys(symbols))
+        with self.lock:
+            missing = [symbol for symbol in symbols if symbol not in self.symbols]
+        if missing:
+            self._fetch(missing)
+        with self.lock:
+            return {symbol: self.symbols.get(symbol) for symbol in symbols}
+
+    def get(self, symbol):
+        return self.specs([symbol])[symbol]
+
+    def load(self, symbols):
+        """Load (or reload) the given symbols in one session job; returns their specs."""
+        return self._fetch(list(dict.fromkeys(symbols)))[0]
+
+    def refresh(self):
+        """Scheduler job: re-read every known symbol. Returns the symbols whose spec changed."""
+        with self.lock:
+            symbols = list(self.symbols)
+        if not symbols:
+            return []
+        return self._fetch(symbols)[1]
+
+    def invalidate(self, symbol):
+        with self.lock:
+            self.symbols.pop(symbol, None)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_symbol_registry(account):
+    """Shared registry per account login."""
+    key = str(account.login)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = SymbolRegistry(account)
+        return registry
@@ -0,0 +1,116 @@
+# Master -> slave ticket map for the trade copier, persisted in the state store
+# Indexed both ways in memory: master ticket -> {slave login: trade} for closures, and
+# (slave login, slave ticket) -> master ticket for matching slave positions during reconcile.
+# Every change is written through to the store, and on startup the map is reconciled against the
+# slaves' open positions (one positions_get per slave), using the Copy{ticket} order comments to
+# recover copies the store does not know about and dropping copies that were closed meanwhile
+import re
+import threading
+
+COPY_COMMENT = re.compile(r"^Copy(\d+)")
+
+
+def master_ticket_from_comment(comment):
+    """Master ticket encoded in a copy's comment ("Copy123456"), or None."""
+    match = COPY_COMMENT.match(comment or "")
+    return int(match.group(1)) if match else None
+
+
+# SlaveTradeMap: What the copier has open on each slave, keyed by master ticket
+# A slave trade is a dict with ticket, symbol, volume, type and comment (the master's comment, or the
+# copy's own comment for copies recovered from the slave)
+class SlaveTradeMap:
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.by_master = {}
+        self.by_slave = {}
+        for master_ticket, login, ticket, symbol, volume, type_, comment in store.slave_trades():
+            self._index(master_ticket, login, {
+                "ticket": ticket, "symbol": symbol, "volume": volume, "type": type_, "comment": comment or ""
+            })
+
+    def _index(self, master_ticket, login, trade):
+        self.by_master.setdefault(master_ticket, {})[login] = trade
+        self.by_slave[(login, trade["ticket"])] = master_ticket
+
+    def _unindex(self, master_ticket, login):
+        trades = self.by_master.get(master_ticket, {})
+        trade = trades.pop(login, None)
+        if trade is not None:
+            self.by_slave.pop((login, trade["ticket"]), None)
+        if not trades:
+            self.by_master.pop(master_ticket, None)
+        return trade
+
+    def __contains__(self, master_ticket):
+        return master_ticket in self.by_master
+
+    def __len__(self):
+        return len(self.by_master)
+
+    def masters(self):
+        with self.lock:
+            return list(self.by_master)
+
+    def slave_trades(self):
+        """[(master_ticket, login, trade)] for every open copy."""
+        with self.lock:
+            return [(master_ticket, login, trade)
+                    for master_ticket, trades in self.by_master.items() for login, trade in trades.items()]
+
+    def add(self, master_ticket, login, trade):
+        with self.lock:
+            self._unindex(master_ticket, login)
+            self._index(master_ticket, login, trade)
+        self.store.add_slave_trades([(master_ticket, login, trade)])
+
+    def pop(self, master_ticket):
+        """Remove and return {login: trade} for a master ticket."""
+        with self.lock:
+            trades = self.by_master.pop(master_ticket, {})
+            for login, trade in trades.items():
+                self.by_slave.pop((login, trade["ticket"]), None)
+        if trades:
+            self.store.remove_master_trades(master_ticket)
+        return trades
+
+    def remove(self, entries):
+        """Drop single copies by (master_ticket, login)."""
+        removed = []
+        with self.lock:
+            for master_ticket, login in entries:
+                trade = self._unindex(master_ticket, login)
+                if trade is not None:
+                    removed.append((login, trade["ticket"]))
+        if removed:
+            self.store.remove_slave_trades(removed)
+
+    def reconcile(self, positions_by_login):
+        """Bring the map in line with the slaves' open positions: {login: [position, ...] or None}.
+        Unreachable slaves (None) are left as they are. Returns the master tickets found by comment."""
+        added, removed, recovered = [], [], set()
+        with self.lock:
+            for login, positions in positions_by_login.items():
+                if positions is None:
+                    continue
+                open_tickets = {pos.ticket: pos for pos in positions}
+                for (slave_login, ticket), master_ticket in list(self.by_slave.items()):
+                    if slave_login == login and ticket not in open_tickets:
+                        self._unindex(master_ticket, login)
+                        removed.append((login, ticket))
+                for pos in positions:
+                    master_ticket = master_ticket_from_comment(pos.comment)
+                    if master_ticket is None or (login, pos.ticket) in self.by_slave:
+                        continue
+                    trade = {"ticket": pos.ticket, "symbol": pos.symbol, "volume": pos.volume,
+                             "type": pos.type, "comment": pos.comment}
+                    self._unindex(master_ticket, login)
+                    self._index(master_ticket, login, trade)
+                    added.append((master_ticket, login, trade))
+                    recovered.add(master_ticket)
+        if removed:
+            self.store.remove_slave_trades(removed)
+        if added:
+            self.store.add_slave_trades(added)
+        return recovered
@@ -1,206 +1,424 @@
 # Monitors the master account for new or closed trades and mirrors them on all connected slave accounts
 # Implements session handling, duplicate prevention, and closure tracking
-import MetaTrader5 as mt5
+import queue
 import time
-import json
-from datetime import datetime
-import threading
-
-log_lock = threading.Lock()
-gui_logger = None
-
-def log(message):
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    full_msg = f"[{timestamp}] {message}"
-    with log_lock:
-        print(full_msg)
-    if gui_logger and ("trade copied" in message or "close on slave" in message):
-        gui_logger(full_msg)
-    try:
-        with open("trade_log.txt", "a", encoding="utf-8") as f:
-            f.write(full_msg + "\n")
-    except Exception as e:
-        print(f"[Logger Error] Failed to write to log file: {e}")
+from collections import namedtuple
+from data.mt5_session import get_broker, as_account, separate_terminals, MT5SessionError
+from data.order_router import OrderRouter
+from data.position_feed import get_position_feed, OPENED, CLOSED
+from data.scheduler import get_scheduler, AdaptiveInterval
+from data.trade_log import get_trade_logger, source_logger
+from data.state_store import get_state_store
+from data.ticket_map import SlaveTradeMap
+from data.trade_ledger import get_trade_ledger, closed_position_result
+from data.account_status import update_trade_count
+from data.metrics import get_metrics
+
+USE_PROCESS_POOL = False
+COPIER_FAST_POLL = 0.25
+COPIER_IDLE_POLL = 2.0
+SLAVE_CLOSE_CHECK = 30.0  # seconds between checks for copies the slaves closed on their own (SL/TP)
+
+# Plain, picklable copy of the master position fields a slave needs to mirror a trade
+CopyOrder = namedtuple("CopyOrder", ["ticket", "symbol", "volume", "type", "sl", "tp", "comment"])
+# Open slave position fields needed to rebuild the ticket map after a restart
+SlavePosition = namedtuple("SlavePosition", ["ticket", "symbol", "volume", "type", "comment"])
+
+# Queued, non-blocking log; copies and slave closes are flagged gui=True for the account page
+log = source_logger("copier")
+
+# Master event -> every slave answered; per-slave MT5 time is in mt5_call_seconds
+# Positions from one poll go to the slaves as one batch, so the latency is observed once per batch and
+# the positions it carried are counted per symbol (seconds_sum / positions_total gives the per-position cost)
+COPY_BATCH_SECONDS = get_metrics().histogram("copier_copy_batch_seconds", "Opening one batch of master positions on all slaves")
+CLOSE_BATCH_SECONDS = get_metrics().histogram("copier_close_batch_seconds", "Closing one batch of master positions' copies")
+COPIED_POSITIONS = get_metrics().counter("copier_copied_positions_total", "Master positions sent to the slaves", ("symbol",))
+CLOSED_POSITIONS = get_metrics().counter("copier_closed_positions_total", "Master positions whose copies were closed",
+                                         ("symbol",))
 
 # Core function for detecting and replicating trades from master to slave accounts
 # Handles trade opening and closing while enforcing one-direction-per-symbol rule
-def copy_master_trades(master, slaves, logger=None):
-    global gui_logger
-    gui_logger = logger
-
-    try:
-        with open("last_trades.json", "r") as f:
-            last_trade_ids = set(json.load(f))
-    except (FileNotFoundError, json.JSONDecodeError):
-        last_trade_ids = set()
-
-    copied_this_session = set(last_trade_ids)
-    slave_trade_map = {}
+# Master changes arrive as events from the shared position feed; slave fills go through a backend
+# that is either serial on the shared session or a process-per-slave pool (use_process_pool=True)
+def copy_master_trades(master, slaves, logger=None, use_process_pool=USE_PROCESS_POOL):
+    get_trade_logger().set_gui_sink("copier", logger)
+    master = as_account(master)
+    slaves = [as_account(slave) for slave in slaves]
+    if use_process_pool and not separate_terminals([master] + slaves):
+        # Worker processes sharing a terminal would log it into each other's accounts mid-order
+        log("[Copier] Process pool needs a separate terminal path for every account; "
+            "copying on the shared session instead", level="warning")
+        use_process_pool = False
+    if use_process_pool:
+        from data.copier_pool import SlaveExecutionPool
+        backend = SlaveExecutionPool(slaves).start()
+        log(f"[Copier] Process pool started with {len(slaves)} slave workers")
+    else:
+        backend = SerialSlaveBackend(get_broker(), slaves)
+
+    feed = get_position_feed(master)
+    copier = TradeCopier(backend, feed=feed)
+    copier.recover()
+    scheduler = get_scheduler()
+    # Runs immediately whenever the feed delivers events, otherwise backs off while idle
+    scheduler.add("copier", copier.run_pending, AdaptiveInterval(COPIER_FAST_POLL, COPIER_IDLE_POLL))
+    feed.subscribe(lambda events: copier.enqueue(events, scheduler))
     log("[Copier] Monitoring master account for new trades...")
+    return copier
 
-    while True:
-        time.sleep(1)
+# TradeCopier: Applies master position events to the slaves and remembers what it copied
+# Copied master tickets and the master -> slave ticket map are persisted in the state store as they
+# change, so closures after a restart still target exactly the copies of the closed master trade
+class TradeCopier:
+    def __init__(self, backend, store=None, feed=None):
+        self.backend = backend
+        self.store = store or get_state_store()
+        self.feed = feed
+        self.copied_tickets = self.store.copied_tickets()
+        self.slave_trade_map = SlaveTradeMap(self.store)
+        self.orphans_checked = feed is None
+        self.pending = queue.Queue()
+        self.slave_closes_checked = time.monotonic()
 
-        # === NEW LOGIC: Check for closed trades ===
-        try:
-            with open("closed_master_trades.json", "r") as f:
-                closed_trades = json.load(f)
-        except Exception:
-            closed_trades = []
+    def recover(self):
+        """Reconcile the stored ticket map with the slaves' open positions (one positions_get per slave)."""
+        # Copies closed by SL/TP while the copier was down are recorded before reconcile drops them
+        self.check_slave_closes()
+        recovered = self.slave_trade_map.reconcile(self.backend.slave_positions())
+        new = recovered - self.copied_tickets
+        if new:
+            self.copied_tickets |= new
+            self.store.add_copied(new)
+        log(f"[Copier] Ticket map ready: {len(self.slave_trade_map)} copied master trades open "
+            f"({len(recovered)} recovered from slave comments)")
 
-        for closed in closed_trades:
-            closed_symbol = closed.get("symbol")
-            if not closed_symbol:
-                continue
+    def close_orphans(self):
+        """Close copies of master trades that were closed while the copier was not running."""
+        self.orphans_checked = True
+        open_masters = set(self.feed.positions)
+        self.close_copies([ticket for ticket in self.slave_trade_map.masters() if ticket not in open_masters])
 
-            for slave in slaves:
-                if not mt5.initialize(login=int(slave["login"]), password=slave["password"], server=slave["server"]):
-                    log(f"[❌ Slave Close Init] Failed to init slave {slave['login']}")
-                    continue
+    def enqueue(self, events, scheduler):
+        # Called on the feed thread: hand the events to the copier job instead of filling here
+        self.pending.put(events)
+        scheduler.trigger("copier")
 
-                slave_positions = mt5.positions_get(symbol=closed_symbol)
-                if slave_positions:
-                    for pos in slave_positions:
-                        close_type = mt5.ORDER_TYPE_SELL if pos.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-                        tick = mt5.symbol_info_tick(pos.symbol)
-                        if not tick:
-                            continue
-                        price = tick.bid if close_type == mt5.ORDER_TYPE_SELL else tick.ask
-
-                        close_request = {
-                            "action": mt5.TRADE_ACTION_DEAL,
-                            "symbol": pos.symbol,
-                            "volume": pos.volume,
-                            "type": close_type,
-                            "position": pos.ticket,
-                            "price": price,
-                            "deviation": 10,
-                            "magic": 234001,
-                            "comment": "MasterClosed",
-                            "type_time": mt5.ORDER_TIME_GTC,
-                            "type_filling": mt5.ORDER_FILLING_IOC
-                        }
-
-                        # Detect master trades that have been closed
-                        # Send closure request to corresponding trade on each slave
-                        result = mt5.order_send(close_request)
-                        if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                            log(f"[🔁 Slave Close] {pos.symbol} on {slave['login']}")
-                        else:
-                            log(f"[❌ Slave Close Fail] {pos.symbol} on {slave['login']}")
-
-        open("closed_master_trades.json", "w").write("[]")
-
-        if not mt5.initialize(login=int(master["login"]), password=master["password"], server=master["server"]):
-            log(f"[❌ Copier] Failed to initialize master: {mt5.last_error()}")
-            time.sleep(10)
-            continue
-
-        master_positions = mt5.positions_get()
-        current_master_tickets = set(pos.ticket for pos in master_positions) if master_positions else set()
-        new_copy_logs = []
-
-        # Check for newly opened trades by comparing current master tickets to the last known list
-        # Skip trades that were already copied to avoid duplication
-        for pos in master_positions or []:
-            ticket = pos.ticket
-            if ticket in copied_this_session:
-                continue
+    def run_pending(self):
+        """Scheduler job: apply queued master events and reset closures. Returns True if it did work."""
+        active = self.process_closed_master_trades()
+        if not self.orphans_checked and self.feed.polled:
+            self.close_orphans()
+        if time.monotonic() - self.slave_closes_checked >= SLAVE_CLOSE_CHECK:
+            self.check_slave_closes()
+        while True:
+            try:
+                events = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_events(events)
+            active = True
+        return active
 
-            # Send trade order to each slave account
-            # Trade parameters (symbol, volume, SL, TP, etc.) mirror the master exactly
-            for slave in slaves:
-                if not mt5.initialize(login=int(slave["login"]), password=slave["password"], server=slave["server"]):
-                    log(f"[❌ Copier] Failed to connect to slave {slave['login']}")
-                    continue
+    def handle_events(self, events):
+        copied_before = set(self.copied_tickets)
+        opened = []
+        closed = []
+        for event in events:
+            if event.kind == OPENED:
+                # Skip trades that were already copied to avoid duplication
+                if event.position.ticket not in self.copied_tickets:
+                    opened.append(event.position)
+            elif event.kind == CLOSED:
+                closed.append(event.position.ticket)
+        # Opens go first so a position opened and closed within one poll is still closed on the slaves
+        new_copy_logs = self.copy_positions(opened)
+        # Match ticket on slave, determine correct close type (opposite of original),
+        # and send a close order to MT5
+        self.close_copies([ticket for ticket in closed if ticket in self.slave_trade_map])
 
-                price = mt5.symbol_info_tick(pos.symbol).ask if pos.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(pos.symbol).bid
+        for msg, fields in new_copy_logs:
+            log(msg, gui=True, event="copied", **fields)
 
-                request = {
-                    "action": mt5.TRADE_ACTION_DEAL,
+        # Persist only the newly copied tickets so they survive application restarts
+        if len(self.copied_tickets) != len(copied_before):
+            self.store.add_copied(self.copied_tickets - copied_before)
+
+    def copy_positions(self, positions):
+        """Send master positions to every slave; each slave gets all of them as one batch (in parallel when
+        the process pool is used). Returns the log lines for the copies made."""
+        positions = list({pos.ticket: pos for pos in positions}.values())
+        if not positions:
+            return []
+        # Trade parameters (symbol, volume, SL, TP, etc.) mirror the master exactly
+        orders = [CopyOrder(pos.ticket, pos.symbol, pos.volume, pos.type, pos.sl, pos.tp, pos.comment) for pos in positions]
+        started = time.perf_counter()
+        results = self.backend.open_copies(orders)
+        COPY_BATCH_SECONDS.observe(time.perf_counter() - started)
+        logs = []
+        for pos, outcomes in zip(positions, results):
+            COPIED_POSITIONS.inc(pos.symbol)
+            logs.extend(self._record_copies(pos, outcomes))
+        return logs
+
+    def _record_copies(self, pos, outcomes):
+        logs = []
+        ticket = pos.ticket
+        for login, outcome in outcomes.items():
+            if outcome is None:
+                log(f"[❌ Copier] Failed to connect to slave {login}", level="error")
+                continue
+
+            slave_ticket, open_count, fill_price = outcome
+            if slave_ticket is not None:
+                get_trade_ledger().record_open(
+                    slave_ticket, login, "slave", pos.symbol, "BUY" if pos.type == 0 else "SELL", pos.volume,
+                    fill_price, pos.sl, pos.tp, 123456, f"Copy{ticket}", master_ticket=ticket,
+                )
+                update_trade_count(login, open_count)
+                logs.append((f"[Copier] ✅ Trade copied to slave {login} (ticket {slave_ticket})",
+                             {"login": login, "master_ticket": ticket, "ticket": slave_ticket, "symbol": pos.symbol}))
+                self.slave_trade_map.add(ticket, login, {
+                    "ticket": slave_ticket,
                     "symbol": pos.symbol,
                     "volume": pos.volume,
                     "type": pos.type,
-                    "price": price,
-                    "sl": pos.sl,
-                    "tp": pos.tp,
-                    "deviation": 10,
-                    "magic": 123456,
-                    "comment": f"Copy{ticket}",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                    "type_filling": mt5.ORDER_FILLING_IOC
-                }
-
-                result = mt5.order_send(request)
-                if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                    from gui.account_page import trade_counter, update_trade_count
-                    trade_counter[slave['login']] = trade_counter.get(slave['login'], 0) + 1
-                    update_trade_count(slave['login'], len(mt5.positions_get() or []))
-                    new_copy_logs.append(f"[Copier] ✅ Trade copied to slave {slave['login']} (ticket {result.order})")
-                    slave_trade_map.setdefault(ticket, {})[slave['login']] = {
-                        "ticket": result.order,
-                        "symbol": pos.symbol,
-                        "volume": pos.volume,
-                        "type": pos.type,
-                        "comment": pos.comment
-                    }
-
-            copied_this_session.add(ticket)
-            last_trade_ids.add(ticket)
-
-        for msg in new_copy_logs:
-            log(msg)
+                    "comment": pos.comment
+                })
 
-        # Match ticket on slave, determine correct close type (opposite of original),
-        # and send a close order to MT5
-        closed_tickets = set(slave_trade_map.keys()) - current_master_tickets
-        # Save updated list of copied master tickets to disk
-        # Ensures persistence across application restarts
-        for ticket in closed_tickets:
-            for slave in slaves:
-                login = slave['login']
-                slave_trade = slave_trade_map[ticket].get(login)
-                if not slave_trade:
-                    continue
+        self.copied_tickets.add(ticket)
+        return logs
 
-                if not mt5.initialize(login=int(login), password=slave["password"], server=slave["server"]):
-                    log(f"[❌ Copier] Failed to reconnect to slave {login} for closure")
-                    continue
+    def close_copies(self, tickets):
+        """Close the slave copies of the given master tickets; each slave gets all of its closes as one batch."""
+        closing = [(ticket, self.slave_trade_map.pop(ticket)) for ticket in dict.fromkeys(tickets)]
+        if not closing:
+            return
+        started = time.perf_counter()
+        results = self.backend.close_copies([slave_trades for _, slave_trades in closing])
+        CLOSE_BATCH_SECONDS.observe(time.perf_counter() - started)
+        failed = []
+        for (ticket, slave_trades), outcomes in zip(closing, results):
+            CLOSED_POSITIONS.inc(next(iter(slave_trades.values()), {}).get("symbol", ""))
+            failed.extend(self._log_closes(ticket, slave_trades, outcomes))
+        if failed:
+            # A copy that hit its own SL/TP first cannot be closed any more; its deals say how it closed
+            recorded = {(login, trade["ticket"]) for _, login, trade in self._record_slave_closes(failed)}
+            for _, login, trade in failed:
+                if (login, trade["ticket"]) not in recorded:
+                    log(f"[❌ Copier] Failed to close trade {trade['ticket']} on slave {login}", level="error")
 
-                close_price = mt5.symbol_info_tick(slave_trade["symbol"]).bid if slave_trade["type"] == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(slave_trade["symbol"]).ask
-                close_request = {
-                    "action": mt5.TRADE_ACTION_DEAL,
-                    "symbol": slave_trade["symbol"],
-                    "volume": slave_trade["volume"],
-                    "type": mt5.ORDER_TYPE_SELL if slave_trade["type"] == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY,
-                    "position": slave_trade["ticket"],
-                    "price": close_price,
-                    "deviation": 10,
-                    "magic": 123456,
-                    "comment": "AutoClose",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                    "type_filling": mt5.ORDER_FILLING_IOC
-                }
-
-                result = mt5.order_send(close_request)
-                if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                    from gui.account_page import trade_counter, update_trade_count
-                    trade_counter[login] = max(0, trade_counter.get(login, 1) - 1)
-                    update_trade_count(login, len(mt5.positions_get() or []))
-                    reason = slave_trade.get("comment", "").lower()
-                    if "tp" in reason:
-                        icon = "✅ TP"
-                    elif "sl" in reason:
-                        icon = "🛑 SL"
-                    else:
-                        icon = "😊 Manual"
-                    log(f"{icon} close on {slave_trade['symbol']} (ticket {slave_trade['ticket']}) [close on slave {login}]")
+    def _log_closes(self, ticket, slave_trades, outcomes):
+        """Record and log the closes the slaves made. Returns [(ticket, login, trade)] of the failed ones."""
+        failed = []
+        for login, outcome in outcomes.items():
+            slave_trade = slave_trades[login]
+            if outcome is None:
+                log(f"[❌ Copier] Failed to reconnect to slave {login} for closure", level="error")
+                continue
+
+            close_ticket, open_count, result = outcome
+            if close_ticket is not None:
+                price, profit, _, close_time = result or (None, None, None, None)
+                get_trade_ledger().record_close(slave_trade["ticket"], login, slave_trade["symbol"], price, profit,
+                                                "master_closed", close_time)
+                update_trade_count(login, open_count)
+                reason = slave_trade.get("comment", "").lower()
+                if "tp" in reason:
+                    icon = "✅ TP"
+                elif "sl" in reason:
+                    icon = "🛑 SL"
                 else:
-                    log(f"[❌ Copier] Failed to close trade {slave_trade['ticket']} on slave {login}")
+                    icon = "😊 Manual"
+                log(f"{icon} close on {slave_trade['symbol']} (ticket {slave_trade['ticket']}) [close on slave {login}]",
+                    gui=True, event="closed", login=login, master_ticket=ticket, ticket=slave_trade["ticket"],
+                    symbol=slave_trade["symbol"])
+            else:
+                failed.append((ticket, login, slave_trade))
+        return failed
+
+    def check_slave_closes(self):
+        """Record copies the slaves closed on their own (SL/TP, stop out, manual) and drop them from the map."""
+        self.slave_closes_checked = time.monotonic()
+        recorded = self._record_slave_closes(self.slave_trade_map.slave_trades())
+        self.slave_trade_map.remove((ticket, login) for ticket, login, _ in recorded)
+
+    def _record_slave_closes(self, trades):
+        """Ledger rows for the given (master ticket, login, trade) copies that are closed on their slave,
+        from the slaves' deal history. Returns the entries recorded; open or unreachable ones are skipped."""
+        if not trades:
+            return []
+        by_login = {}
+        for ticket, login, trade in trades:
+            by_login.setdefault(login, {})[trade["ticket"]] = (ticket, trade)
+        recorded = []
+        closed = self.backend.closed_copies({login: list(copies) for login, copies in by_login.items()})
+        for login, results in closed.items():
+            for slave_ticket, result in (results or {}).items():
+                if result is None:
+                    continue  # gone from the slave, but its closing deal is not in the history yet
+                ticket, trade = by_login[login][slave_ticket]
+                price, profit, reason, close_time = result
+                get_trade_ledger().record_close(slave_ticket, login, trade["symbol"], price, profit, reason, close_time)
+                icon = {"tp": "✅ TP", "sl": "🛑 SL"}.get(reason, "😊 Manual")
+                log(f"{icon} close on {trade['symbol']} (ticket {slave_ticket}) [closed on slave {login}]",
+                    gui=True, event="closed", login=login, master_ticket=ticket, ticket=slave_ticket,
+                    symbol=trade["symbol"])
+                recorded.append((ticket, login, trade))
+        return recorded
+
+    def process_closed_master_trades(self):
+        """Close slave positions for master trades closed by the periodic reset."""
+        # The reset appends to the queue; this is one indexed lookup while nothing is pending
+        if not self.store.has_pending_closed():
+            return False
+        closed_trades = self.store.pending_closed_master_trades()
+
+        legacy_symbols = []
+        mapped = []
+        for _, ticket, symbol in closed_trades:
+            if ticket in self.slave_trade_map:
+                mapped.append(ticket)
+            elif ticket is None and symbol:
+                legacy_symbols.append(symbol)
+            # Otherwise the feed's CLOSED event already closed the copies, or nothing was copied
+        # A reset sweep closes every master trade at once: their copies go out as one batch per slave
+        self.close_copies(mapped)
+
+        # Entries without a master ticket can only be matched by symbol, one close_symbol per symbol
+        for closed_symbol in dict.fromkeys(legacy_symbols):
+            # Send closure request to corresponding trade on each slave
+            for login, results in self.backend.close_symbol(closed_symbol).items():
+                if results is None:
+                    log(f"[❌ Slave Close Init] Failed to init slave {login}", level="error")
+                    continue
+                for symbol, ok in results:
+                    if ok:
+                        log(f"[🔁 Slave Close] {symbol} on {login}")
+                    else:
+                        log(f"[❌ Slave Close Fail] {symbol} on {login}", level="error")
+
+        # Only the rows read above are marked, so closures appended meanwhile are kept for the next run
+        self.store.mark_closed_processed(row_id for row_id, _, _ in closed_trades)
+        return True
+
+# SerialSlaveBackend: Fills slaves on the shared session broker through an order router
+# Every slave's orders are queued before waiting, so each slave session sends its whole batch back to back
+# Every method returns {login: outcome}, with outcome None when the slave session is unreachable
+class SerialSlaveBackend:
+    def __init__(self, broker, slaves):
+        self.broker = broker
+        self.slaves = slaves
+        self.router = OrderRouter(broker)
+
+    def _each(self, fn, slaves=None):
+        outcomes = {}
+        for slave in slaves if slaves is not None else self.slaves:
+            try:
+                outcomes[slave.login] = self.broker.run(slave, fn)
+            except MT5SessionError:
+                outcomes[slave.login] = None
+        return outcomes
+
+    @staticmethod
+    def _gather(futures, convert):
+        outcomes = {}
+        for login, future in futures.items():
+            try:
+                outcomes[login] = convert(future.result())
+            except MT5SessionError:
+                outcomes[login] = None
+        return outcomes
+
+    def open_copy(self, order):
+        return self.open_copies([order])[0]
+
+    def open_copies(self, orders):
+        """open_copy for several master positions at once; returns one {login: outcome} per order."""
+        pending = [
+            {slave.login: self.router.open(slave, order.symbol, order.type, order.volume, order.sl, order.tp,
+                                           magic=123456, comment=f"Copy{order.ticket}", count=True)
+             for slave in self.slaves}
+            for order in orders
+        ]
+        return [self._gather(futures, _copy_opened) for futures in pending]
+
+    def close_copy(self, slave_trades):
+        return self.close_copies([slave_trades])[0]
+
+    def close_copies(self, many):
+        """close_copy for several master tickets at once; returns one {login: outcome} per entry of many."""
+        pending = [
+            {slave.login: self._close(slave, trades[slave.login], 123456, "AutoClose", count=True, deals=True)
+             for slave in self.slaves if slave.login in trades}
+            for trades in many
+        ]
+        return [self._gather(futures, _copy_closed) for futures in pending]
+
+    def close_symbol(self, symbol):
+        outcomes = self._each(lambda mt5: mt5.positions_get(symbol=symbol) or [])
+        pending = {
+            slave.login: [(pos.symbol, self._close(slave, pos._asdict(), 234001, "MasterClosed"))
+                          for pos in outcomes[slave.login]]
+            for slave in self.slaves if outcomes[slave.login] is not None
+        }
+        for login, closes in pending.items():
+            try:
+                outcomes[login] = [(pos_symbol, future.result().ok) for pos_symbol, future in closes]
+            except MT5SessionError:
+                outcomes[login] = None
+        return outcomes
+
+    def _close(self, slave, trade, magic, comment, **options):
+        return self.router.close(slave, trade["ticket"], trade["symbol"], trade["type"], trade["volume"],
+                                 magic=magic, comment=comment, **options)
+
+    def slave_positions(self):
+        return self._each(_copied_positions_on_slave)
+
+    def closed_copies(self, tickets_by_login):
+        """{login: {slave ticket: closed_position_result}} for the given tickets no longer open on the slave."""
+        outcomes = {}
+        for slave in self.slaves:
+            if slave.login not in tickets_by_login:
+                continue
+            tickets = tickets_by_login[slave.login]
+            try:
+                outcomes[slave.login] = self.broker.run(slave, lambda mt5: _closed_copies_on_slave(mt5, tickets))
+            except MT5SessionError:
+                outcomes[slave.login] = None
+        return outcomes
+
+    def stop(self):
+        pass
+
+# Routed order outcomes in the (order ticket or None, open position count, fill details) form of the helpers below
+def _copy_opened(outcome):
+    if not outcome.ok:
+        return None, 0, None
+    return outcome.result.order, outcome.open_count, outcome.result.price or outcome.request["price"]
 
-            slave_trade_map.pop(ticket, None)
+def _copy_closed(outcome):
+    if not outcome.ok:
+        return None, 0, None
+    # Exit price and P/L come from the position's deals, falling back to the request price
+    fallback = (outcome.result.price or outcome.request["price"], None, None, None)
+    return outcome.result.order, outcome.open_count, outcome.closed or fallback
 
-        with open("last_trades.json", "w") as f:
-            json.dump(list(last_trade_ids), f)
+# The helpers below run inside a slave session job (mt5 is the broker's module) and return only plain
+# values, so the process pool's workers can answer over a queue with the same result as the serial backend
+def _copied_positions_on_slave(mt5):
+    positions = mt5.positions_get()
+    if positions is None:
+        return None
+    return [
+        SlavePosition(pos.ticket, pos.symbol, pos.volume, pos.type, pos.comment)
+        for pos in positions if pos.comment.startswith("Copy")
+    ]
 
-        time.sleep(1.5)
+# Closing details of the given tickets that are no longer open (None while the closing deal is not in the history)
+def _closed_copies_on_slave(mt5, tickets):
+    positions = mt5.positions_get()
+    if positions is None:
+        return None
+    open_tickets = {pos.ticket for pos in positions}
+    return {ticket: closed_position_result(mt5, ticket) for ticket in tickets if ticket not in open_tickets}
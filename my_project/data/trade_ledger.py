@@ -0,0 +1,202 @@
+# Trade ledger: every real fill made by the executor (master) and the copier (slaves)
+# Opens and closes are buffered in memory and appended in bulk (one DataFrame insert per table per
+# flush) through the shared database writer, so the trading threads never wait on DuckDB. Both
+# tables are append-only; the views below join and aggregate them on demand, which DuckDB's
+# columnar scans keep fast well into millions of rows
+import atexit
+import threading
+from concurrent.futures import wait
+from datetime import datetime
+
+from data.database import get_database
+from data.scheduler import get_scheduler, FixedInterval
+
+FLUSH_INTERVAL = 1.0  # seconds between bulk appends
+MAX_BUFFER = 500      # flush early once this many rows are waiting
+CLOSE_TIMEOUT = 10.0  # seconds to wait at exit for the last rows to be written
+
+OPEN_COLUMNS = ["ticket", "account", "role", "symbol", "direction", "volume", "price", "sl", "tp",
+                "magic", "comment", "master_ticket", "open_time"]
+CLOSE_COLUMNS = ["ticket", "account", "symbol", "price", "profit", "close_reason", "close_time"]
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS trade_opens (
+        ticket BIGINT,
+        account TEXT,
+        role TEXT,
+        symbol TEXT,
+        direction TEXT,
+        volume DOUBLE,
+        price DOUBLE,
+        sl DOUBLE,
+        tp DOUBLE,
+        magic INTEGER,
+        comment TEXT,
+        master_ticket BIGINT,
+        open_time TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trade_closes (
+        ticket BIGINT,
+        account TEXT,
+        symbol TEXT,
+        price DOUBLE,
+        profit DOUBLE,
+        close_reason TEXT,
+        close_time TIMESTAMP
+    )
+    """,
+    # One row per trade: open details plus close details once it is closed
+    """
+    CREATE OR REPLACE VIEW trade_ledger AS
+    SELECT
+        COALESCE(o.ticket, c.ticket) AS ticket,
+        COALESCE(o.account, c.account) AS account,
+        o.role,
+        COALESCE(o.symbol, c.symbol) AS symbol,
+        o.direction,
+        o.volume,
+        o.price AS open_price,
+        o.sl,
+        o.tp,
+        o.magic,
+        o.comment,
+        o.master_ticket,
+        o.open_time,
+        c.price AS close_price,
+        c.close_time,
+        c.close_reason,
+        c.profit
+    FROM trade_opens o
+    FULL OUTER JOIN trade_closes c ON o.ticket = c.ticket AND o.account = c.account
+    """,
+    """
+    CREATE OR REPLACE VIEW pnl_by_symbol AS
+    SELECT symbol, COUNT(*) AS trades, COUNT(*) FILTER (WHERE profit > 0) AS wins,
+           ROUND(SUM(profit), 2) AS profit, ROUND(AVG(profit), 2) AS avg_profit
+    FROM trade_closes GROUP BY symbol
+    """,
+    """
+    CREATE OR REPLACE VIEW pnl_by_account AS
+    SELECT account, COUNT(*) AS trades, COUNT(*) FILTER (WHERE profit > 0) AS wins,
+           ROUND(SUM(profit), 2) AS profit, ROUND(AVG(profit), 2) AS avg_profit
+    FROM trade_closes GROUP BY account
+    """,
+    """
+    CREATE OR REPLACE VIEW pnl_by_day AS
+    SELECT CAST(close_time AS DATE) AS day, account, COUNT(*) AS trades,
+           COUNT(*) FILTER (WHERE profit > 0) AS wins, ROUND(SUM(profit), 2) AS profit
+    FROM trade_closes GROUP BY ALL
+    """,
+]
+
+# MT5 deal reasons that matter for the ledger; everything else is reported by the order comment
+DEAL_REASONS = {4: "sl", 5: "tp", 6: "stop_out"}
+COMMENT_REASONS = {"AutoResetClose": "reset", "AutoClose": "master_closed", "MasterClosed": "master_closed"}
+
+
+def create_ledger_schema(db=None):
+    db = db or get_database()
+
+    def create(cursor):
+        for statement in SCHEMA:
+            cursor.execute(statement)
+    db.submit(create).result()
+
+
+def close_reason(deal):
+    if deal.reason in DEAL_REASONS:
+        return DEAL_REASONS[deal.reason]
+    return COMMENT_REASONS.get(deal.comment, "manual")
+
+
+# Runs inside a session job: exit price, total P/L and reason of a closed position from its deals
+# Returns None while the terminal has no closing deal for it yet
+def closed_position_result(mt5, ticket):
+    deals = mt5.history_deals_get(position=ticket)
+    if not deals:
+        return None
+    exits = [deal for deal in deals if deal.entry != 0]  # DEAL_ENTRY_IN is 0
+    if not exits:
+        return None
+    last = exits[-1]
+    profit = sum(deal.profit + deal.commission + deal.swap for deal in deals)
+    return last.price, profit, close_reason(last), datetime.fromtimestamp(last.time)
+
+
+# TradeLedger: Buffers ledger rows and appends them in bulk
+class TradeLedger:
+    def __init__(self, db=None, flush_interval=FLUSH_INTERVAL, max_buffer=MAX_BUFFER, scheduler=None):
+        self.db = db or get_database()
+        self.max_buffer = max_buffer
+        self.lock = threading.Lock()
+        self.opens = []
+        self.closes = []
+        create_ledger_schema(self.db)
+        (scheduler or get_scheduler()).add("ledger", self.flush_job, FixedInterval(flush_interval), flush_interval)
+        # The writer is a daemon thread that dies with the interpreter, so exit waits for the last append
+        atexit.register(self.close)
+
+    def record_open(self, ticket, account, role, symbol, direction, volume, price, sl=None, tp=None,
+                    magic=None, comment=None, master_ticket=None, open_time=None):
+        self._add(self.opens, (ticket, str(account), role, symbol, direction, volume, price, sl, tp,
+                               magic, comment, master_ticket, open_time or datetime.now()))
+
+    def record_close(self, ticket, account, symbol, price, profit, reason, close_time=None):
+        self._add(self.closes, (ticket, str(account), symbol, price, profit, reason, close_time or datetime.now()))
+
+    def _add(self, buffer, row):
+        with self.lock:
+            buffer.append(row)
+            full = len(self.opens) + len(self.closes) >= self.max_buffer
+        if full:
+            self.flush()
+
+    def flush_job(self):
+        return bool(self.flush())
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Flush and wait until the rows are written; call before the database is closed."""
+        self.flush(timeout)
+
+    def flush(self, timeout=None):
+        """Hand everything buffered to the database writer. Returns the number of rows.
+        With a timeout, blocks up to that many seconds until they are written."""
+        with self.lock:
+            opens, self.opens = self.opens, []
+            closes, self.closes = self.closes, []
+        if not opens and not closes:
+            return 0
+
+        def append(cursor):
+            import pandas as pd
+
+            for table, columns, rows in (("trade_opens", OPEN_COLUMNS, opens), ("trade_closes", CLOSE_COLUMNS, closes)):
+                if rows:
+                    cursor.register("ledger_rows", pd.DataFrame(rows, columns=columns))
+                    cursor.execute(f"INSERT INTO {table} SELECT * FROM ledger_rows")
+                    cursor.unregister("ledger_rows")
+        future = self.db.submit(append)
+        future.add_done_callback(_report_failure)
+        if timeout is not None and not wait([future], timeout).done:
+            print(f"[Trade Ledger] {len(opens) + len(closes)} rows not written after {timeout:.0f}s")
+        return len(opens) + len(closes)
+
+
+def _report_failure(future):
+    if future.exception() is not None:
+        print(f"[Trade Ledger] Append failed: {future.exception()}")
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_trade_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TradeLedger()
+        return _ledger
@@ -0,0 +1,185 @@
+# Non-blocking trade log shared by the strategy executor and the trade copier
+# log() only timestamps the record and puts it on a queue; one background writer drains the queue in
+# batches, writes them as JSON lines with a single write/flush per batch, rotates the file by size
+# and age, echoes info and above to the console, and forwards records flagged gui=True to the GUI sink registered
+# for their source. Nothing on the trading threads waits for disk or the GUI.
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+LOG_PATH = "trade_log.jsonl"
+MAX_BYTES = 5 * 1024 * 1024   # rotate when the file grows past this
+ROTATE_EVERY = 24 * 60 * 60   # ... or when it is older than this (seconds)
+BACKUPS = 5                   # trade_log.jsonl.1 .. .5
+BATCH_SIZE = 512
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+_STOP = object()
+
+
+# TradeLogger: Queue in front of a single writer thread
+class TradeLogger:
+    def __init__(self, path=LOG_PATH, max_bytes=MAX_BYTES, rotate_every=ROTATE_EVERY, backups=BACKUPS,
+                 batch_size=BATCH_SIZE, min_level="debug", echo=True, echo_level="info"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_every = rotate_every
+        self.backups = backups
+        self.batch_size = batch_size
+        self.min_level = LEVELS[min_level]
+        self.echo = echo
+        self.echo_level = LEVELS[echo_level]
+        self.queue = queue.SimpleQueue()
+        self.gui_sinks = {}
+        self.thread = None
+        self.file = None
+        self.opened_at = None
+        self.size = 0
+        self.dropped = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="trade-log-writer", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self, timeout=5):
+        """Write whatever is queued and stop the writer."""
+        if self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+            self.thread = None
+
+    def set_gui_sink(self, source, callback):
+        """Records from `source` logged with gui=True are passed to callback as "[time] message".
+        None removes the sink."""
+        if callback is None:
+            self.gui_sinks.pop(source, None)
+        else:
+            self.gui_sinks[source] = callback
+
+    def emit(self, source, message, level="info", gui=False, **fields):
+        self.queue.put((time.time(), source, level, message, gui, fields))
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            self._write([item for item in batch if item is not _STOP])
+            if stop:
+                if self.file:
+                    self.file.close()
+                    self.file = None
+                return
+
+    def _write(self, batch):
+        lines = []
+        gui_lines = []
+        for created, source, level, message, gui, fields in batch:
+            stamp = datetime.fromtimestamp(created)
+            text = f"[{stamp.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+            rank = LEVELS.get(level, 20)
+            if self.echo and rank >= self.echo_level:
+                print(text)
+            if gui and source in self.gui_sinks:
+                gui_lines.append((source, text))
+            if rank >= self.min_level:
+                record = {"time": stamp.isoformat(timespec="milliseconds"), "source": source,
+                          "level": level, "message": message}
+                record.update(fields)
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+
+        if lines:
+            try:
+                self._rotate_if_needed()
+                data = "\n".join(lines) + "\n"
+                self.file.write(data)
+                self.file.flush()
+                self.size += len(data.encode("utf-8"))
+            except Exception as e:
+                self.dropped += len(lines)
+                print(f"[Logger Error] Failed to write to log file: {e}")
+                # Reopened on the next batch
+                if self.file is not None:
+                    try:
+                        self.file.close()
+                    except Exception:
+                        pass
+                    self.file = None
+
+        for source, text in gui_lines:
+            sink = self.gui_sinks.get(source)
+            try:
+                if sink:
+                    sink(text)
+            except Exception as e:
+                print(f"[Logger Error] GUI sink failed: {e}")
+
+    def _rotate_if_needed(self):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+            self.size = self.file.tell()
+            self.opened_at = self._first_record_time() if self.size else time.time()
+        if self.size < self.max_bytes and time.time() - self.opened_at < self.rotate_every:
+            return
+        if not self.size:
+            self.opened_at = time.time()
+            return
+        self.file.close()
+        rotate_file(self.path, self.backups)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.size = 0
+        self.opened_at = time.time()
+
+    def _first_record_time(self):
+        """Creation time of an existing log file: the timestamp of its first record (the mtime changes
+        with every write, so it would keep a file from ever rotating by age across restarts)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return datetime.fromisoformat(json.loads(f.readline())["time"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return time.time()
+
+
+def rotate_file(path, backups=BACKUPS):
+    """Shift path -> path.1 -> ... -> path.<backups>, dropping the oldest (or just delete path if
+    backups is 0). The caller reopens path afterwards."""
+    for i in range(backups - 1, 0, -1):
+        older = f"{path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}")
+    if backups:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_trade_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = TradeLogger().start()
+    return _logger
+
+
+def source_logger(source):
+    """log(message, level="info", gui=False, **fields) bound to one source, e.g. "executor"."""
+    def log(message, level="info", gui=False, **fields):
+        get_trade_logger().emit(source, message, level, gui, **fields)
+    return log
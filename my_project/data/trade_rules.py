@@ -0,0 +1,11 @@
+# SL/TP rules shared by live order placement (precomputed per symbol by symbol_registry) and the backtester
+
+
+# Define pip sizes per symbol type; returns (pip, sl_pips, tp_pips)
+def pip_settings(symbol):
+    if "JPY" in symbol:
+        return 0.01, 10, 20     # 10 pips → 0.10
+    if symbol in ["BTCUSD", "ETHUSD"]:
+        return 1.0, 300, 600    # 1 pip = $1, 300 pips → $300
+    return 0.0001, 10, 20       # 10 pips → 0.0010
+
@@ -0,0 +1,149 @@
+# Vectorized indicator math over 2-D arrays shaped (symbols, bars)
+# Each function returns the full indicator series with the same shape as its input, computed for
+# every symbol in one NumPy pass. Formulas match data/indicators.py (and pandas_ta's defaults);
+# leading NaNs mark bars where the indicator is not defined yet
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Largest factor r**-k allowed inside one recurrence block before rescaling
+_MAX_SCALE = 1e150
+
+
+def as_2d(x):
+    x = np.asarray(x, dtype=float)
+    return x[None, :] if x.ndim == 1 else x
+
+
+def _first_valid(x):
+    """Index of the first non-NaN column, assuming every row becomes valid at the same bar."""
+    valid = ~np.isnan(x).any(axis=0)
+    return int(np.argmax(valid)) if valid.any() else x.shape[1]
+
+
+def linear_recurrence(x, r, y0):
+    """y[:, t] = r * y[:, t-1] + x[:, t] along the bar axis, starting from y0 (one value per row).
+    Solved block-wise with cumulative sums so there is no Python loop per bar."""
+    rows, bars = x.shape
+    out = np.empty_like(x)
+    if bars == 0:
+        return out
+    if r == 0:
+        out[:] = x
+        return out
+    block = max(1, int(np.log(_MAX_SCALE) / -np.log(r))) if r < 1 else bars
+    prev = np.asarray(y0, dtype=float).reshape(rows)
+    for start in range(0, bars, block):
+        chunk = x[:, start:start + block]
+        k = np.arange(chunk.shape[1])
+        powers = r ** k
+        acc = np.cumsum(chunk / powers, axis=1)
+        out[:, start:start + block] = powers * (r * prev[:, None] + acc)
+        prev = out[:, start + chunk.shape[1] - 1]
+    return out
+
+
+def rolling(x, length, func):
+    """Apply func over trailing windows of `length` bars; NaN until the window is full."""
+    x = as_2d(x)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= length:
+        out[:, length - 1:] = func(sliding_window_view(x, length, axis=1), axis=-1)
+    return out
+
+
+def sma(x, length):
+    return rolling(x, length, np.mean)
+
+
+def stdev(x, length):
+    # Population standard deviation (ddof=0), as used by pandas_ta bbands
+    return rolling(x, length, np.std)
+
+
+def ema(x, length):
+    """SMA-seeded EMA (pandas_ta default), starting at the first valid bar."""
+    x = as_2d(x)
+    out = np.full(x.shape, np.nan)
+    first = _first_valid(x)
+    seed_at = first + length - 1
+    if seed_at >= x.shape[1]:
+        return out
+    alpha = 2.0 / (length + 1)
+    seed = x[:, first:seed_at + 1].mean(axis=1)
+    out[:, seed_at] = seed
+    out[:, seed_at + 1:] = linear_recurrence(alpha * x[:, seed_at + 1:], 1.0 - alpha, seed)
+    return out
+
+
+def rma(x, length):
+    """Wilder smoothing as pandas ewm(alpha=1/length, adjust=True, min_periods=length)."""
+    x = as_2d(x)
+    out = np.full(x.shape, np.nan)
+    first = _first_valid(x)
+    if first >= x.shape[1]:
+        return out
+    r = 1.0 - 1.0 / length
+    values = x[:, first:]
+    weighted = linear_recurrence(values, r, np.zeros(x.shape[0]))
+    count = np.arange(1, values.shape[1] + 1)
+    weight = (1.0 - r ** count) / (1.0 - r)
+    smoothed = weighted / weight
+    smoothed[:, count < length] = np.nan
+    out[:, first:] = smoothed
+    return out
+
+
+def rsi(close, length):
+    close = as_2d(close)
+    diff = np.full(close.shape, np.nan)
+    diff[:, 1:] = np.diff(close, axis=1)
+    gain = rma(np.where(diff > 0, diff, np.where(np.isnan(diff), np.nan, 0.0)), length)
+    loss = rma(np.where(diff < 0, -diff, np.where(np.isnan(diff), np.nan, 0.0)), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * gain / (gain + loss)
+
+
+def macd(close, fast, slow, signal):
+    line = ema(close, fast) - ema(close, slow)
+    return line, ema(line, signal)
+
+
+def bbands(close, length, std):
+    mid = sma(close, length)
+    dev = stdev(close, length)
+    return mid - std * dev, mid, mid + std * dev
+
+
+def stoch(high, low, close, k, d, smooth_k):
+    return stoch_smooth(stoch_raw(high, low, close, k), d, smooth_k)
+
+
+def stoch_raw(high, low, close, k):
+    """Unsmoothed %K over k bars."""
+    lowest = rolling(low, k, np.min)
+    highest = rolling(high, k, np.max)
+    span = highest - lowest
+    span = np.where(span == 0, np.finfo(float).eps, span)
+    return 100.0 * (as_2d(close) - lowest) / span
+
+
+def stoch_smooth(raw, d, smooth_k):
+    """(%K, %D) from raw %K: SMA(smooth_k) of raw, then SMA(d) of that."""
+    stoch_k = _sma_from_first_valid(raw, smooth_k)
+    return stoch_k, _sma_from_first_valid(stoch_k, d)
+
+
+def _sma_from_first_valid(x, length):
+    out = np.full(x.shape, np.nan)
+    first = _first_valid(x)
+    out[:, first:] = sma(x[:, first:], length)
+    return out
+
+
+def shift(x, bars):
+    """Value `bars` bars back (like Series.shift); NaN where there is no history."""
+    if bars == 0:
+        return x
+    out = np.full(x.shape, np.nan)
+    out[:, bars:] = x[:, :-bars]
+    return out
@@ -1,17 +1,18 @@
-
 import tkinter as tk
 from tkinter import ttk
 from gui.shared_components import show_frame
 from data.mt5_connector import connect_mt5
 from data.account_storage import save_account, load_accounts, remove_account
-from data.trade_copier import copy_master_trades
-from data.strategy_executor import strategy_loop_for_all
-import threading
+from data.account_status import trade_counter, add_listener, update_trade_count
+from data.account_health import get_account_health
+from data import startup_timer
+from gui.event_bus import get_gui_bus
+from data.scheduler import get_scheduler, FixedInterval
+from data.metrics import get_metrics
 
 executor_thread_started = False
 copier_thread_started = False
 
-trade_counter = {}
 trade_count_updater = None
 label_map = {}
 
@@ -20,20 +21,57 @@ def register_trade_count_updater(callback):
     global trade_count_updater
     trade_count_updater = callback
 
-def update_trade_count(login, count):
-    trade_counter[login] = count
-    if login in label_map:
-        label_info = label_map[login]
-        label = label_info['label']
-        balance = label_info['balance']
-        equity = label_info['equity']
-        new_text = (
-            f"Account:   {login}     Balance:   {balance}     Equity:   {equity}     "
-            f"Open Trades:   {count}     Status:   CONNECTED"
-        )
-        label.config(text=new_text)
-
-def create_account_page(root, account_frame, strategy_frame):
+# Account updates from any thread are applied to the labels on the Tk thread, once per tick per account
+add_listener(lambda login, fields: get_gui_bus().update_account(login, **fields))
+
+# Card values shown until the first health probe answers
+PLACEHOLDER_FIELDS = {"balance": "-", "margin": "-", "equity": "-", "trades": "-", "status": "CONNECTING"}
+
+def _money(value):
+    return f"{value:.2f}" if isinstance(value, (int, float)) else value
+
+def account_text(login, info):
+    return (
+        f"Account:   {login}     Balance:   {_money(info['balance'])} / {_money(info['margin'])}     "
+        f"Equity:   {_money(info['equity'])}     Open Trades:   {info['trades']}     Status:   {info['status']}"
+    )
+
+def account_fields(result):
+    """Card fields from a successful connect_mt5 result."""
+    return {
+        "balance": result["balance"],
+        "margin": result["margin"],
+        "equity": result["equity"],
+        "trades": result.get("positions", 0),
+        "status": "CONNECTED",
+    }
+
+METRICS_REFRESH_MS = 2000
+METRICS_ROWS = 12
+
+# One line per timed hot path (most total time first), for the performance panel
+def metrics_text(rows):
+    if not rows:
+        return "No timings recorded yet."
+    lines = []
+    for row in rows[:METRICS_ROWS]:
+        name = row["name"].replace("_seconds", "")
+        labels = " ".join(str(value) for value in row["labels"].values())
+        lines.append(f"{name:<30} {labels:<28} n={row['count']:<7} avg {row['mean'] * 1000:8.2f} ms"
+                     f"   p95 {row['p95'] * 1000:8.2f} ms")
+    return "\n".join(lines)
+
+# Runs on the Tk thread with the newest fields posted for an account since the last tick
+def refresh_account_label(login, fields):
+    label_info = label_map.get(login)
+    if label_info is None:
+        return
+    changed = {key: value for key, value in fields.items() if label_info.get(key) != value}
+    if changed:
+        label_info.update(changed)
+        label_info['label'].config(text=account_text(login, label_info))
+
+def create_account_page(root, account_frame, strategy_frame, ready=None):
     BG_COLOR = "#161B22"
     CARD_BG = "#21262D"
     TEXT_COLOR = "white"
@@ -43,9 +81,9 @@ def create_account_page(root, account_frame, strategy_frame):
 
     account_frame.configure(bg=BG_COLOR)
 
+    # Called from worker threads; lines are batched into the log widget by the GUI bus
     def log_to_gui(msg):
-        log_text.insert(tk.END, msg + '\n')
-        log_text.see(tk.END)
+        get_gui_bus().log(msg)
 
     # Launch strategy executor only once if a master account exists
     def start_strategy_executor_if_ready():
@@ -55,11 +93,13 @@ def create_account_page(root, account_frame, strategy_frame):
         if not executor_thread_started and masters:
             executor_thread_started = True
             master = masters[0]
-            thread = threading.Thread(
-                target=lambda: strategy_loop_for_all(master["login"], master["password"], master["server"], logger=log_to_gui),
-                daemon=True
-            )
-            thread.start()
+            def run_executor():
+                from data.strategy_executor import strategy_loop_for_all
+                if ready is not None:
+                    ready.result()  # the executor reads the strategy from tables created at startup
+                strategy_loop_for_all(master["login"], master["password"], master["server"], logger=log_to_gui)
+
+            get_scheduler().spawn("start:executor", run_executor)
 
     # Launch trade copier thread only once if both master and slave accounts exist
     def start_copier_if_ready():
@@ -69,58 +109,42 @@ def create_account_page(root, account_frame, strategy_frame):
         slaves = accounts["slaves"]
         if not copier_thread_started and masters and slaves:
             copier_thread_started = True
-            thread = threading.Thread(
-                target=lambda: copy_master_trades(masters[0], slaves, logger=log_to_gui),
-                daemon=True
-            )
-            thread.start()
+            def run_copier():
+                from data.trade_copier import copy_master_trades
+                if ready is not None:
+                    ready.result()
+                copy_master_trades(masters[0], slaves, logger=log_to_gui)
+
+            get_scheduler().spawn("start:copier", run_copier)
 
     
 
+    # Scheduler job: waits for a master account, then follows its position feed for manual (non-bot) trades
     def monitor_manual_trades():
-        import MetaTrader5 as mt5
-        import time
         from datetime import datetime
+        from data.position_feed import get_position_feed, OPENED, CLOSED
 
-        previous_tickets = set()
-        logged_manuals = set()
+        masters = load_accounts().get("masters", [])
+        if not masters:
+            return False
 
-        while True:
-            accounts = load_accounts()
-            masters = accounts.get("masters", [])
-            if not masters:
-                time.sleep(5)
-                continue
+        master = masters[0]
+        feed = get_position_feed(master)
+
+        def on_events(events):
+            for event in events:
+                pos = event.position
+                if event.kind == OPENED and not pos.comment.startswith("Trade-"):
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    log_to_gui(f"[{timestamp}] [🟢 Manual] Trade opened: {pos.symbol} {'BUY' if pos.type == 0 else 'SELL'} at {pos.price_open}")
+                elif event.kind == CLOSED:
+                    log_to_gui(f"[🔻] Trade closed: {pos.ticket} → Open count updated")
+            update_trade_count(master["login"], len(feed.positions))
+
+        feed.subscribe(on_events)
+        get_scheduler().remove("manual-monitor")
+        return True
 
-            master = masters[0]
-            if not mt5.initialize(login=int(master["login"]), password=master["password"], server=master["server"]):
-                log_to_gui("[❌] Failed to initialize MT5 for manual trade monitor.")
-                time.sleep(5)
-                continue
-
-            positions = mt5.positions_get()
-            current_tickets = set()
-            if positions:
-                for pos in positions:
-                    current_tickets.add(pos.ticket)
-
-                    if not pos.comment.startswith("Trade-") and pos.ticket not in logged_manuals:
-                        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        log_to_gui(f"[{timestamp}] [🟢 Manual] Trade opened: {pos.symbol} {'BUY' if pos.type == 0 else 'SELL'} at {pos.price_open}")
-                        logged_manuals.add(pos.ticket)
-                        open_count = len(positions)
-                        trade_counter[master["login"]] = open_count
-                        update_trade_count(master["login"], open_count)
-
-            closed_tickets = previous_tickets - current_tickets
-            for closed_ticket in closed_tickets:
-                if master["login"] in trade_counter:
-                    trade_counter[master["login"]] = max(0, trade_counter[master["login"]] - 1)
-                    update_trade_count(master["login"], trade_counter[master["login"]])
-                    log_to_gui(f"[🔻] Trade closed: {closed_ticket} → Open count updated")
-
-            previous_tickets = current_tickets
-            time.sleep(4)
     def open_add_account_modal(is_master):
         modal = tk.Toplevel(account_frame)
         modal.title(f"Add {'Master' if is_master else 'Slave'} Account")
@@ -153,25 +177,31 @@ def create_account_page(root, account_frame, strategy_frame):
                 if platform != "MT5":
                     tk.Label(modal, text="Only MT5 supported for now.", fg=RED_COLOR, bg=CARD_BG).pack(pady=5)
                     return
-                success, result = connect_mt5(login, password, server)
-                if success:
-                    balance = f"{result['balance']:.2f} / {result['margin']:.2f}"
-                    equity = f"{result['equity']:.2f}"
-                    trades = f"{result['positions']}" if 'positions' in result else "0"
-                    modal.destroy()
-                    if is_master:
-                        add_master_account(login, server, balance, equity, trades)
+                # The credentials are checked off the Tk thread so a slow broker cannot freeze the window
+                def connected(success, result):
+                    if not modal.winfo_exists():
+                        return
+                    if success:
+                        modal.destroy()
+                        if is_master:
+                            add_master_account(login, server, account_fields(result))
+                        else:
+                            add_slave_account(login, server, account_fields(result))
+                        account_data = {
+                            "login": login,
+                            "password": password,
+                            "server": server
+                        }
+                        save_account("masters" if is_master else "slaves", account_data)
+                        get_account_health().add(account_data)
+                        start_copier_if_ready()
                     else:
-                        add_slave_account(login, server, balance, equity, trades)
-                    account_data = {
-                        "login": login,
-                        "password": password,
-                        "server": server
-                    }
-                    save_account("masters" if is_master else "slaves", account_data)
-                    start_copier_if_ready()
-                else:
-                    tk.Label(modal, text=f"Connection failed: {result}", fg=RED_COLOR, bg=CARD_BG).pack(pady=5)
+                        tk.Label(modal, text=f"Connection failed: {result}", fg=RED_COLOR, bg=CARD_BG).pack(pady=5)
+
+                get_scheduler().spawn(
+                    f"connect:{login}",
+                    lambda: get_gui_bus().call(connected, *connect_mt5(login, password, server))
+                )
             else:
                 tk.Label(modal, text="All fields are required!", fg=RED_COLOR, bg=CARD_BG).pack(pady=5)
 
@@ -191,21 +221,19 @@ def create_account_page(root, account_frame, strategy_frame):
     master_container = tk.Frame(master_card, bg=CARD_BG)
     master_container.pack(fill="x")
 
-    def add_master_account(login, server, balance, equity, trades):
+    def add_master_account(login, server, fields):
         card = tk.Frame(master_container, bg=BUTTON_COLOR, padx=10, pady=10, bd=2, relief="ridge")
         card.pack(pady=5, padx=10, fill="x")
-        text = (
-            f"Account:   {login}     Balance:   {balance}     Equity:   {equity}     "
-            f"Open Trades:   {trades}     Status:   CONNECTED"
-        )
-        label = tk.Label(card, text=text, fg=TEXT_COLOR, bg=BUTTON_COLOR, font=("Helvetica", 12, "bold"))
+        label = tk.Label(card, text=account_text(login, fields), fg=TEXT_COLOR, bg=BUTTON_COLOR, font=("Helvetica", 12, "bold"))
         label.pack(side="left", padx=10)
-        label_map[login] = {"label": label, "balance": balance, "equity": equity}
-        trade_counter[login] = int(trades)
+        label_map[login] = dict(fields, label=label)
+        if isinstance(fields["trades"], int):
+            trade_counter[login] = fields["trades"]
         ttk.Checkbutton(card, variable=tk.BooleanVar(value=True)).pack(side="left", padx=5)
         tk.Button(card, text="Copy Settings", bg=GREEN_COLOR, fg=TEXT_COLOR, padx=5).pack(side="left", padx=5)
         tk.Button(card, text="🗑️", bg=RED_COLOR, fg=TEXT_COLOR, padx=5,
-                  command=lambda: [card.destroy(), remove_account("masters", login)]).pack(side="left", padx=5)
+                  command=lambda: [card.destroy(), remove_account("masters", login),
+                                   get_account_health().remove(login)]).pack(side="left", padx=5)
 
     log_frame = tk.Frame(account_frame, bg=BG_COLOR)
     log_frame.pack(pady=10, padx=20, fill="both", expand=True)
@@ -216,6 +244,7 @@ def create_account_page(root, account_frame, strategy_frame):
     log_scrollbar.config(command=log_text.yview)
     log_text.pack(side="left", fill="both", expand=True)
     log_scrollbar.pack(side="right", fill="y")
+    get_gui_bus().attach(root, log_widget=log_text, account_handler=refresh_account_label)
 
     slave_card = tk.Frame(account_frame, bg=CARD_BG, padx=15, pady=10, bd=2, relief="ridge")
     slave_card.pack(pady=10, padx=20, fill="x")
@@ -224,45 +253,65 @@ def create_account_page(root, account_frame, strategy_frame):
     slave_container = tk.Frame(slave_card, bg=CARD_BG)
     slave_container.pack(fill="x")
 
-    def add_slave_account(login, server, balance, equity, trades):
+    def add_slave_account(login, server, fields):
         card = tk.Frame(slave_container, bg=BUTTON_COLOR, padx=10, pady=10, bd=2, relief="ridge")
         card.pack(pady=5, padx=10, fill="x")
-        text = (
-            f"Account:   {login}     Balance:   {balance}     Equity:   {equity}     Open Trades:   {trades}     Status:   CONNECTED"
-        )
-        label = tk.Label(card, text=text, fg=TEXT_COLOR, bg=BUTTON_COLOR, font=("Helvetica", 12, "bold"))
+        label = tk.Label(card, text=account_text(login, fields), fg=TEXT_COLOR, bg=BUTTON_COLOR, font=("Helvetica", 12, "bold"))
         label.pack(side="left", padx=10)
-        label_map[login] = {"label": label, "balance": balance, "equity": equity}
-        trade_counter[login] = int(trades)
+        label_map[login] = dict(fields, label=label)
+        if isinstance(fields["trades"], int):
+            trade_counter[login] = fields["trades"]
         ttk.Checkbutton(card, variable=tk.BooleanVar(value=True)).pack(side="left", padx=5)
         tk.Button(card, text="Copy Settings", bg=GREEN_COLOR, fg=TEXT_COLOR, padx=5).pack(side="left", padx=5)
         tk.Button(card, text="🗑️", bg=RED_COLOR, fg=TEXT_COLOR, padx=5,
-                  command=lambda: [card.destroy(), remove_account("slaves", login)]).pack(side="left", padx=5)
+                  command=lambda: [card.destroy(), remove_account("slaves", login),
+                                   get_account_health().remove(login)]).pack(side="left", padx=5)
 
     tk.Button(master_card, text="+ Add Master", bg=BUTTON_COLOR, fg=TEXT_COLOR,
               command=lambda: open_add_account_modal(True)).pack(pady=10)
     tk.Button(slave_card, text="+ Add Slave", bg=BUTTON_COLOR, fg=TEXT_COLOR,
               command=lambda: open_add_account_modal(False)).pack(pady=10)
 
+    # Saved accounts get placeholder cards right away; the health monitor connects each one through
+    # the session broker, keeps the cards current and starts trading once accounts are reachable
     saved = load_accounts()
     for acc in saved["masters"]:
-        success, result = connect_mt5(acc["login"], acc["password"], acc["server"])
-        if success:
-            balance = f"{result['balance']:.2f} / {result['margin']:.2f}"
-            equity = f"{result['equity']:.2f}"
-            trades = f"{result['positions']}" if 'positions' in result else "0"
-            add_master_account(acc["login"], acc["server"], balance, equity, trades)
-            start_copier_if_ready()
-            start_strategy_executor_if_ready()
-
+        add_master_account(acc["login"], acc["server"], PLACEHOLDER_FIELDS)
     for acc in saved["slaves"]:
-        success, result = connect_mt5(acc["login"], acc["password"], acc["server"])
-        if success:
-            balance = f"{result['balance']:.2f} / {result['margin']:.2f}"
-            equity = f"{result['equity']:.2f}"
-            trades = f"{result['positions']}" if 'positions' in result else "0"
-            add_slave_account(acc["login"], acc["server"], balance, equity, trades)
-            start_copier_if_ready()
+        add_slave_account(acc["login"], acc["server"], PLACEHOLDER_FIELDS)
+
+    connecting = {str(acc["login"]) for acc in saved["masters"] + saved["slaves"]}
+
+    def on_connected(login):
+        # Scheduler thread: trading is started on the Tk thread
+        get_gui_bus().call(start_copier_if_ready)
+        get_gui_bus().call(start_strategy_executor_if_ready)
+        if login in connecting:
+            connecting.discard(login)
+            if not connecting:
+                startup_timer.mark("accounts connected")
+                startup_timer.report()
+
+    health = get_account_health(on_connected)
+    for acc in saved["masters"] + saved["slaves"]:
+        health.add(acc)
+
+    # Live hot-path timings (data.metrics); only redrawn while the account page is on screen
+    metrics_card = tk.Frame(account_frame, bg=CARD_BG, padx=15, pady=10, bd=2, relief="ridge")
+    metrics_card.pack(pady=10, padx=20, fill="x")
+    tk.Label(metrics_card, text="PERFORMANCE", font=("Helvetica", 14, "bold"), fg=TEXT_COLOR, bg=CARD_BG).pack(anchor="w")
+    metrics_view = tk.Text(metrics_card, height=METRICS_ROWS, bg="black", fg=TEXT_COLOR, font=("Courier", 9), wrap="none")
+    metrics_view.pack(fill="x")
+
+    def refresh_metrics():
+        if metrics_view.winfo_ismapped():
+            metrics_view.config(state="normal")
+            metrics_view.delete("1.0", "end")
+            metrics_view.insert("end", metrics_text(get_metrics().summary()))
+            metrics_view.config(state="disabled")
+        account_frame.after(METRICS_REFRESH_MS, refresh_metrics)
+
+    refresh_metrics()
 
     tk.Button(
         account_frame,
@@ -272,4 +321,4 @@ def create_account_page(root, account_frame, strategy_frame):
         command=lambda: show_frame(strategy_frame)
     ).pack(pady=20)
 
-    threading.Thread(target=monitor_manual_trades, daemon=True).start()
+    get_scheduler().add("manual-monitor", monitor_manual_trades, FixedInterval(5))
@@ -0,0 +1,103 @@
+# Thread-safe bridge from worker threads (copier, executor, feeds) to Tk widgets
+# Tk is not thread-safe, so workers never touch widgets: they post to the bus and the Tk thread
+# drains it on a root.after tick. Per tick, all pending log lines become a single Text insert
+# (with the scrollback capped) and each account label is refreshed at most once with its newest
+# values, so thousands of events per minute cost one redraw per frame instead of one per event.
+import threading
+import tkinter as tk
+from collections import deque
+
+TICK_MS = 50             # drain interval (20 frames per second)
+MAX_LOG_LINES = 2000     # scrollback kept in the log widget
+
+
+# GuiEventBus: Collects updates from any thread and applies them on the Tk thread
+class GuiEventBus:
+    def __init__(self, tick_ms=TICK_MS, max_log_lines=MAX_LOG_LINES):
+        self.tick_ms = tick_ms
+        self.max_log_lines = max_log_lines
+        self.lock = threading.Lock()
+        # Lines older than the scrollback would be trimmed right away, so they are never kept
+        self.lines = deque(maxlen=max_log_lines)
+        self.accounts = {}   # login -> newest fields, merged until the next tick
+        self.calls = []
+        self.root = None
+        self.log_widget = None
+        self.account_handler = None
+
+    def attach(self, root, log_widget=None, account_handler=None):
+        """Start draining on root's event loop. Safe to call again to add widgets."""
+        if log_widget is not None:
+            self.log_widget = log_widget
+        if account_handler is not None:
+            self.account_handler = account_handler
+        if self.root is None:
+            self.root = root
+            root.after(self.tick_ms, self._tick)
+
+    # Producers: callable from any thread, never block on Tk
+
+    def log(self, line):
+        with self.lock:
+            self.lines.append(line)
+
+    def update_account(self, login, **fields):
+        with self.lock:
+            self.accounts.setdefault(str(login), {}).update(fields)
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the Tk thread at the next tick."""
+        with self.lock:
+            self.calls.append((fn, args))
+
+    # Tk thread
+
+    def _tick(self):
+        with self.lock:
+            lines, self.lines = list(self.lines), deque(maxlen=self.max_log_lines)
+            accounts, self.accounts = self.accounts, {}
+            calls, self.calls = self.calls, []
+        # Each update is isolated: one failing handler or call must not drop the rest of this tick's
+        # items, which were already taken off the queues (the on_connected calls that start trading among them)
+        try:
+            if lines and self.log_widget is not None:
+                try:
+                    self._append_lines(lines)
+                except Exception as e:
+                    print(f"[GUI Bus] Log update failed: {e}")
+            if accounts and self.account_handler is not None:
+                for login, fields in accounts.items():
+                    try:
+                        self.account_handler(login, fields)
+                    except Exception as e:
+                        print(f"[GUI Bus] Account update for {login} failed: {e}")
+            for fn, args in calls:
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"[GUI Bus] Call {getattr(fn, '__name__', fn)} failed: {e}")
+        finally:
+            self.root.after(self.tick_ms, self._tick)
+
+    def _append_lines(self, lines):
+        widget = self.log_widget
+        # Only follow the tail if the user has not scrolled up to read older lines
+        at_bottom = widget.yview()[1] >= 0.999
+        widget.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(widget.index("end-1c").split(".")[0]) - 1
+        if line_count > self.max_log_lines:
+            widget.delete("1.0", f"{line_count - self.max_log_lines + 1}.0")
+        if at_bottom:
+            widget.see(tk.END)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_gui_bus():
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = GuiEventBus()
+        return _bus
@@ -1,7 +1,40 @@
 # gui/history_page.py
+import queue
 import tkinter as tk
-from data.db_handler import get_trade_history
+from tkinter import ttk
 from gui.shared_components import show_frame, center_frame
+from data.scheduler import get_scheduler
+
+PAGE_SIZE = 100      # rows fetched per query
+MAX_ROWS = 500       # rows kept in the tree; pages scrolled far out of view are dropped
+LOAD_POLL_MS = 30    # how often the Tk thread checks for a finished background query
+
+COLUMNS = [
+    # (column id, heading, width, sort key or None)
+    ("time", "Time", 150, "time"),
+    ("account", "Account", 90, "account"),
+    ("symbol", "Symbol", 80, "symbol"),
+    ("direction", "Side", 50, None),
+    ("volume", "Volume", 60, None),
+    ("entry_price", "Entry", 80, None),
+    ("exit_price", "Exit", 80, None),
+    ("profit", "P/L", 80, "profit"),
+    ("reason", "Reason", 100, None),
+]
+
+def _format_row(row):
+    time, account, symbol, direction, volume, entry_price, exit_price, profit, reason = row[:9]
+    return (
+        time.strftime("%Y-%m-%d %H:%M:%S") if time else "",
+        account,
+        symbol,
+        direction or "",
+        f"{volume:g}" if volume is not None else "",
+        f"{entry_price:.4f}" if entry_price is not None else "",
+        f"{exit_price:.4f}" if exit_price is not None else "",
+        f"{profit:.2f}" if profit is not None else "",
+        reason or "",
+    )
 
 def create_history_page(root, history_frame, main_frame):
     """Set up the trade history page."""
@@ -23,40 +56,172 @@ def create_history_page(root, history_frame, main_frame):
     )
     history_label.pack(pady=20)
 
-    # Text widget for trade history with calculated width
-    history_text = tk.Text(
-        history_content,
-        width=84,  # Exact width to fit the longest line + 2 spaces
-        height=20,
-        bg="black",
-        fg="white",
-        wrap="none"  # Prevent text wrapping
-    )
-    history_text.configure(font=("Courier", 10))  # Monospace font for consistent alignment
-    history_text.pack(pady=10)
+    # Filters are applied in the database, so only matching rows are ever fetched
+    filter_bar = tk.Frame(history_content, bg="#1C1C2E")
+    filter_bar.pack(pady=5)
+    filter_vars = {}
+    for name, label in (("symbol", "Symbol"), ("account", "Account"), ("start", "From (YYYY-MM-DD)"), ("end", "To")):
+        tk.Label(filter_bar, text=label, fg="white", bg="#1C1C2E").pack(side="left", padx=(10, 2))
+        filter_vars[name] = tk.StringVar()
+        entry = tk.Entry(filter_bar, textvariable=filter_vars[name], width=12)
+        entry.pack(side="left")
+        entry.bind("<Return>", lambda event: populate_trade_history())
 
-    def populate_trade_history():
-        """Fetch and display trade history with formatted output."""
-        history_text.delete("1.0", tk.END)
-        rows = get_trade_history()
+    style = ttk.Style(history_content)
+    style.configure("History.Treeview", background="black", fieldbackground="black", foreground="white",
+                    font=("Courier", 10))
+
+    # Treeview holding a sliding window of at most MAX_ROWS rows
+    table = tk.Frame(history_content, bg="#1C1C2E")
+    table.pack(pady=10)
+    tree = ttk.Treeview(table, columns=[c[0] for c in COLUMNS], show="headings", height=20,
+                        style="History.Treeview", selectmode="browse")
+    scrollbar = ttk.Scrollbar(table, orient="vertical", command=tree.yview)
+    for column, heading, width, sort_key in COLUMNS:
+        tree.heading(column, text=heading, command=(lambda key=sort_key: sort_by(key)) if sort_key else "")
+        tree.column(column, width=width, anchor="w")
+    tree.pack(side="left")
+    scrollbar.pack(side="right", fill="y")
+
+    status_label = tk.Label(history_content, text="", fg="white", bg="#1C1C2E")
+    status_label.pack()
+
+    state = {
+        "sort": "time",
+        "descending": True,
+        "filters": {},
+        "generation": 0,   # bumped on every reset so results of superseded queries are ignored
+        "loading": False,
+        "draining": False,
+        "at_start": True,
+        "at_end": True,
+        "total": 0,
+    }
+    keys = {}  # item id -> (sort value, uid) used as the keyset cursor
+    results = queue.Queue()
 
-        for row in rows:
-            symbol = row[0]
-            entry_price = row[1]
-            exit_price = row[2]
-            profit_loss = row[3]
-            timestamp = row[4]
+    def load(direction):
+        """Run one page query on a background thread; direction is "reset", "next" or "prev"."""
+        if state["loading"] and direction != "reset":
+            return
+        state["loading"] = True
+        generation = state["generation"]
+        items = tree.get_children()
+        options = dict(state["filters"], limit=PAGE_SIZE, sort=state["sort"], descending=state["descending"])
+        if direction == "next" and items:
+            options["after"] = keys[items[-1]]
+        elif direction == "prev" and items:
+            options["before"] = keys[items[0]]
 
-            history_text.insert(
-                tk.END,
-                f"Symbol: {symbol}, Entry: {entry_price:.4f}, Exit: {exit_price:.4f}, "
-                f"P/L: {profit_loss:.2f}, Time: {timestamp}\n"
-            )
+        def work():
+            try:
+                from data.db_handler import get_trade_history_page, count_trade_history
+                rows = get_trade_history_page(**options)
+                total = count_trade_history(**state["filters"]) if direction == "reset" else None
+                results.put((generation, direction, rows, total, None))
+            except Exception as e:
+                results.put((generation, direction, [], None, e))
 
-        # Auto-scroll to the bottom
-        history_text.yview_moveto(1.0)
+        get_scheduler().spawn(f"history:{direction}", work)
+        if not state["draining"]:
+            state["draining"] = True
+            history_frame.after(LOAD_POLL_MS, drain)
 
+    def drain():
+        """Apply finished queries on the Tk thread; polls only while a query is outstanding."""
+        while True:
+            try:
+                generation, direction, rows, total, error = results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != state["generation"]:
+                continue  # superseded by a newer reset
+            state["loading"] = False
+            if error is not None:
+                status_label.config(text=f"Could not load trade history: {error}")
+                continue
+            if direction == "reset":
+                tree.delete(*tree.get_children())
+                keys.clear()
+                state["total"] = total
+                state["at_start"] = True
+                tree.yview_moveto(0)
+            show_rows(direction, rows)
+        if state["loading"]:
+            history_frame.after(LOAD_POLL_MS, drain)
+        else:
+            state["draining"] = False
 
+    def show_rows(direction, rows):
+        full_page = len(rows) == PAGE_SIZE
+        if direction == "prev":
+            # Rows prepended above the visible ones would push them down; scroll by the same amount
+            first_visible = tree.yview()[0] * len(tree.get_children())
+            for index, row in enumerate(rows):
+                insert_row(index, row)
+            state["at_start"] = not full_page
+            trim(from_top=False)
+            tree.yview_moveto((first_visible + len(rows)) / len(tree.get_children()))
+        else:
+            for row in rows:
+                insert_row("end", row)
+            state["at_end"] = not full_page
+            trim(from_top=True)
+        shown = len(tree.get_children())
+        status_label.config(text=f"{state['total']} trades ({shown} loaded)")
+
+    def insert_row(index, row):
+        item = tree.insert("", index, values=_format_row(row))
+        keys[item] = (row[-2], row[-1])
+
+    def trim(from_top):
+        """Drop rows from the far end of the window, keeping the visible rows in place."""
+        items = tree.get_children()
+        excess = len(items) - MAX_ROWS
+        if excess <= 0:
+            return
+        first_visible = tree.yview()[0] * len(items)
+        dropped = items[:excess] if from_top else items[-excess:]
+        for item in dropped:
+            keys.pop(item, None)
+        tree.delete(*dropped)
+        if from_top:
+            state["at_start"] = False
+            tree.yview_moveto(max(0.0, first_visible - excess) / MAX_ROWS)
+        else:
+            state["at_end"] = False
+
+    def on_scroll(first, last):
+        scrollbar.set(first, last)
+        # Prefetch the neighbouring page before the user reaches the edge of the window
+        if float(last) > 0.9 and not state["at_end"]:
+            load("next")
+        elif float(first) < 0.1 and not state["at_start"]:
+            load("prev")
+
+    tree.configure(yscrollcommand=on_scroll)
+
+    def sort_by(sort_key):
+        if state["sort"] == sort_key:
+            state["descending"] = not state["descending"]
+        else:
+            state["sort"], state["descending"] = sort_key, sort_key in ("time", "profit")
+        populate_trade_history()
+
+    def populate_trade_history():
+        """Reload the first page for the current filters and sort order."""
+        state["filters"] = {name: var.get().strip() or None for name, var in filter_vars.items()}
+        state["generation"] += 1
+        status_label.config(text="Loading...")
+        load("reset")
+
+    tk.Button(
+        filter_bar,
+        text="Apply",
+        command=populate_trade_history,
+        bg="#1C1C2E",
+        fg="white"
+    ).pack(side="left", padx=10)
 
     # Back button
     back_button = tk.Button(
@@ -1,7 +1,6 @@
 # gui/main_page.py
 import tkinter as tk
 from gui.shared_components import show_frame, center_frame
-from data.dummy_manual_trade_execution import TradeExecutionEngine
 
 
 def create_main_page(root, main_frame, history_frame, strategy_frame, populate_trade_history):
@@ -43,14 +42,20 @@ def create_main_page(root, main_frame, history_frame, strategy_frame, populate_t
     )
     strategy_button.pack(pady=10)
 
-    # Initialize Trade Execution Engine
-    trade_engine = TradeExecutionEngine()
+    # Trade Execution Engine, created on first use so startup does not open the database
+    trade_engine = []
+
+    def execute_trade():
+        if not trade_engine:
+            from data.dummy_manual_trade_execution import TradeExecutionEngine
+            trade_engine.append(TradeExecutionEngine())
+        trade_engine[0].execute_trade()
 
     # Add a button to execute trades manually
     trade_button = tk.Button(
         main_content,
         text="Execute Trade",
-        command=lambda: [trade_engine.execute_trade(), populate_trade_history()],
+        command=lambda: [execute_trade(), populate_trade_history()],
         bg="#1C1C2E",
         fg="white"
     )
@@ -59,21 +64,3 @@ def create_main_page(root, main_frame, history_frame, strategy_frame, populate_t
 
     quit_button = tk.Button(main_content, text="Quit", command=root.destroy, bg="#1C1C2E", fg="white")
     quit_button.pack(pady=10)
-
-    import duckdb
-
-    def inspect_database():
-        conn = duckdb.connect("trading_bot.db")
-        cursor = conn.cursor()
-
-        # Check the contents of the strategies table
-        print("Strategies Table Content:")
-        cursor.execute("SELECT * FROM strategies;")
-        rows = cursor.fetchall()
-        for row in rows:
-            print(row)
-
-        conn.close()
-
-    # Run the inspection
-    inspect_database()
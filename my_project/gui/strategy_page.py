@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk
 from gui.shared_components import show_frame, center_frame
-import json
-from data.db_handler import create_connection
+from gui.event_bus import get_gui_bus
+from data.scheduler import get_scheduler
 
 def update_dropdown_menu(dropdown, indicators, additional_indicators, selected_indicator):
     """Update the dropdown menu to show only unticked indicators."""
@@ -114,36 +114,18 @@ def toggle_indicator(var, ui_frame, indicator, indicators, additional_indicators
 def save_strategy_to_db(additional_data):
     """Save the strategy to the database."""
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-
+        from data.db_handler import save_strategy
         # Save or update the strategy
-        cursor.execute("DELETE FROM strategies")
-        cursor.execute(
-            """
-            INSERT INTO strategies (additional_indicators)
-            VALUES (?)
-            """,
-            (json.dumps(additional_data),),
-        )
-        conn.commit()
+        save_strategy(additional_data)
         print("Strategy saved successfully!")
     except Exception as e:
         print(f"Error saving strategy: {e}")
-    finally:
-        conn.close()
 
-def load_strategy(dynamic_frame, additional_indicators, indicators, dropdown, selected_indicator):
-    """Load the last saved strategy and populate the UI."""
+def load_strategy(dynamic_frame, additional_indicators, indicators, dropdown, selected_indicator, additional_data):
+    """Populate the UI with the last saved strategy."""
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-        row = cursor.execute("SELECT * FROM strategies LIMIT 1").fetchone()
-        conn.close()
-
-        if row:
+        if additional_data is not None:
             # Parse and load additional indicators
-            additional_data = json.loads(row[0]) if row[0] else {}
             for key, data in additional_data.items():
                 if key not in additional_indicators:
                     # Add UI elements for the additional indicator
@@ -213,7 +195,7 @@ def validate_inputs(additional_indicators, error_label):
     return errors
 
 
-def create_strategy_page(root, strategy_frame, main_frame, account_frame):
+def create_strategy_page(root, strategy_frame, main_frame, account_frame, ready=None):
     """Set up the enhanced strategy builder page."""
     strategy_frame.configure(bg="#1C1C2E")
     center_frame(strategy_frame)
@@ -292,22 +274,27 @@ def create_strategy_page(root, strategy_frame, main_frame, account_frame):
             strategy_saved.set(False)
 
     def load_strategy_on_start():
-        """Load the strategy from the database and set strategy_saved."""
-        try:
-            conn = create_connection()
-            cursor = conn.cursor()
-            row = cursor.execute("SELECT * FROM strategies LIMIT 1").fetchone()
-            conn.close()
-
-            if row:
+        """Read the strategy off the Tk thread, then populate the UI and set strategy_saved."""
+        def apply(additional_data):
+            if additional_data is not None:
                 # Populate UI with the loaded strategy
-                load_strategy(dynamic_frame, additional_indicators, indicators, dropdown, selected_indicator)
+                load_strategy(dynamic_frame, additional_indicators, indicators, dropdown, selected_indicator, additional_data)
                 strategy_saved.set(True)  # Mark as saved if a strategy exists
             else:
                 strategy_saved.set(False)  # No strategy in the database
-        except Exception as e:
-            print(f"Error loading strategy: {e}")
-            strategy_saved.set(False)
+
+        def read():
+            additional_data = None
+            try:
+                if ready is not None:
+                    ready.result()  # tables are created in the background at startup
+                from data.db_handler import load_saved_strategy
+                additional_data = load_saved_strategy()
+            except Exception as e:
+                print(f"Error loading strategy: {e}")
+            get_gui_bus().call(apply, additional_data)
+
+        get_scheduler().spawn("strategy:load", read)
 
     def navigate_to_account_page():
         """Validate if the strategy is saved before navigating."""
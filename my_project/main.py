@@ -1,74 +1,90 @@
-# main.py
-import tkinter as tk
-from gui.shared_components import toggle_fullscreen, show_frame
-from gui.main_page import create_main_page
-from gui.history_page import create_history_page
-from gui.strategy_page import create_strategy_page
-from data.db_handler import create_table, create_strategies_table, insert_sample_trade,drop_strategies_table, clear_trade_history, drop_trades_table
-from gui.account_page import create_account_page
-from data.account_storage import clear_all_accounts
-
-# Initialize database tables
-#drop_trades_table()
-#drop_strategies_table()
-
-create_table()
-create_strategies_table()
-
-#clear_trade_history()
-#clear_all_accounts()
-
-# Insert a sample trade upon laoding the app(test data)
-insert_sample_trade()
-
-# Set up the main Tkinter window
-root = tk.Tk()
-root.title("Trading Bot and Trade Copier")
-root.geometry("800x600")
-root.configure(bg="#1C1C2E")
-
-root.rowconfigure(0, weight=1)
-root.columnconfigure(0, weight=1)
-
-# Create frames for the app
-main_frame = tk.Frame(root)
-history_frame = tk.Frame(root)
-strategy_frame = tk.Frame(root)
-account_frame = tk.Frame(root)
-
-for frame in (main_frame, history_frame, strategy_frame, account_frame):
-    frame.grid(row=0, column=0, sticky="nsew")
-
-# Set up pages
-populate_trade_history = create_history_page(root, history_frame, main_frame)  # Get the populate function
-create_main_page(root, main_frame, history_frame, strategy_frame, populate_trade_history)  # Pass it here
-create_strategy_page(root, strategy_frame, main_frame, account_frame)
-create_account_page(root, account_frame, strategy_frame)
-
-# Fullscreen toggle binding
-root.bind("<F11>", lambda event: toggle_fullscreen(root))
-
-# Show the main frame initially
-show_frame(main_frame)
-
-# Start the Tkinter main loop
-root.mainloop()
-
-
-
-import duckdb
-
-def inspect_database():
-    conn = duckdb.connect("trading_bot.db")
-    cursor = conn.cursor()
-
-    # Check the contents of the strategies table
-    print("Strategies Table Content:")
-    cursor.execute("SELECT * FROM strategies;")
-    rows = cursor.fetchall()
-    for row in rows:
-        print(row)
-
-    conn.close()
-    inspect_database()
-
+# main.py
+from data import startup_timer
+import tkinter as tk
+from gui.shared_components import toggle_fullscreen, show_frame
+from gui.main_page import create_main_page
+from gui.history_page import create_history_page
+from gui.strategy_page import create_strategy_page
+from gui.account_page import create_account_page
+from gui.event_bus import get_gui_bus
+from data.scheduler import get_scheduler, stop_scheduler
+
+# Database setup runs off the Tk thread: DuckDB is imported and the tables created while the
+# window is already showing. Pages that read the database do so from background threads too.
+def prepare_database():
+    from data.db_handler import create_table, create_strategies_table
+    from data.trade_ledger import create_ledger_schema
+
+    # Initialize database tables
+    create_table()
+    create_strategies_table()
+    create_ledger_schema()
+    startup_timer.mark("database")
+
+# Local status/metrics endpoint for the desktop app (the daemon serves its own); optional, so a
+# busy port only costs the endpoint
+def start_status_endpoint():
+    from data.status_server import StatusServer, GUI_STATUS_PORT
+    from data.account_status import snapshot
+
+    try:
+        return StatusServer(snapshot, port=GUI_STATUS_PORT).start()
+    except OSError as e:
+        print(f"[Status] Local endpoint not started: {e}")
+        return None
+
+# Guarded so worker processes (spawned by the copier pool) can import this module safely
+def main():
+    startup_timer.mark("imports")
+    # A future the pages wait on before touching the database
+    database_ready = get_scheduler().spawn("startup:database", prepare_database)
+    status_endpoint = get_scheduler().spawn("startup:status", start_status_endpoint)
+
+    # Set up the main Tkinter window
+    root = tk.Tk()
+    root.title("Trading Bot and Trade Copier")
+    root.geometry("800x600")
+    root.configure(bg="#1C1C2E")
+
+    root.rowconfigure(0, weight=1)
+    root.columnconfigure(0, weight=1)
+    get_gui_bus().attach(root)
+
+    # Create frames for the app
+    main_frame = tk.Frame(root)
+    history_frame = tk.Frame(root)
+    strategy_frame = tk.Frame(root)
+    account_frame = tk.Frame(root)
+
+    for frame in (main_frame, history_frame, strategy_frame, account_frame):
+        frame.grid(row=0, column=0, sticky="nsew")
+
+    # Set up pages
+    populate_trade_history = create_history_page(root, history_frame, main_frame)  # Get the populate function
+    create_main_page(root, main_frame, history_frame, strategy_frame, populate_trade_history)  # Pass it here
+    create_strategy_page(root, strategy_frame, main_frame, account_frame, ready=database_ready)
+    create_account_page(root, account_frame, strategy_frame, ready=database_ready)
+    startup_timer.mark("pages")
+
+    # Fullscreen toggle binding
+    root.bind("<F11>", lambda event: toggle_fullscreen(root))
+
+    # Show the main frame initially
+    show_frame(main_frame)
+
+    def first_frame():
+        startup_timer.mark("window shown")
+        startup_timer.report()
+    root.after_idle(first_frame)
+
+    # Start the Tkinter main loop
+    root.mainloop()
+
+    # Window closed: cancel every scheduled loop and let in-flight broker and database calls finish
+    stop_scheduler()
+    if status_endpoint.done() and status_endpoint.result():
+        status_endpoint.result().stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Shared fixtures: the tests import the app's modules as the app does (from data.x import y) and
+# run against data.fake_mt5 instead of a MetaTrader 5 terminal
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # State files (bot_state.db, legacy JSON files, logs) are read and written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def fake_broker():
+    """A fresh simulated broker installed as MetaTrader5, behind the process-wide session broker."""
+    from data import fake_mt5
+    from data.mt5_session import MT5SessionBroker, set_broker
+
+    broker = fake_mt5.install(seed=1)
+    set_broker(MT5SessionBroker(mt5_module=fake_mt5))
+    yield broker
+    set_broker(None)
+    fake_mt5.uninstall()
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from data import account_status
+from data.account_health import AccountHealthMonitor, BACKOFF_MAX
+from data.mt5_session import MT5Account, get_broker
+from data.scheduler import PollScheduler
+
+ACCOUNT = MT5Account("1001", "x", "FakeBroker-Demo")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_probe_timeout_on_the_shared_broker_recovers(fake_broker):
+    fake_broker.add_account(ACCOUNT.login, ACCOUNT.password)
+    # The monitor's job is never started: ticks are driven by hand
+    monitor = AccountHealthMonitor(probe_timeout=0.05, scheduler=PollScheduler())
+    monitor.add(ACCOUNT)
+    state = monitor._accounts[ACCOUNT.login]
+
+    # The session is busy, so the first probe cannot be answered in time
+    release = threading.Event()
+    busy = get_broker().submit(ACCOUNT, lambda mt5: release.wait(5))
+    monitor.tick()
+    assert state.sent_at is not None
+    time.sleep(0.1)
+    monitor.tick()
+    assert state.failures == 1
+    assert state.sent_at is None
+    assert account_status.snapshot()[ACCOUNT.login]["status"].startswith("RECONNECTING")
+
+    # Later ticks wait for the backoff instead of failing the same probe again
+    monitor.tick()
+    monitor.tick()
+    assert state.failures == 1
+
+    release.set()
+    busy.result(5)
+    state.next_due = 0.0
+    monitor.tick()
+    wait_for(lambda: state.future is not None and state.future.done())
+    monitor.tick()
+    assert state.failures == 0 and state.connected
+    assert account_status.snapshot()[ACCOUNT.login]["status"] == "CONNECTED"
+
+
+def test_backoff_is_capped_after_many_failures(fake_broker):
+    monitor = AccountHealthMonitor(scheduler=PollScheduler())
+    monitor.add(ACCOUNT)
+    state = monitor._accounts[ACCOUNT.login]
+    state.failures = 5000
+    monitor._failed(state, "unreachable")
+    assert state.next_due - time.monotonic() <= BACKOFF_MAX * 1.2
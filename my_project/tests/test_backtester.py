@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from data.backtester import simulate_direction, trade_stats, run_backtest
+
+# EURUSD: 1 pip = 0.0001, SL 10 pips, TP 20 pips. One bar per minute from t=0, so bars 0-29 share the first
+# 30 minute reset window
+
+
+def bars(closes, highs=None, lows=None, start=0):
+    closes = np.array(closes, dtype=float)
+    return {
+        "time": start + np.arange(len(closes), dtype=np.int64) * 60,
+        "close": closes,
+        "high": np.array(highs if highs is not None else closes, dtype=float),
+        "low": np.array(lows if lows is not None else closes, dtype=float),
+    }
+
+
+def signal(length, at):
+    """Direction array with {bar index: +1 BUY / -1 SELL} and no signal elsewhere."""
+    direction = np.zeros(length, dtype=np.int8)
+    for index, side in at.items():
+        direction[index] = side
+    return direction
+
+
+def test_buy_take_profit():
+    history = bars([1.1000, 1.1005, 1.1010], highs=[1.1000, 1.1025, 1.1010])
+    trades = simulate_direction("EURUSD", history, signal(3, {0: 1}))
+    assert trades["reason"].tolist() == [0]  # TP
+    assert trades["exit_price"][0] == pytest.approx(1.1020)
+    assert trades["pips"][0] == pytest.approx(20)
+    assert trades["profit"][0] == pytest.approx(200)  # 20 pips on 1 lot of 100000
+    assert trades["exit_time"][0] == 60
+
+
+def test_sell_stop_loss():
+    history = bars([1.1000, 1.1005, 1.0990], highs=[1.1000, 1.1015, 1.0990])
+    trades = simulate_direction("EURUSD", history, signal(3, {0: -1}))
+    assert trades["reason"].tolist() == [1]  # SL
+    assert trades["exit_price"][0] == pytest.approx(1.1010)
+    assert trades["pips"][0] == pytest.approx(-10)
+    assert trades["profit"][0] == pytest.approx(-100)
+
+
+def test_stop_wins_when_sl_and_tp_are_in_the_same_bar():
+    history = bars([1.1000, 1.1000], highs=[1.1000, 1.1030], lows=[1.1000, 1.0980])
+    trades = simulate_direction("EURUSD", history, signal(2, {0: 1}))
+    assert trades["reason"].tolist() == [1]
+    assert trades["pips"][0] == pytest.approx(-10)
+
+
+def test_reset_closes_at_the_last_bar_of_the_window():
+    history = bars([1.1000, 1.1003, 1.1006])
+    trades = simulate_direction("EURUSD", history, signal(3, {0: 1}))
+    assert trades["reason"].tolist() == [2]  # Reset
+    assert trades["exit_time"][0] == 120
+    assert trades["pips"][0] == pytest.approx(6)
+
+
+def test_one_trade_per_reset_window():
+    # Bars 0-29 are the first window, 30-59 the second
+    history = bars([1.1000] * 60)
+    trades = simulate_direction("EURUSD", history, signal(60, {3: 1, 5: -1, 31: -1}))
+    assert trades["entry_time"].tolist() == [3 * 60, 31 * 60]
+    assert trades["direction"].tolist() == [1, -1]
+
+
+def test_spread_and_volume():
+    # Buys enter at the ask (close + spread); flat prices leave exactly the spread as the loss
+    history = bars([1.1000, 1.1000])
+    trades = simulate_direction("EURUSD", history, signal(2, {0: 1}), spread_pips=1.5, volume=2.0)
+    assert trades["entry_price"][0] == pytest.approx(1.10015)
+    assert trades["pips"][0] == pytest.approx(-1.5)
+    assert trades["profit"][0] == pytest.approx(-30)
+
+
+def test_jpy_pip_size():
+    history = bars([150.00, 150.10], highs=[150.00, 150.25])
+    trades = simulate_direction("USDJPY", history, signal(2, {0: 1}))
+    assert trades["exit_price"][0] == pytest.approx(150.20)  # TP 20 pips of 0.01
+    assert trades["pips"][0] == pytest.approx(20)
+
+
+def test_trade_stats():
+    trades = {
+        "exit_time": np.array([60, 120, 180]),
+        "pips": np.array([20.0, -10.0, -10.0]),
+        "profit": np.array([200.0, -100.0, -100.0]),
+        "reason": np.array([0, 1, 1]),
+    }
+    stats = trade_stats(trades)
+    assert (stats["trades"], stats["wins"], stats["losses"]) == (3, 1, 2)
+    assert stats["total_pips"] == pytest.approx(0)
+    assert stats["profit"] == pytest.approx(0)
+    assert stats["profit_factor"] == pytest.approx(1.0)
+    assert stats["max_drawdown_pips"] == pytest.approx(20)
+    assert stats["exits"] == {"TP": 1, "SL": 2, "Reset": 0}
+
+
+def test_run_backtest_without_signals():
+    history = bars([1.1000] * 10)
+    strategy = {"RSI": {"var": 0, "sub_indicators": {}}}
+    result = run_backtest(strategy, {"EURUSD": history})
+    assert result["total"]["trades"] == 0
+    assert result["symbols"]["EURUSD"]["profit"] == 0
@@ -0,0 +1,21 @@
+import multiprocessing
+import os
+import time
+
+from data.benchmark import _scenario_result
+
+
+def test_dead_or_stuck_scenario_process_is_reported_instead_of_blocking():
+    ctx = multiprocessing.get_context("spawn")
+
+    died = ctx.Process(target=os._exit, args=(3,))
+    died.start()
+    assert _scenario_result(died, ctx.Queue(), timeout=60) == {
+        "error": "scenario process exited with code 3 without a result"}
+
+    stuck = ctx.Process(target=time.sleep, args=(60,))
+    stuck.start()
+    started = time.monotonic()
+    assert _scenario_result(stuck, ctx.Queue(), timeout=0.5) == {"error": "scenario timed out after 0.5s"}
+    stuck.join(5)
+    assert not stuck.is_alive() and time.monotonic() - started < 10
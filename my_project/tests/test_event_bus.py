@@ -0,0 +1,47 @@
+from gui.event_bus import GuiEventBus
+
+
+class FakeRoot:
+    """Stands in for the Tk root: remembers the scheduled tick instead of running an event loop."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+
+def test_failing_handler_or_call_does_not_drop_the_rest_of_the_tick():
+    root = FakeRoot()
+    updated, called = [], []
+
+    def account_handler(login, fields):
+        if login == "1":
+            raise RuntimeError("widget gone")
+        updated.append((login, fields))
+
+    bus = GuiEventBus()
+    bus.attach(root, account_handler=account_handler)
+    bus.update_account(1, status="CONNECTED")
+    bus.update_account(2, status="CONNECTED")
+    bus.call(lambda: 1 / 0)
+    bus.call(called.append, "on_connected")
+
+    root.scheduled.pop()()
+
+    assert updated == [("2", {"status": "CONNECTED"})]
+    assert called == ["on_connected"]
+    assert len(root.scheduled) == 1  # the next tick is still scheduled
+
+
+def test_account_updates_are_merged_until_the_tick():
+    root = FakeRoot()
+    updated = []
+    bus = GuiEventBus()
+    bus.attach(root, account_handler=lambda login, fields: updated.append((login, fields)))
+    bus.update_account(1, status="CONNECTING")
+    bus.update_account(1, status="CONNECTED", balance=100.0)
+
+    root.scheduled.pop()()
+
+    assert updated == [("1", {"status": "CONNECTED", "balance": 100.0})]
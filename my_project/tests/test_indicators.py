@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import vector_indicators as vi
+from data.indicators import (
+    SMA, RollingStd, RollingExtreme, EMA, RMA, RSI, MACD, Bollinger, Stochastic, IndicatorEngine,
+)
+
+BARS = 300
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(7)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, BARS))
+    high = close + np.abs(rng.normal(0, 0.0003, BARS))
+    low = close - np.abs(rng.normal(0, 0.0003, BARS))
+    return {"time": 1_700_000_000 + np.arange(BARS) * 60, "high": high, "low": low, "close": close}
+
+
+# Reference formulas: pandas_ta's definitions written out with plain pandas
+
+def ref_sma(x, length):
+    return pd.Series(x).rolling(length).mean()
+
+
+def ref_ema(x, length):
+    x = pd.Series(x).dropna()
+    seeded = x.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = x.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def ref_rma(x, length):
+    return pd.Series(x).ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def ref_rsi(close, length):
+    diff = pd.Series(close).diff()
+    gain, loss = ref_rma(diff.clip(lower=0), length), ref_rma(-diff.clip(upper=0), length)
+    return 100 * gain / (gain + loss)
+
+
+def ref_macd(close, fast, slow, signal):
+    line = (ref_ema(close, fast) - ref_ema(close, slow)).reindex(range(len(close)))
+    return line, ref_ema(line, signal).reindex(range(len(close)))
+
+
+def ref_stoch(high, low, close, k, d, smooth_k):
+    lowest, highest = pd.Series(low).rolling(k).min(), pd.Series(high).rolling(k).max()
+    raw = 100 * (pd.Series(close) - lowest) / (highest - lowest)
+    stoch_k = raw.rolling(smooth_k).mean()
+    return stoch_k, stoch_k.rolling(d).mean()
+
+
+def run(indicator, *series):
+    return [indicator.update(*values) for values in zip(*series)]
+
+
+def assert_series(actual, expected):
+    np.testing.assert_allclose(np.array(actual, dtype=float), np.asarray(expected, dtype=float),
+                               rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_sma_std_and_extremes(prices):
+    close = prices["close"]
+    assert_series(run(SMA(20), close), ref_sma(close, 20))
+    assert_series(run(RollingStd(20), close), pd.Series(close).rolling(20).std(ddof=0))
+    assert_series(run(RollingExtreme(14, use_max=True), close), pd.Series(close).rolling(14).max())
+    assert_series(run(RollingExtreme(14, use_max=False), close), pd.Series(close).rolling(14).min())
+
+
+def test_ema_and_rma(prices):
+    close = prices["close"]
+    assert_series(run(EMA(12), close), ref_ema(close, 12))
+    assert_series(run(RMA(14), close), ref_rma(close, 14))
+
+
+def test_rsi(prices):
+    assert_series(run(RSI(14), prices["close"]), ref_rsi(prices["close"], 14))
+
+
+def test_macd(prices):
+    line, signal = zip(*run(MACD(12, 26, 9), prices["close"]))
+    expected_line, expected_signal = ref_macd(prices["close"], 12, 26, 9)
+    assert_series(line, expected_line)
+    assert_series(signal, expected_signal)
+
+
+def test_bollinger(prices):
+    lower, mid, upper = zip(*run(Bollinger(20, 2), prices["close"]))
+    dev = pd.Series(prices["close"]).rolling(20).std(ddof=0)
+    assert_series(mid, ref_sma(prices["close"], 20))
+    assert_series(lower, ref_sma(prices["close"], 20) - 2 * dev)
+    assert_series(upper, ref_sma(prices["close"], 20) + 2 * dev)
+
+
+def test_stochastic(prices):
+    k, d = zip(*run(Stochastic(14, 3, 3), prices["high"], prices["low"], prices["close"]))
+    expected_k, expected_d = ref_stoch(prices["high"], prices["low"], prices["close"], 14, 3, 3)
+    assert_series(k, expected_k)
+    assert_series(d, expected_d)
+
+
+def test_batch_path_uses_the_same_formulas(prices):
+    close, high, low = prices["close"], prices["high"], prices["low"]
+    assert_series(vi.rsi(close, 14)[0], ref_rsi(close, 14))
+    line, signal = vi.macd(close, 12, 26, 9)
+    assert_series(line[0], ref_macd(close, 12, 26, 9)[0])
+    assert_series(signal[0], ref_macd(close, 12, 26, 9)[1])
+    assert_series(vi.stoch(high, low, close, 14, 3, 3)[0][0], ref_stoch(high, low, close, 14, 3, 3)[0])
+
+
+@pytest.mark.parametrize("indicator", [lambda: SMA(5), lambda: EMA(5), lambda: RMA(5), lambda: RSI(5),
+                                       lambda: RollingStd(5), lambda: RollingExtreme(5, True)])
+def test_peek_matches_update_without_changing_state(prices, indicator):
+    close = prices["close"][:30]
+    peeked, updated = indicator(), indicator()
+    for x in close:
+        expected = updated.update(x)
+        value = peeked.peek(x)
+        assert value == expected or (math.isnan(value) and math.isnan(expected))
+        assert peeked.peek(x) == value or math.isnan(value)  # peeking twice gives the same answer
+        peeked.update(x)
+
+
+STRATEGY = {
+    "RSI": {"var": 1, "sub_indicators": {"Period": {"value": 14}}},
+    "MACD": {"var": 1, "sub_indicators": {"Fast EMA": {"value": 12}, "Slow EMA": {"value": 26}, "MACD SMA": {"value": 9}}},
+    "Bollinger Bands": {"var": 1, "sub_indicators": {"Period": {"value": 20}, "Deviation": {"value": 2}}},
+    "Stochastic Oscillator": {"var": 1, "sub_indicators": {"%K Period": {"value": 14}, "%D Period": {"value": 3},
+                                                           "Slowing": {"value": 3}}},
+    "Moving Average": {"var": 1, "sub_indicators": {"Period": {"value": 10}, "Shift": {"value": 2}}},
+}
+
+
+def window(prices, end, size=100):
+    return {field: values[end - size:end] for field, values in prices.items()}
+
+
+def batch_values(bars):
+    """What the batch path (and the old per-window pandas_ta recompute) sees for the window's last bar."""
+    close, high, low = bars["close"], bars["high"], bars["low"]
+    line, signal = vi.macd(close, 12, 26, 9)
+    lower, mid, upper = vi.bbands(close, 20, 2)
+    k, d = vi.stoch(high, low, close, 14, 3, 3)
+    sma = vi.sma(close, 10)
+    return {
+        "RSI": vi.rsi(close, 14)[0, -1], "MACD": line[0, -1], "MACD_signal": signal[0, -1],
+        "BBL": lower[0, -1], "BBM": mid[0, -1], "BBU": upper[0, -1], "STOCHk": k[0, -1], "STOCHd": d[0, -1],
+        "SMA": sma[0, -1], "SMA_shifted": sma[0, -3],
+    }
+
+
+def test_first_feed_matches_a_recompute_of_the_window(prices):
+    bars = window(prices, 100)
+    values = IndicatorEngine(STRATEGY).feed(bars)
+    for key, expected in batch_values(bars).items():
+        assert values[key] == pytest.approx(expected, rel=1e-9), key
+
+
+def test_feed_commits_only_new_closed_bars(prices):
+    engine = IndicatorEngine(STRATEGY)
+    engine.feed(window(prices, 100))
+    assert engine.last_time == prices["time"][98]  # the last bar is still forming
+
+    # Same window again: nothing new is committed and the forming bar is previewed again
+    before = dict(engine.values)
+    again = engine.feed(window(prices, 100))
+    assert engine.values == before and engine.last_time == prices["time"][98]
+
+    # One bar later: bar 99 is committed, and the preview equals a reference engine fed every bar
+    values = engine.feed(window(prices, 101))
+    reference = IndicatorEngine(STRATEGY)
+    for i in range(100):
+        reference.update(prices["time"][i], prices["high"][i], prices["low"][i], prices["close"][i])
+    assert engine.last_time == prices["time"][99]
+    expected = reference.preview(prices["high"][100], prices["low"][100], prices["close"][100])
+    assert values.keys() == expected.keys()
+    for key in values:
+        assert values[key] == pytest.approx(expected[key], rel=1e-12, nan_ok=True), key
+    assert again["RSI"] != values["RSI"]
+
+
+def test_preview_does_not_commit(prices):
+    engine = IndicatorEngine(STRATEGY)
+    engine.feed(window(prices, 100))
+    committed = dict(engine.values)
+    first = engine.preview(1.2, 1.0, 1.1)
+    assert engine.preview(1.2, 1.0, 1.1) == first
+    assert engine.values == committed
+
+
+def test_feed_after_a_gap_rebuilds_from_the_window(prices):
+    engine = IndicatorEngine(STRATEGY)
+    engine.feed(window(prices, 100))
+    later = window(prices, 250)  # starts after the last committed bar
+    values = engine.feed(later)
+    fresh = IndicatorEngine(STRATEGY).feed(later)
+    assert values == pytest.approx(fresh, nan_ok=True)
+
+
+def test_warm_up_divergence_from_window_recompute(prices):
+    """Documents the difference described in data/indicators.py: windowed indicators stay identical to
+    a recompute over the latest 100 bars, recursive ones (RSI, MACD) keep memory from before the window."""
+    engine = IndicatorEngine(STRATEGY)
+    engine.feed(window(prices, 100))
+    for end in range(101, BARS + 1):
+        values = engine.feed(window(prices, end))
+        expected = batch_values(window(prices, end))
+        for key in ("BBL", "BBM", "BBU", "STOCHk", "STOCHd", "SMA", "SMA_shifted"):
+            assert values[key] == pytest.approx(expected[key], rel=1e-9), key
+        assert abs(values["RSI"] - expected["RSI"]) < 0.1
+        assert abs(values["MACD"] - expected["MACD"]) < 1e-5
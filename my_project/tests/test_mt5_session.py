@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from data import fake_mt5
+from data.mt5_session import MT5Account, MT5SessionBroker, MT5SessionError
+
+GOOD = MT5Account("1001", "x", "FakeBroker-Demo")
+BAD = MT5Account("1002", "wrong", "FakeBroker-Demo")
+
+
+@pytest.fixture
+def broker(fake_broker):
+    fake_broker.add_account(GOOD.login, GOOD.password)
+    fake_broker.add_account(BAD.login, "secret")
+    broker = MT5SessionBroker(mt5_module=fake_mt5).start()
+    yield broker
+    broker.stop()
+
+
+def test_failed_login_fails_the_jobs(broker):
+    with pytest.raises(MT5SessionError):
+        broker.run(BAD, lambda mt5: True)
+    assert broker.run(GOOD, lambda mt5: mt5.account_info().login) == 1001
+
+
+def test_cancelled_job_on_a_failed_login_does_not_stop_the_worker(broker):
+    release = threading.Event()
+    busy = broker.submit(GOOD, lambda mt5: release.wait(5))
+    cancelled = broker.submit(BAD, lambda mt5: True)
+    failing = broker.submit(BAD, lambda mt5: True)
+    assert cancelled.cancel()
+    release.set()
+    busy.result(5)
+
+    with pytest.raises(MT5SessionError):
+        failing.result(5)
+    assert broker.run(GOOD, lambda mt5: True) is True
+
+
+def test_stop_skips_cancelled_jobs(broker):
+    started, release = threading.Event(), threading.Event()
+    busy = broker.submit(GOOD, lambda mt5: started.set() or release.wait(5))
+    started.wait(5)
+    cancelled = broker.submit(BAD, lambda mt5: True)
+    pending = broker.submit(BAD, lambda mt5: True)
+    assert cancelled.cancel()
+    threading.Timer(0.2, release.set).start()
+    broker.stop()
+    assert busy.result(5) is True
+    assert cancelled.cancelled()
+    with pytest.raises(MT5SessionError):
+        pending.result(5)
@@ -0,0 +1,76 @@
+import itertools
+import threading
+
+import pytest
+
+from data import fake_mt5
+from data.mt5_session import MT5Account, get_broker
+from data.order_router import OrderRouter
+
+ACCOUNT = MT5Account("1001", "x", "FakeBroker-Demo")
+
+
+@pytest.fixture
+def held(fake_broker):
+    """Keeps the account's session busy so orders queue up in the router until release() is called."""
+    fake_broker.add_account(ACCOUNT.login, ACCOUNT.password)
+    release = threading.Event()
+    job = get_broker().submit(ACCOUNT, lambda mt5: release.wait(5))
+    yield release
+    release.set()
+    job.result(5)
+
+
+def test_identical_pending_opens_are_sent_once(fake_broker, held):
+    router = OrderRouter()
+    first = router.open(ACCOUNT, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1, magic=7, comment="signal")
+    second = router.open(ACCOUNT, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1, magic=7, comment="signal")
+    other = router.open(ACCOUNT, "GBPUSD", fake_mt5.ORDER_TYPE_SELL, 0.1, magic=7, comment="signal")
+    held.set()
+
+    outcome = first.result(5)
+    assert outcome.ok
+    assert second.result(5) is outcome
+    assert other.result(5).ok
+    # One batch: one tick per symbol, one send per distinct order
+    assert fake_broker.calls["order_send"] == 2
+    assert fake_broker.calls["symbol_info_tick"] == 2
+    assert len(fake_broker.accounts[1001].positions) == 2
+
+
+def test_closes_of_the_same_position_are_coalesced(fake_broker, held):
+    ticket = fake_broker.open_position(1001, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1)
+    router = OrderRouter()
+    closes = [router.close(ACCOUNT, ticket, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1, count=True, deals=True)
+              for _ in range(3)]
+    held.set()
+
+    outcomes = [future.result(5) for future in closes]
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert outcomes[0].ok and outcomes[0].open_count == 0
+    assert outcomes[0].closed is not None  # (price, profit, reason, time) from the position's deals
+    assert fake_broker.calls["order_send"] == 1
+
+
+def test_requote_is_retried_once_at_a_fresh_price(fake_broker, monkeypatch):
+    fake_broker.fill_rules = fake_mt5.FillRules(requote_rate=0.5)
+    # The first send draws a requote, the retry does not
+    monkeypatch.setattr(fake_broker._rng, "random", iter([0.0, 0.9]).__next__)
+
+    outcome = OrderRouter().open(ACCOUNT, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1).result(5)
+
+    assert outcome.ok
+    assert fake_broker.calls["order_send"] == 2
+    assert fake_broker.calls["symbol_info_tick"] == 2
+
+
+def test_second_requote_fails_the_order(fake_broker, monkeypatch):
+    fake_broker.fill_rules = fake_mt5.FillRules(requote_rate=0.5)
+    monkeypatch.setattr(fake_broker._rng, "random", itertools.repeat(0.0).__next__)
+
+    outcome = OrderRouter().open(ACCOUNT, "EURUSD", fake_mt5.ORDER_TYPE_BUY, 0.1).result(5)
+
+    assert not outcome.ok
+    assert outcome.error == str(fake_mt5.TRADE_RETCODE_REQUOTE)
+    assert fake_broker.calls["order_send"] == 2
+    assert not fake_broker.accounts[1001].positions
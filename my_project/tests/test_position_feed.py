@@ -0,0 +1,91 @@
+import json
+
+from data.position_feed import PositionDiffEngine, PositionFeed, PositionSnapshot, OPENED, CLOSED, MODIFIED
+
+
+def position(ticket, sl=0.0, tp=0.0, volume=1.0, symbol="EURUSD"):
+    return PositionSnapshot(ticket, symbol, 0, volume, 1.085, sl, tp, 0, "")
+
+
+def kinds(events):
+    return sorted((event.kind, event.position.ticket) for event in events)
+
+
+def test_first_snapshot_reports_every_position_as_opened():
+    engine = PositionDiffEngine()
+    events = engine.apply([position(1), position(2)])
+    assert kinds(events) == [(OPENED, 1), (OPENED, 2)]
+    assert all(event.previous is None for event in events)
+    assert set(engine.positions) == {1, 2}
+
+
+def test_unchanged_positions_produce_no_events():
+    engine = PositionDiffEngine()
+    engine.apply([position(1, sl=1.08)])
+    assert engine.apply([position(1, sl=1.08)]) == []
+
+
+def test_sl_tp_and_volume_changes_are_modified_events():
+    engine = PositionDiffEngine()
+    engine.apply([position(1), position(2), position(3)])
+    events = engine.apply([position(1, sl=1.08), position(2, tp=1.09), position(3, volume=0.5)])
+    assert kinds(events) == [(MODIFIED, 1), (MODIFIED, 2), (MODIFIED, 3)]
+    modified = {event.position.ticket: event for event in events}
+    assert modified[1].previous.sl == 0.0 and modified[1].position.sl == 1.08
+    assert modified[3].previous.volume == 1.0
+
+
+def test_missing_positions_are_closed_with_their_last_snapshot():
+    engine = PositionDiffEngine()
+    engine.apply([position(1, sl=1.08), position(2)])
+    events = engine.apply([position(2)])
+    assert kinds(events) == [(CLOSED, 1)]
+    assert events[0].position.sl == 1.08
+    assert set(engine.positions) == {2}
+
+
+def test_open_and_close_in_one_diff():
+    engine = PositionDiffEngine()
+    engine.apply([position(1)])
+    assert kinds(engine.apply([position(2)])) == [(CLOSED, 1), (OPENED, 2)]
+
+
+def test_empty_result_closes_everything():
+    engine = PositionDiffEngine()
+    engine.apply([position(1)])
+    assert kinds(engine.apply([])) == [(CLOSED, 1)]
+    assert engine.positions == {}
+
+
+def test_feed_publishes_diffs_and_survives_a_failing_subscriber(fake_broker):
+    from data.mt5_session import MT5Account
+
+    feed = PositionFeed(MT5Account("1001", "x", "FakeBroker-Demo"))
+    received = []
+    feed.subscribe(lambda events: 1 / 0)
+    feed.subscribe(received.extend)
+    feed.poll()
+    ticket = fake_broker.open_position(1001, "EURUSD", 0, 0.1)
+    feed.poll()
+    fake_broker.close_position(1001, ticket)
+    feed.poll()
+    assert [(event.kind, event.position.ticket) for event in received] == [(OPENED, ticket), (CLOSED, ticket)]
+
+
+def test_journal_rotates_by_size(fake_broker, workdir):
+    from data.mt5_session import MT5Account
+
+    feed = PositionFeed(MT5Account("1001", "x", "FakeBroker-Demo"), journal_max_bytes=400, journal_backups=2)
+    feed.poll()
+    for _ in range(6):
+        ticket = fake_broker.open_position(1001, "EURUSD", 0, 0.1)
+        feed.poll()
+        fake_broker.close_position(1001, ticket)
+        feed.poll()
+
+    journals = sorted(p.name for p in workdir.glob("position_events.jsonl*"))
+    assert journals == ["position_events.jsonl", "position_events.jsonl.1", "position_events.jsonl.2"]
+    for path in workdir.glob("position_events.jsonl*"):
+        # A file is rotated before the write that would start past the limit, so it holds at most one batch over it
+        assert path.stat().st_size < 400 + 300
+        assert all(json.loads(line)["account"] == "1001" for line in path.read_text().splitlines())
@@ -0,0 +1,61 @@
+import json
+
+from data.state_store import StateStore
+
+ACCOUNTS = {
+    "masters": [{"login": "1001", "password": "m", "server": "Demo"}],
+    "slaves": [{"login": "2001", "password": "s", "server": "Demo", "path": "C:/MT5/slave1/terminal64.exe"}],
+}
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_legacy_json_files_are_imported(workdir):
+    write_json(workdir / "accounts.json", ACCOUNTS)
+    write_json(workdir / "last_trades.json", [253462689, "253478274"])
+    write_json(workdir / "closed_master_trades.json", [
+        {"ticket": 253462689, "symbol": "EURUSD+"},
+        {"symbol": "GBPUSD+"},  # written before closures carried the master ticket
+        {"ticket": 1},          # no symbol: skipped
+    ])
+
+    store = StateStore()
+    assert store.load_accounts() == ACCOUNTS
+    assert store.copied_tickets() == {253462689, 253478274}
+    assert store.has_pending_closed()
+    assert [row[1:] for row in store.pending_closed_master_trades()] == [(253462689, "EURUSD+"), (None, "GBPUSD+")]
+    store.close()
+
+
+def test_import_runs_once(workdir):
+    write_json(workdir / "last_trades.json", [1, 2])
+    write_json(workdir / "closed_master_trades.json", [{"ticket": 1, "symbol": "EURUSD+"}])
+    StateStore().close()
+
+    # Edits to the old files after the import are ignored, and nothing is queued twice
+    write_json(workdir / "last_trades.json", [1, 2, 3])
+    store = StateStore()
+    assert store.copied_tickets() == {1, 2}
+    assert len(store.pending_closed_master_trades()) == 1
+    store.close()
+
+
+def test_missing_and_unreadable_files(workdir):
+    (workdir / "last_trades.json").write_text("not json")
+
+    store = StateStore()
+    assert store.copied_tickets() == set()
+    assert store.load_accounts() == {"masters": [], "slaves": []}
+    assert not store.has_pending_closed()
+    store.close()
+
+    # The import happens on the first start only: files missing or unreadable then are not picked up later
+    write_json(workdir / "accounts.json", ACCOUNTS)
+    write_json(workdir / "last_trades.json", [5])
+    store = StateStore()
+    assert store.load_accounts() == {"masters": [], "slaves": []}
+    assert store.copied_tickets() == set()
+    store.close()
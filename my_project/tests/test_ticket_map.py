@@ -0,0 +1,83 @@
+import pytest
+
+from data.state_store import StateStore
+from data.ticket_map import SlaveTradeMap, master_ticket_from_comment
+from data.trade_copier import SlavePosition
+
+
+@pytest.fixture
+def store():
+    store = StateStore("state.db", migrate=False)
+    yield store
+    store.close()
+
+
+def trade(ticket, symbol="EURUSD", comment="Trade-EURUSD"):
+    return {"ticket": ticket, "symbol": symbol, "volume": 1.0, "type": 0, "comment": comment}
+
+
+def test_master_ticket_from_comment():
+    assert master_ticket_from_comment("Copy123456") == 123456
+    assert master_ticket_from_comment("Copy123456 [sl 1.08]") == 123456
+    assert master_ticket_from_comment("Trade-EURUSD") is None
+    assert master_ticket_from_comment(None) is None
+
+
+def test_reconcile_drops_copies_closed_while_stopped(store):
+    copies = SlaveTradeMap(store)
+    copies.add(1, "2001", trade(501))
+    copies.add(2, "2001", trade(502))
+    copies.add(2, "2002", trade(601))
+
+    recovered = copies.reconcile({
+        "2001": [SlavePosition(502, "EURUSD", 1.0, 0, "Copy2")],
+        "2002": [SlavePosition(601, "EURUSD", 1.0, 0, "Copy2")],
+    })
+
+    assert recovered == set()
+    assert 1 not in copies
+    assert set(copies.by_master[2]) == {"2001", "2002"}
+    # The removal is persisted: a map rebuilt from the store agrees
+    assert SlaveTradeMap(store).masters() == [2]
+
+
+def test_reconcile_recovers_copies_from_comments(store):
+    copies = SlaveTradeMap(store)
+    recovered = copies.reconcile({
+        "2001": [
+            SlavePosition(501, "GBPUSD", 0.5, 1, "Copy77"),
+            SlavePosition(502, "EURUSD", 1.0, 0, "manual trade"),
+        ],
+    })
+
+    assert recovered == {77}
+    restored = copies.by_master[77]["2001"]
+    assert restored == {"ticket": 501, "symbol": "GBPUSD", "volume": 0.5, "type": 1, "comment": "Copy77"}
+    assert ("2001", 502) not in copies.by_slave
+    assert SlaveTradeMap(store).by_master[77]["2001"] == restored
+
+
+def test_reconcile_keeps_known_copies_and_skips_unreachable_slaves(store):
+    copies = SlaveTradeMap(store)
+    copies.add(1, "2001", trade(501))
+    copies.add(1, "2002", trade(601))
+
+    recovered = copies.reconcile({"2001": [SlavePosition(501, "EURUSD", 1.0, 0, "Copy1")], "2002": None})
+
+    assert recovered == set()
+    # Known copies keep the master's comment; the unreachable slave's copy is left alone
+    assert copies.by_master[1]["2001"]["comment"] == "Trade-EURUSD"
+    assert copies.by_master[1]["2002"]["ticket"] == 601
+
+
+def test_pop_and_remove(store):
+    copies = SlaveTradeMap(store)
+    copies.add(1, "2001", trade(501))
+    copies.add(1, "2002", trade(601))
+    copies.add(2, "2001", trade(502))
+
+    copies.remove([(1, "2002")])
+    assert set(copies.by_master[1]) == {"2001"}
+    assert copies.pop(1) == {"2001": trade(501)}
+    assert copies.masters() == [2]
+    assert sorted(row[2] for row in store.slave_trades()) == [502]
@@ -0,0 +1,34 @@
+from data.mt5_session import MT5Account, get_broker
+from data.position_feed import PositionFeed
+from data.trade_copier import (
+    TradeCopier, SerialSlaveBackend, COPY_BATCH_SECONDS, CLOSE_BATCH_SECONDS, COPIED_POSITIONS, CLOSED_POSITIONS,
+)
+
+MASTER = MT5Account("1001", "x", "FakeBroker-Demo")
+SLAVES = [MT5Account("2001", "x", "FakeBroker-Demo"), MT5Account("2002", "x", "FakeBroker-Demo")]
+
+
+def batches(histogram):
+    return sum(count for _, _, _, count in histogram._copy())
+
+
+def test_one_latency_sample_per_batch(fake_broker):
+    feed = PositionFeed(MASTER)
+    copier = TradeCopier(SerialSlaveBackend(get_broker(), SLAVES), feed=feed)
+    copier.recover()
+    feed.poll()
+    copy_batches, close_batches = batches(COPY_BATCH_SECONDS), batches(CLOSE_BATCH_SECONDS)
+    copied, closed = COPIED_POSITIONS.value("EURUSD"), CLOSED_POSITIONS.value("EURUSD")
+
+    tickets = [fake_broker.open_position(1001, "EURUSD", 0, 0.1) for _ in range(3)]
+    copier.handle_events(feed.poll())
+    assert [len(fake_broker.accounts[int(slave.login)].positions) for slave in SLAVES] == [3, 3]
+    for ticket in tickets:
+        fake_broker.close_position(1001, ticket)
+    copier.handle_events(feed.poll())
+
+    assert [len(fake_broker.accounts[int(slave.login)].positions) for slave in SLAVES] == [0, 0]
+    assert batches(COPY_BATCH_SECONDS) == copy_batches + 1
+    assert batches(CLOSE_BATCH_SECONDS) == close_batches + 1
+    assert COPIED_POSITIONS.value("EURUSD") == copied + 3
+    assert CLOSED_POSITIONS.value("EURUSD") == closed + 3
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import duckdb
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_buffered_rows_are_written_at_exit(workdir):
+    # Rows recorded right before the interpreter exits are still in the buffer (the flush job runs once a second)
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {PROJECT!r})
+        from data.trade_ledger import get_trade_ledger
+
+        ledger = get_trade_ledger()
+        for ticket in range(1, 4):
+            ledger.record_open(ticket, "1001", "master", "EURUSD", "BUY", 1.0, 1.085)
+        ledger.record_close(1, "1001", "EURUSD", 1.087, 200.0, "tp")
+    """)
+    done = subprocess.run([sys.executable, "-c", script], cwd=workdir, capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+
+    with duckdb.connect(str(workdir / "trading_bot.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trade_opens").fetchone()[0] == 3
+        assert conn.execute("SELECT close_reason FROM trade_closes").fetchall() == [("tp",)]